@@ -1,66 +1,460 @@
 #!/usr/bin/python
 
-import os, sys, types
+# Generates the property accessors of WeView and WeViewLayout (and the demo
+# app's editor and code generation support) from the property tables in
+# CodeGenSpec.json, splicing them into the CODEGEN MARKER blocks of the target
+# files.
+#
+# Usage: python CodeGen.py [--root <path to WeView2 checkout>]
+#
+# The module can also be imported; see generate().
+
+from __future__ import print_function
+
+import argparse, cProfile, difflib, hashlib, json, multiprocessing, os, pickle, pstats, re, shutil, sys, time, types
 from collections import OrderedDict
 
-folderPath = os.path.abspath('WeView')
-if (not os.path.exists(folderPath) or
-    not os.path.isdir(folderPath)):
-    raise Exception('Invalid folderPath: %s' % folderPath)
-
-hFilePath = os.path.join(folderPath, 'UIView+WeView.h')
-mFilePath = os.path.join(folderPath, 'UIView+WeView.m')
-viewInfohFilePath = os.path.join(folderPath, 'WeViewViewInfo.h')
-viewInfomFilePath = os.path.join(folderPath, 'WeViewViewInfo.m')
-viewInfohFilePath = mFilePath
-viewInfomFilePath = mFilePath
-
-ViewEditorController_hFilePath = os.path.join(folderPath, '..', 'WeViews2DemoApp', 'WeViews2DemoApp', 'ViewEditorController.h')
-ViewEditorController_mFilePath = os.path.join(folderPath, '..', 'WeViews2DemoApp', 'WeViews2DemoApp', 'ViewEditorController.m')
-WeViewLayout_hFilePath = os.path.join(folderPath, 'Layouts', 'WeViewLayout.h')
-WeViewLayout_mFilePath = os.path.join(folderPath, 'Layouts', 'WeViewLayout.m')
-DemoCodeGeneration_mFilePath = os.path.join(folderPath, '..', 'WeViews2DemoApp', 'WeViews2DemoApp', 'DemoCodeGeneration.m')
-
-for filePath in (hFilePath,
-                    mFilePath,
-                    viewInfohFilePath, viewInfomFilePath,
-                    ViewEditorController_hFilePath,
-                    ViewEditorController_mFilePath,
-                    WeViewLayout_hFilePath,
-                    WeViewLayout_mFilePath,
-                     ):
-    if (not os.path.exists(filePath) or
-        not os.path.isfile(filePath)):
-        raise Exception('Invalid filePath: %s' % filePath)
-
-
-def replaceBlock(filePath, blockStartKey, blockEndKey, block):
-    block = block.replace('\n\n\n', '\n\n')
-
-    with open(filePath, 'rt') as f:
-        text = f.read()
-
-    startMarker = '/* CODEGEN MARKER: %s */' % blockStartKey
-    endMarker = '/* CODEGEN MARKER: %s */' % blockEndKey
-    startIndex = text.find(startMarker)
-    endIndex = text.find(endMarker)
-    if startIndex < 0:
-        raise Exception('Missing block marker: %s in file: %s' % (startMarker, filePath, ))
-    if endIndex < 0:
-        raise Exception('Missing block marker: %s in file: %s' % (endMarker, filePath, ))
-
-    before = text[0:startIndex + len(startMarker)]
-    after = text[endIndex:]
-    text = before + block + after
-
-    endIndex = text.find(endMarker)
-
-    with open(filePath, 'wt') as f:
-        f.write(text)
+try:
+    basestring
+except NameError:
+    basestring = str
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+
+class TargetPaths:
+    # The files that contain CODEGEN MARKER blocks, relative to the root of a
+    # WeView2 checkout.  Paths are resolved and validated on construction, not
+    # at import time.
+    def __init__(self, rootPath):
+        self.rootPath = os.path.abspath(rootPath)
+        folderPath = os.path.join(self.rootPath, 'WeView')
+        if (not os.path.exists(folderPath) or
+            not os.path.isdir(folderPath)):
+            raise Exception('Invalid folderPath: %s' % folderPath)
+
+        self.hFilePath = os.path.join(folderPath, 'UIView+WeView.h')
+        self.mFilePath = os.path.join(folderPath, 'UIView+WeView.m')
+        self.viewInfohFilePath = self.mFilePath
+        self.viewInfomFilePath = self.mFilePath
+
+        demoFolderPath = os.path.join(self.rootPath, 'WeViews2DemoApp', 'WeViews2DemoApp')
+        self.ViewEditorController_hFilePath = os.path.join(demoFolderPath, 'ViewEditorController.h')
+        self.ViewEditorController_mFilePath = os.path.join(demoFolderPath, 'ViewEditorController.m')
+        self.WeViewLayout_hFilePath = os.path.join(folderPath, 'Layouts', 'WeViewLayout.h')
+        self.WeViewLayout_mFilePath = os.path.join(folderPath, 'Layouts', 'WeViewLayout.m')
+        self.DemoCodeGeneration_mFilePath = os.path.join(demoFolderPath, 'DemoCodeGeneration.m')
+
+        for filePath in (self.hFilePath,
+                         self.mFilePath,
+                         self.viewInfohFilePath, self.viewInfomFilePath,
+                         self.ViewEditorController_hFilePath,
+                         self.ViewEditorController_mFilePath,
+                         self.WeViewLayout_hFilePath,
+                         self.WeViewLayout_mFilePath,
+                         self.DemoCodeGeneration_mFilePath,
+                         ):
+            if (not os.path.exists(filePath) or
+                not os.path.isfile(filePath)):
+                raise Exception('Invalid filePath: %s' % filePath)
+
+
+class EditPlan:
+    # Collects every generated block before touching the disk so that each
+    # target file is read, spliced and written exactly once.  If stats (a
+    # RunStats) is set, file I/O and splice times are recorded in it.
+    def __init__(self, stats=None):
+        self.fileEdits = OrderedDict()
+        self.stats = stats
+
+    def replaceBlock(self, filePath, blockStartKey, blockEndKey, block):
+        # The block is normalized as it is spliced; see normalizedBlockChunks().
+        #
+        # Several of the file paths alias each other (ie. viewInfohFilePath and
+        # mFilePath), so key the edits by the canonical path.
+        filePath = os.path.realpath(filePath)
+        if filePath not in self.fileEdits:
+            self.fileEdits[filePath] = []
+        self.fileEdits[filePath].append((blockStartKey, blockEndKey, block,))
+
+    def splicedFiles(self):
+        # Yields (filePath, oldText, chunks) for each target file, in order,
+        # without touching the disk.  chunks is a generator of the spliced
+        # text (see spliceChunks()); only one file is read at a time as long as
+        # it is consumed before the next file is.
+        for filePath, edits in self.fileEdits.items():
+            with open(filePath, 'rt') as f:
+                text = f.read()
+            if self.stats is not None:
+                self.stats.recordOpen(filePath)
+                self.stats.recordRead(filePath, text)
+            yield filePath, text, spliceChunks(filePath, text, edits)
+
+    def apply(self):
+        # Returns the list of files whose contents actually changed.
+        changedFilePaths = []
+        for filePath, oldText, chunks in self.splicedFiles():
+            # The splice is streamed into the write, so the two are timed
+            # together.
+            startTime = time.time()
+            if writeChunksIfChanged(filePath, chunks, oldText=oldText, stats=self.stats):
+                changedFilePaths.append(filePath)
+            if self.stats is not None:
+                self.stats.recordSplice(filePath, time.time() - startTime)
+        return changedFilePaths
+
+    def check(self, diffFile=None, rootPath=None):
+        # Returns the list of files that are stale, ie. that apply() would
+        # change.  If diffFile is set, a unified diff of each stale file is
+        # streamed to it.
+        staleFilePaths = []
+        for filePath, oldText, chunks in self.splicedFiles():
+            startTime = time.time()
+            if diffFile is None:
+                isStale = not chunksMatchText(chunks, oldText)
+            else:
+                newText = ''.join(chunks)
+                isStale = newText != oldText
+            if self.stats is not None:
+                self.stats.recordSplice(filePath, time.time() - startTime)
+            if not isStale:
+                continue
+            staleFilePaths.append(filePath)
+            if diffFile is not None:
+                displayPath = filePath
+                if rootPath:
+                    displayPath = os.path.relpath(filePath, os.path.realpath(rootPath))
+                diffFile.writelines(difflib.unified_diff(oldText.splitlines(True),
+                                                         newText.splitlines(True),
+                                                         'a/' + displayPath,
+                                                         'b/' + displayPath))
+        return staleFilePaths
+
+
+# Text is streamed (and unchanged text copied to the output) in slices of
+# about this many characters.
+copySliceSize = 1 << 16
+
+multipleBlankLinesRegex = re.compile(r'\n{3,}')
+
+
+def normalizedBlockChunks(block):
+    # Xcode strips trailing whitespace on save; match it so that unchanged
+    # blocks are byte-identical to what is on disk.  Runs of blank lines are
+    # also collapsed to one.  Yields the normalized block in line-aligned
+    # slices of about copySliceSize characters, carrying runs of newlines
+    # across slice boundaries.
+    newlineCount = 0
+    offset = 0
+    while offset < len(block):
+        endIndex = block.find('\n', offset + copySliceSize)
+        endIndex = len(block) if endIndex < 0 else endIndex + 1
+        text = '\n'.join([line.rstrip() for line in block[offset:endIndex].split('\n')])
+        offset = endIndex
+
+        strippedText = text.lstrip('\n')
+        newlineCount += len(text) - len(strippedText)
+        text = strippedText.rstrip('\n')
+        if text:
+            yield '\n' * min(newlineCount, 2) + multipleBlankLinesRegex.sub('\n\n', text)
+            newlineCount = len(strippedText) - len(text)
+    if newlineCount:
+        yield '\n' * min(newlineCount, 2)
+
+
+def normalizeBlock(block):
+    return ''.join(normalizedBlockChunks(block))
+
+
+def chunksMatchText(chunks, text):
+    # Compares a stream of chunks to text without joining them.
+    offset = 0
+    for chunk in chunks:
+        if not text.startswith(chunk, offset):
+            return False
+        offset += len(chunk)
+    return offset == len(text)
+
+
+def writeChunksIfChanged(filePath, chunks, oldText=None, stats=None):
+    # Streams chunks to a temporary file next to filePath, then renames it
+    # over filePath.  Leave identical files (and their mtimes) alone so that
+    # Xcode doesn't rebuild everything that imports them: nothing is written
+    # until the chunks first differ from oldText.
+    if oldText is None and os.path.isfile(filePath):
+        with open(filePath, 'rt') as f:
+            oldText = f.read()
+        if stats is not None:
+            stats.recordOpen(filePath)
+            stats.recordRead(filePath, oldText)
+
+    tempPath = '%s.%d.tmp' % (filePath, os.getpid(), )
+    f = None
+    # The number of characters of oldText the chunks have matched so far.
+    matchedLength = 0
+    byteCount = 0
+    try:
+        for chunk in chunks:
+            if f is None:
+                if oldText is not None and oldText.startswith(chunk, matchedLength):
+                    matchedLength += len(chunk)
+                    continue
+                f = open(tempPath, 'wt')
+                if stats is not None:
+                    stats.recordOpen(filePath)
+                byteCount += copyTextSlices(f, oldText, matchedLength, stats)
+            f.write(chunk)
+            if stats is not None:
+                byteCount += textSize(chunk)
+
+        if f is None:
+            if oldText is not None and matchedLength == len(oldText):
+                return False
+            # The new text is a prefix of the old text (or there is no old file).
+            f = open(tempPath, 'wt')
+            if stats is not None:
+                stats.recordOpen(filePath)
+            byteCount += copyTextSlices(f, oldText, matchedLength, stats)
+        f.close()
+        if os.path.exists(filePath):
+            shutil.copymode(filePath, tempPath)
+        os.rename(tempPath, filePath)
+    except:
+        if f is not None:
+            f.close()
+            os.remove(tempPath)
+        raise
+
+    if stats is not None:
+        stats.recordWrite(filePath, byteCount)
+    return True
+
+
+def copyTextSlices(f, text, length, stats):
+    # Writes text[:length] to f without copying all of it at once.  Returns
+    # the number of bytes written if stats is set.
+    byteCount = 0
+    for offset in range(0, length, copySliceSize):
+        textSlice = text[offset:min(offset + copySliceSize, length)]
+        f.write(textSlice)
+        if stats is not None:
+            byteCount += textSize(textSlice)
+    return byteCount
+
+
+class RunStats:
+    # Timings and I/O counters of a single run.  Recording is a clock read
+    # per block and per file, so it is cheap enough to leave on.
+    def __init__(self):
+        self.startTime = time.time()
+        self.seconds = None
+        self.loadSeconds = 0.0
+        # (filePath, blockStartKey) -> seconds
+        self.blockSeconds = OrderedDict()
+        # filePath -> counters
+        self.fileStats = OrderedDict()
+
+    def fileStat(self, filePath):
+        filePath = os.path.realpath(filePath)
+        if filePath not in self.fileStats:
+            self.fileStats[filePath] = {
+                'opens': 0,
+                'reads': 0,
+                'writes': 0,
+                'bytesIn': 0,
+                'bytesOut': 0,
+                'spliceSeconds': 0.0,
+            }
+        return self.fileStats[filePath]
+
+    def recordRender(self, filePath, blockStartKey, seconds):
+        self.blockSeconds[(os.path.realpath(filePath), blockStartKey,)] = seconds
+
+    def recordSplice(self, filePath, seconds):
+        self.fileStat(filePath)['spliceSeconds'] += seconds
+
+    def recordOpen(self, filePath):
+        # Temporary files count against the file they replace.
+        self.fileStat(filePath)['opens'] += 1
+
+    def recordRead(self, filePath, text):
+        fileStat = self.fileStat(filePath)
+        fileStat['reads'] += 1
+        fileStat['bytesIn'] += textSize(text)
+
+    def recordWrite(self, filePath, byteCount):
+        fileStat = self.fileStat(filePath)
+        fileStat['writes'] += 1
+        fileStat['bytesOut'] += byteCount
+
+    def finish(self):
+        self.seconds = time.time() - self.startTime
+
+    def asDict(self, rootPath):
+        # A JSON-friendly summary, with paths relative to rootPath.
+        realRootPath = os.path.realpath(rootPath)
+        files = []
+        for filePath, fileStat in self.fileStats.items():
+            fileDict = {'path': os.path.relpath(filePath, realRootPath)}
+            fileDict.update(fileStat)
+            files.append(fileDict)
+        blocks = [{'path': os.path.relpath(filePath, realRootPath),
+                   'block': blockStartKey,
+                   'seconds': seconds,
+                   } for (filePath, blockStartKey), seconds in self.blockSeconds.items()]
+        return {
+            'rootPath': rootPath,
+            'seconds': self.seconds,
+            'loadSeconds': self.loadSeconds,
+            'renderSeconds': sum([block['seconds'] for block in blocks]),
+            'spliceSeconds': sum([fileDict['spliceSeconds'] for fileDict in files]),
+            'filesOpened': sum([fileDict['opens'] for fileDict in files]),
+            'reads': sum([fileDict['reads'] for fileDict in files]),
+            'writes': sum([fileDict['writes'] for fileDict in files]),
+            'bytesIn': sum([fileDict['bytesIn'] for fileDict in files]),
+            'bytesOut': sum([fileDict['bytesOut'] for fileDict in files]),
+            'blocks': blocks,
+            'files': files,
+        }
+
+
+def textSize(text):
+    # The size in bytes of text as written to disk.
+    if isinstance(text, bytes):
+        return len(text)
+    return len(text.encode('utf-8'))
+
+
+def formatStatsTable(statsDict):
+    # Returns the lines of a human-readable summary of RunStats.asDict().
+    lines = []
+    lines.append('%s: %.3fs (load %.3fs, render %.3fs, splice %.3fs), %d opens, %d reads, %d writes, %d bytes in, %d bytes out' % (
+        statsDict['rootPath'], statsDict['seconds'], statsDict['loadSeconds'], statsDict['renderSeconds'], statsDict['spliceSeconds'],
+        statsDict['filesOpened'], statsDict['reads'], statsDict['writes'], statsDict['bytesIn'], statsDict['bytesOut'], ))
+    lines.append('    %-10s  %-56s  %s' % ('render', 'file', 'block', ))
+    for block in sorted(statsDict['blocks'], key=lambda block: -block['seconds']):
+        lines.append('    %9.3fms  %-56s  %s' % (block['seconds'] * 1000.0, block['path'], block['block'], ))
+    lines.append('    %-10s  %-56s  %5s  %5s  %6s  %10s  %10s' % ('splice', 'file', 'opens', 'reads', 'writes', 'bytes in', 'bytes out', ))
+    for fileDict in statsDict['files']:
+        lines.append('    %9.3fms  %-56s  %5d  %5d  %6d  %10d  %10d' % (fileDict['spliceSeconds'] * 1000.0, fileDict['path'],
+                                                                       fileDict['opens'], fileDict['reads'], fileDict['writes'],
+                                                                  fileDict['bytesIn'], fileDict['bytesOut'], ))
+    return lines
+
+
+markerRegex = re.compile(r'/\* CODEGEN MARKER: (.*?) \*/')
+
+
+class Marker:
+    def __init__(self, key, startIndex, endIndex, lineNumber):
+        self.key = key
+        self.startIndex = startIndex
+        self.endIndex = endIndex
+        self.lineNumber = lineNumber
+
+
+class MarkerIndex:
+    # An ordered index of every CODEGEN MARKER in a file, built in a single
+    # pass.  Duplicate, nested, unterminated and inverted Start/End pairs are
+    # rejected up front.
+    def __init__(self, filePath, text):
+        self.filePath = filePath
+        self.markers = OrderedDict()
+
+        lineNumber = 1
+        lineOffset = 0
+        openMarker = None
+        for match in markerRegex.finditer(text):
+            lineNumber += text.count('\n', lineOffset, match.start())
+            lineOffset = match.start()
+            marker = Marker(match.group(1), match.start(), match.end(), lineNumber)
+
+            if marker.key in self.markers:
+                raise Exception('Duplicate block marker: %s in file: %s (lines %d and %d)' %
+                                (marker.key, filePath, self.markers[marker.key].lineNumber, marker.lineNumber, ))
+            self.markers[marker.key] = marker
+
+            if isStartMarkerKey(marker.key):
+                if openMarker:
+                    raise Exception('Block marker: %s in file: %s (line %d) is nested inside: %s (line %d)' %
+                                    (marker.key, filePath, marker.lineNumber, openMarker.key, openMarker.lineNumber, ))
+                openMarker = marker
+            elif isEndMarkerKey(marker.key):
+                startKey = startMarkerKeyForEndKey(marker.key)
+                if not openMarker or openMarker.key != startKey:
+                    raise Exception('Block marker: %s in file: %s (line %d) does not follow its start marker: %s' %
+                                    (marker.key, filePath, marker.lineNumber, startKey, ))
+                openMarker = None
+
+        if openMarker:
+            raise Exception('Unterminated block marker: %s in file: %s (line %d)' %
+                            (openMarker.key, filePath, openMarker.lineNumber, ))
+
+    def marker(self, key):
+        if key not in self.markers:
+            raise Exception('Missing block marker: %s in file: %s' % (formatMarker(key), self.filePath, ))
+        return self.markers[key]
+
+    def blockRange(self, blockStartKey, blockEndKey):
+        # Returns the range of the text between the two markers.
+        startMarker = self.marker(blockStartKey)
+        endMarker = self.marker(blockEndKey)
+        if endMarker.startIndex < startMarker.endIndex:
+            raise Exception('Block marker: %s (line %d) precedes: %s (line %d) in file: %s' %
+                            (blockEndKey, endMarker.lineNumber, blockStartKey, startMarker.lineNumber, self.filePath, ))
+        return startMarker.endIndex, endMarker.startIndex
+
+
+def formatMarker(key):
+    return '/* CODEGEN MARKER: %s */' % key
+
+def isStartMarkerKey(key):
+    return key == 'Start' or key.endswith(' Start')
+
+def isEndMarkerKey(key):
+    return key == 'End' or key.endswith(' End')
+
+def startMarkerKeyForEndKey(key):
+    return key[:-len('End')] + 'Start'
+
+
+def spliceChunks(filePath, text, edits, markerIndex=None):
+    # Returns a generator of the chunks of text with each (blockStartKey,
+    # blockEndKey, block) edit applied, in a single pass in file order.  The
+    # markers are validated up front, before anything is yielded.
+    if markerIndex is None:
+        markerIndex = MarkerIndex(filePath, text)
+
+    splices = []
+    for blockStartKey, blockEndKey, block in edits:
+        startIndex, endIndex = markerIndex.blockRange(blockStartKey, blockEndKey)
+        splices.append((startIndex, endIndex, block,))
+    splices.sort()
+    offset = 0
+    for startIndex, endIndex, block in splices:
+        if startIndex < offset:
+            raise Exception('Overlapping blocks in file: %s' % (filePath, ))
+        offset = endIndex
+    return iterSplicedChunks(text, splices)
+
+
+def iterSplicedChunks(text, splices):
+    offset = 0
+    for startIndex, endIndex, block in splices:
+        for chunkOffset in range(offset, startIndex, copySliceSize):
+            yield text[chunkOffset:min(chunkOffset + copySliceSize, startIndex)]
+        for chunk in normalizedBlockChunks(block):
+            yield chunk
+        offset = endIndex
+    for chunkOffset in range(offset, len(text), copySliceSize):
+        yield text[chunkOffset:min(chunkOffset + copySliceSize, len(text))]
 
 
 class Property:
-    def __init__(self, name, typeName, defaultValue=None, asserts=None, comments=None, layoutProperty=False, extraSetterLine=None, doubleHeight=False):
+    def __init__(self, name, typeName, defaultValue=None, asserts=None, comments=None, layoutProperty=False, extraSetterLine=None, extraSetterDiffers=None, doubleHeight=False, invalidation='full'):
         self.name = name
         self.typeName = typeName
         self.defaultValue = defaultValue
@@ -68,189 +462,18 @@ class Property:
         self.comments = comments
         self.layoutProperty = layoutProperty
         self.extraSetterLine = extraSetterLine
+        # An expression that is true if extraSetterLine would change anything,
+        # so that setters can skip unchanged values.
+        self.extraSetterDiffers = extraSetterDiffers
         self.doubleHeight = doubleHeight
+        # One of invalidationClasses.
+        self.invalidation = invalidation
 
 
     def UpperName(self):
         return self.name[0].upper() + self.name[1:]
 
 
-view_propertyGroups = (
-                  (
-                   Property('minDesiredWidth', 'CGFloat',
-                       comments='The minimum desired width of this view. Trumps the maxWidth.',
-                       asserts='%s >= 0', ),
-                   Property('maxDesiredWidth', 'CGFloat',
-                       comments='The maximum desired width of this view. Trumped by the minWidth.',
-                       defaultValue="CGFLOAT_MAX", asserts='%s >= 0',  ),
-                   Property('minDesiredHeight', 'CGFloat',
-                       comments='The minimum desired height of this view. Trumps the maxHeight.',
-                       asserts='%s >= 0', ),
-                   Property('maxDesiredHeight', 'CGFloat',
-                       comments='The maximum desired height of this view. Trumped by the minHeight.',
-                       defaultValue="CGFLOAT_MAX", asserts='%s >= 0', ),
-                   ),
-                  (
-                   Property('hStretchWeight', 'CGFloat',
-                       comments=(
-                           'The horizontal stretch weight of this view. If non-zero, the view is willing to take available space or be cropped if necessary.',
-                           'Subviews with larger relative stretch weights will be stretched more.',
-                           ),
-                       asserts='%s >= 0', ),
-                   Property('vStretchWeight', 'CGFloat',
-                       comments=(
-                           'The vertical stretch weight of this view. If non-zero, the view is willing to take available space or be cropped if necessary.',
-                           'Subviews with larger relative stretch weights will be stretched more.',
-                           ),
-                       asserts='%s >= 0', ),
-                   ),
-                  (
-                   Property('leftSpacingAdjustment', 'int',
-                       comments=(
-                           'An adjustment to the spacing to the left of this view, if any.',
-                           'This value can be positive or negative.',
-                           'Only applies to the horizontal, vertical and flow layouts.',
-                           ),
-                       doubleHeight=True,
-                       ),
-                   Property('topSpacingAdjustment', 'int',
-                       comments=(
-                           'An adjustment to the spacing above this view, if any.',
-                           'This value can be positive or negative.',
-                           'Only applies to the horizontal and vertical layouts.',
-                           ),
-                       doubleHeight=True,
-                       ),
-                   Property('rightSpacingAdjustment', 'int',
-                       comments=(
-                           'An adjustment to the spacing to the right of this view, if any.',
-                           'This value can be positive or negative.',
-                           'Only applies to the horizontal, vertical and flow layouts.',
-                           ),
-                       doubleHeight=True,
-                       ),
-                   Property('bottomSpacingAdjustment', 'int',
-                       comments=(
-                           'An adjustment to the spacing below this view, if any.',
-                           'This value can be positive or negative.',
-                           'Only applies to the horizontal and vertical layouts.',
-                           ),
-                       doubleHeight=True,
-                       ),
-                   ),
-                  (
-                   Property('desiredWidthAdjustment', 'CGFloat',
-                       comments=(
-                           'This adjustment can be used to manipulate the desired width of a view.',
-                           'It is added to the desired width reported by the subview.',
-                           'This value can be negative.',
-                           ),
-                       asserts='%s >= 0',
-                       doubleHeight=True,
-                        ),
-                   Property('desiredHeightAdjustment', 'CGFloat',
-                       comments=(
-                           'This adjustment can be used to manipulate the desired height of a view.',
-                           'It is added to the desired width reported by the subview.',
-                           'This value can be negative.',
-                           ),
-                       asserts='%s >= 0',
-                       doubleHeight=True,
-                        ),
-                   Property('ignoreDesiredSize', 'BOOL', ),
-                   ),
-                  (
-                   Property('cellHAlign', 'HAlign',
-                       comments=(
-                           'The horizontal alignment preference of this view within in its layout cell.',
-                           'This value is optional.  The default value is the contentHAlign of its superview.',
-                           'cellHAlign should only be used for cells whose alignment differs from its superview\'s.',
-                           ),
-                       extraSetterLine='self.hasCellHAlign = YES;'),
-                   Property('cellVAlign', 'VAlign',
-                       comments=(
-                           'The vertical alignment preference of this view within in its layout cell.',
-                           'This value is optional.  The default value is the contentVAlign of its superview.',
-                           'cellVAlign should only be used for cells whose alignment differs from its superview\'s.',
-                           ),
-                       extraSetterLine='self.hasCellVAlign = YES;'),
-                   Property('hasCellHAlign', 'BOOL', ),
-                   Property('hasCellVAlign', 'BOOL', ),
-                   ),
-                  (
-                   Property('debugName', 'NSString *',
-                       defaultValue="@\"?\"", ),
-                   ),
-
-                  )
-
-layout_propertyGroups = (
-                  (
-                   Property('leftMargin', 'CGFloat',
-                       comments='The left margin of the contents of this view.',
-                       layoutProperty=True, ),
-                   Property('rightMargin', 'CGFloat',
-                       comments='The right margin of the contents of this view.',
-                       layoutProperty=True, ),
-                   Property('topMargin', 'CGFloat',
-                       comments='The top margin of the contents of this view.',
-                       layoutProperty=True, ),
-                   Property('bottomMargin', 'CGFloat',
-                       comments='The bottom margin of the contents of this view.',
-                       layoutProperty=True, ),
-                   ),
-                  (
-                   Property('vSpacing', 'int',
-                       comments='The vertical spacing between subviews of this view.',
-                       layoutProperty=True, ),
-                   Property('hSpacing', 'int',
-                       comments='The horizontal spacing between subviews of this view.',
-                        layoutProperty=True, ),
-                   ),
-                  (
-                   Property('hAlign', 'HAlign',
-                       comments='The horizontal alignment of this layout.',
-                       layoutProperty=True, ),
-                   Property('vAlign', 'VAlign',
-                       comments='The vertical alignment of this layout.',
-                        layoutProperty=True, ),
-                   ),
-                  (
-                   Property('spacingStretches', 'BOOL',
-                       comments=(
-                           'If YES, the spacings between subviews will be stretched if there is any extra space.',
-                           'Extra space will be distributed evenly between the spacings.',
-                           'Layouts will prefer to stretch subviews if possible.  Spacings will only be stretched if there are no stretching subviews to receive the extra space.',
-                           'The spacings will not be cropped if the layout cannot fit its subviews within their superview, even if this property is YES.'
-                           'Only applies to the horizontal, vertical and flow layouts.  In a flow layout where spacingStretches is YES, the subviews are justified.',
-                           ),
-                       layoutProperty=True, ),
-                   ),
-                  (
-                   Property('cropSubviewOverflow', 'BOOL',
-                       comments=(
-                           'By default, if the content size (ie. the total subview size plus margins and spacing) of a WeView overflows its bounds, subviews are cropped to fit inside the available space.',
-                           'If cropSubviewOverflow is NO, no cropping occurs and subviews may overflow the bounds of their superview.',
-                           ),
-                       layoutProperty=True, ),
-                   Property('cellPositioning', 'CellPositioningMode',
-                       comments=(
-                           'By default, cellPositioning has a value of CELL_POSITIONING_NORMAL and cell size is based on their desired size and they are aligned within their layout cell.',
-                           'If cellPositioning is set to CELL_POSITIONING_FILL, subviews fill the entire bounds of their layout cell, regardless of their desired size.',
-                           'If cellPositioning is set to CELL_POSITIONING_FILL_W_ASPECT_RATIO, subviews fill the entire bounds of their layout cell but retain the aspect ratio of their desired size.',
-                           'If cellPositioning is set to CELL_POSITIONING_FIT_W_ASPECT_RATIO, subviews are "fit" inside the bounds of their layout cell and retain the aspect ratio of their desired size.',
-                           ),
-                       layoutProperty=True, ),
-                   ),
-                  (
-                   Property('debugLayout', 'BOOL',
-                       layoutProperty=True, ),
-                   Property('debugMinSize', 'BOOL',
-                       layoutProperty=True, ),
-                   ),
-
-                  )
-
 def FormatList(values):
     if len(values) > 1:
         return ', '.join(values[:-1]) + ' and ' + values[-1]
@@ -260,33 +483,44 @@ def FormatList(values):
 def FormatComment(comment):
     return FormatComments((comment,))
 
-def SplitCommentLine(comment):
-    remainder = comment
-    comments = []
-    maxLength = 95
-    while len(remainder):
-        if len(comment) < maxLength:
-            comments.append(remainder)
-            remainder = ''
-        else:
-            index = remainder[:maxLength].rfind(' ')
-            if index >= 0:
-                comments.append(remainder[:index].strip())
-                remainder = remainder[index:].strip()
-            else:
-                comments.append(remainder)
-                remainder = ''
-
-    # print '\t', 'SplitCommentLine', 'comment', comment
-    # print '\t', 'SplitCommentLine', 'comments', comments
-    return comments
+# The maximum length of a wrapped comment line, excluding the "// " prefix.
+commentWidth = 94
+
+# Wrapped comment lines keyed by (comment, width).  The same comments appear in
+# several headers so each is only wrapped once per run.
+wrappedCommentCache = {}
+
+commentWordRegex = re.compile(r'(\s*)(\S+)')
+
+def WrapCommentLine(comment, width=commentWidth):
+    # Greedy word wrap in a single pass.  Spacing between words on the same
+    # line is preserved, ie. two spaces after a full stop.
+    key = (comment, width, )
+    if key not in wrappedCommentCache:
+        lines = []
+        line = []
+        lineLength = 0
+        for match in commentWordRegex.finditer(comment):
+            spacing, word = match.groups()
+            if line and lineLength + len(spacing) + len(word) > width:
+                lines.append(''.join(line))
+                line = []
+                lineLength = 0
+            if line:
+                line.append(spacing)
+                lineLength += len(spacing)
+            line.append(word)
+            lineLength += len(word)
+        if line:
+            lines.append(''.join(line))
+        wrappedCommentCache[key] = tuple(lines)
+    return wrappedCommentCache[key]
 
 def FormatComments(comment):
-    # TODO: linewrap the comments.
     comments = []
-    if type(comment) in (types.ListType, types.TupleType,):
+    if isinstance(comment, (list, tuple,)):
         comments = list(comment)
-    elif type(comment) in (types.StringType,):
+    elif isinstance(comment, basestring):
         comments = [comment,]
     else:
         raise Exception('Unknown comment type: %s' % str(type(comment)))
@@ -295,18 +529,23 @@ def FormatComments(comment):
     for index, comment in enumerate(comments):
         if index > 0:
             formattedComments.append('')
-        formattedComments.extend(SplitCommentLine(comment))
+        formattedComments.extend(WrapCommentLine(comment))
 
     if not formattedComments:
         return []
-    result = (['',] + ['// %s' % comment for comment in formattedComments])
-    # print '--', result
-    return result
+    return ['',] + ['// %s' % comment for comment in formattedComments]
 
 
 def UpperName(name):
     return name[0].upper() + name[1:]
 
+def FormatDeclaration(typeName, name):
+    # ie. "CGFloat value" but "NSString *value".
+    if typeName.endswith('*'):
+        return '%s%s' % (typeName, name, )
+    return '%s %s' % (typeName, name, )
+
+
 class CustomAccessor:
     def __init__(self, name, typeName, propertyList, setterValues=None, getterValue=None, comments=None, layoutProperty=False):
         self.name = name
@@ -324,607 +563,2118 @@ class CustomAccessor:
         return UpperName(self.name)
 
 
-view_customAccessors = (
-                    CustomAccessor('minDesiredSize', 'CGSize', ('minDesiredWidth', 'minDesiredHeight',), ('.width', '.height',), getterValue='CGSizeMake(self.minDesiredWidth, self.minDesiredHeight)'),
-                    CustomAccessor('maxDesiredSize', 'CGSize', ('maxDesiredWidth', 'maxDesiredHeight',), ('.width', '.height',), getterValue='CGSizeMake(self.maxDesiredWidth, self.maxDesiredHeight)'),
-                    CustomAccessor('desiredSizeAdjustment', 'CGSize',
-                        ('desiredWidthAdjustment', 'desiredHeightAdjustment',),
-                         ('.width', '.height',),
-                         getterValue='CGSizeMake(self.desiredWidthAdjustment, self.desiredHeightAdjustment)'),
+# --------
+
+class PropertyTables:
+    # The property tables that every block is rendered from, and the spec
+    # options (see specOptionNames).
+    def __init__(self, view_propertyGroups, layout_propertyGroups, view_customAccessors, layout_customAccessors,
+                 viewInfoStorage='dense'):
+        self.view_propertyGroups = view_propertyGroups
+        self.layout_propertyGroups = layout_propertyGroups
+        self.view_customAccessors = view_customAccessors
+        self.layout_customAccessors = layout_customAccessors
+        # One of viewInfoStorageModes.
+        self.viewInfoStorage = viewInfoStorage
+
+
+tableNames = ('view_propertyGroups',
+              'layout_propertyGroups',
+              'view_customAccessors',
+              'layout_customAccessors',
+              )
+
+# Spec keys that aren't tables but options of the generator.  Options are read
+# from the tables like tables are, ie. tables.viewInfoStorage.
+specOptionNames = ('viewInfoStorage',)
+
+# How WeViewViewInfo stores the view properties:
+#
+# dense: A synthesized ivar for each property.  The default.
+# sparse: Only the scalar values that differ from their defaults are stored, in
+#         a heap-allocated array indexed by a presence bitmask.  BOOL and enum
+#         properties are stored inline as bitfields and object properties as
+#         ivars.  Smaller for views that set few properties.
+viewInfoStorageModes = ('dense', 'sparse',)
+
+# The property tables are declared in a JSON spec.  See CodeGenSpec.json.
+defaultSpecPath = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'CodeGenSpec.json')
+
+# Bump this whenever Property, CustomAccessor or the spec format change so that
+# stale compiled specs are ignored.
+specCacheVersion = 5
+
+propertySpecKeys = {
+    'name': basestring,
+    'typeName': basestring,
+    'defaultValue': basestring,
+    'asserts': basestring,
+    'comments': (basestring, list,),
+    'layoutProperty': bool,
+    'extraSetterLine': basestring,
+    'extraSetterDiffers': basestring,
+    'doubleHeight': bool,
+    'invalidation': basestring,
+}
 
-                    CustomAccessor('fixedDesiredWidth', 'CGFloat', ('minDesiredWidth', 'maxDesiredWidth',)),
-                    CustomAccessor('fixedDesiredHeight', 'CGFloat', ('minDesiredHeight', 'maxDesiredHeight',)),
-                    CustomAccessor('fixedDesiredSize', 'CGSize', ('minDesiredWidth', 'minDesiredHeight', 'maxDesiredWidth', 'maxDesiredHeight',), ('.width', '.height', '.width', '.height',)),
+customAccessorSpecKeys = {
+    'name': basestring,
+    'typeName': basestring,
+    'propertyList': list,
+    'setterValues': list,
+    'getterValue': basestring,
+    'comments': (basestring, list,),
+    'layoutProperty': bool,
+}
 
-                    CustomAccessor('stretchWeight', 'CGFloat', ('vStretchWeight', 'hStretchWeight',)),
-                    )
 
-layout_customAccessors = (
-                    CustomAccessor('hMargin', 'CGFloat', ('leftMargin', 'rightMargin',), layoutProperty=True, ),
-                    CustomAccessor('vMargin', 'CGFloat', ('topMargin', 'bottomMargin',), layoutProperty=True, ),
-                    CustomAccessor('margin', 'CGFloat', ('leftMargin', 'rightMargin', 'topMargin', 'bottomMargin',), layoutProperty=True, ),
+def validateSpecEntry(specPath, tableName, entry, specKeys, requiredKeys):
+    if not isinstance(entry, dict):
+        raise Exception('Invalid spec: %s: %s entries must be objects: %s' % (specPath, tableName, str(entry), ))
+    for key in requiredKeys:
+        if key not in entry:
+            raise Exception('Invalid spec: %s: %s entry is missing "%s": %s' % (specPath, tableName, key, str(entry), ))
+    for key, value in entry.items():
+        if key not in specKeys:
+            raise Exception('Invalid spec: %s: %s entry has unknown key "%s": %s' % (specPath, tableName, key, str(entry), ))
+        if not isinstance(value, specKeys[key]):
+            raise Exception('Invalid spec: %s: %s.%s has an invalid value: %s' % (specPath, entry['name'], key, str(value), ))
+        if isinstance(value, list) and not all([isinstance(item, basestring) for item in value]):
+            raise Exception('Invalid spec: %s: %s.%s must be a list of strings: %s' % (specPath, entry['name'], key, str(value), ))
+
+
+def parseSpec(specPath, data):
+    # Parses and validates a spec, returning a dictionary of the tables that
+    # it defines.
+    try:
+        spec = json.loads(data.decode('utf-8'))
+    except ValueError as e:
+        raise Exception('Invalid spec: %s: %s' % (specPath, str(e), ))
+    if not isinstance(spec, dict):
+        raise Exception('Invalid spec: %s: expected an object' % (specPath, ))
+    for tableName in spec:
+        if tableName not in tableNames and tableName not in specOptionNames:
+            raise Exception('Invalid spec: %s: unknown table: %s' % (specPath, tableName, ))
+
+    tables = {}
+    if 'viewInfoStorage' in spec:
+        if spec['viewInfoStorage'] not in viewInfoStorageModes:
+            raise Exception('Invalid spec: %s: unknown viewInfoStorage: %s' % (specPath, spec['viewInfoStorage'], ))
+        tables['viewInfoStorage'] = spec['viewInfoStorage']
+    for tableName in ('view_propertyGroups', 'layout_propertyGroups',):
+        if tableName not in spec:
+            continue
+        propertyGroups = []
+        propertyNames = set()
+        for group in spec[tableName]:
+            if not isinstance(group, list):
+                raise Exception('Invalid spec: %s: %s must be a list of lists' % (specPath, tableName, ))
+            propertyGroup = []
+            for entry in group:
+                validateSpecEntry(specPath, tableName, entry, propertySpecKeys, ('name', 'typeName',))
+                if entry['name'] in propertyNames:
+                    raise Exception('Invalid spec: %s: duplicate property: %s' % (specPath, entry['name'], ))
+                propertyNames.add(entry['name'])
+                if entry['typeName'] not in typeInfos:
+                    raise Exception('Invalid spec: %s: %s has an unknown typeName: %s' % (specPath, entry['name'], entry['typeName'], ))
+                if entry.get('invalidation', 'full') not in invalidationClasses:
+                    raise Exception('Invalid spec: %s: %s has an unknown invalidation: %s' % (specPath, entry['name'], entry['invalidation'], ))
+                propertyGroup.append(Property(**dict([(str(key), value) for key, value in entry.items()])))
+            propertyGroups.append(tuple(propertyGroup))
+        tables[tableName] = tuple(propertyGroups)
+
+    for tableName, propertyGroupsName in (('view_customAccessors', 'view_propertyGroups',),
+                                          ('layout_customAccessors', 'layout_propertyGroups',),):
+        if tableName not in spec:
+            continue
+        propertyNames = None
+        if propertyGroupsName in tables:
+            propertyNames = set([property.name for propertyGroup in tables[propertyGroupsName] for property in propertyGroup])
+        customAccessors = []
+        for entry in spec[tableName]:
+            validateSpecEntry(specPath, tableName, entry, customAccessorSpecKeys, ('name', 'typeName', 'propertyList',))
+            if entry['typeName'] not in typeInfos:
+                raise Exception('Invalid spec: %s: %s has an unknown typeName: %s' % (specPath, entry['name'], entry['typeName'], ))
+            if not entry['propertyList']:
+                raise Exception('Invalid spec: %s: %s has an empty propertyList' % (specPath, entry['name'], ))
+            if 'setterValues' in entry and len(entry['setterValues']) != len(entry['propertyList']):
+                raise Exception('Invalid spec: %s: %s.setterValues does not match its propertyList' % (specPath, entry['name'], ))
+            if propertyNames is not None:
+                for propertyName in entry['propertyList']:
+                    if propertyName not in propertyNames:
+                        raise Exception('Invalid spec: %s: %s refers to unknown property: %s' % (specPath, entry['name'], propertyName, ))
+            customAccessors.append(CustomAccessor(**dict([(str(key), value) for key, value in entry.items()])))
+        tables[tableName] = tuple(customAccessors)
+
+    return tables
+
+
+def loadSpec(specPath, cacheFolderPath=None):
+    # Returns a dictionary of the tables defined by a spec.  Parsed specs are
+    # cached on disk (by default in a .codegen-cache folder next to the spec)
+    # keyed by a hash of their contents, so an unchanged spec is a single
+    # unpickle rather than a parse and validation.
+    with open(specPath, 'rb') as f:
+        data = f.read()
+
+    if cacheFolderPath is None:
+        cacheFolderPath = os.path.join(os.path.dirname(os.path.abspath(specPath)), '.codegen-cache')
+    cacheKey = '%s-%d-py%d' % (hashlib.sha1(data).hexdigest(), specCacheVersion, sys.version_info[0], )
+    cachePath = os.path.join(cacheFolderPath, cacheKey + '.pickle')
+
+    tables = readCacheFile(cachePath)
+    if tables is None:
+        tables = parseSpec(specPath, data)
+        writeCacheFile(cachePath, tables)
+    return tables
+
+
+def readCacheFile(cachePath):
+    # Returns the unpickled contents of a cache file or None.
+    if not os.path.isfile(cachePath):
+        return None
+    try:
+        with open(cachePath, 'rb') as f:
+            return pickle.load(f)
+    except Exception:
+        # A corrupt or incompatible cache entry.
+        return None
+
+
+def writeCacheFile(cachePath, value):
+    try:
+        cacheFolderPath = os.path.dirname(cachePath)
+        if not os.path.isdir(cacheFolderPath):
+            os.makedirs(cacheFolderPath)
+        tempPath = '%s.%d.tmp' % (cachePath, os.getpid(), )
+        with open(tempPath, 'wb') as f:
+            pickle.dump(value, f, pickle.HIGHEST_PROTOCOL)
+        os.rename(tempPath, cachePath)
+    except (IOError, OSError):
+        # The cache is only an optimization.
+        pass
+
+
+def loadPropertyTables(specPath=None):
+    # Returns the property tables of the default spec, overridden by any
+    # tables defined in specPath.
+    specTables = loadSpec(defaultSpecPath)
+    if specPath and os.path.abspath(specPath) != defaultSpecPath:
+        overrideTables = loadSpec(specPath)
+        specTables.update(overrideTables)
+        # Each spec is validated on its own when compiled, but accessors in
+        # one spec may refer to properties in the other.
+        for tableName, propertyGroupsName in (('view_customAccessors', 'view_propertyGroups',),
+                                              ('layout_customAccessors', 'layout_propertyGroups',),):
+            if (tableName in overrideTables) == (propertyGroupsName in overrideTables):
+                continue
+            propertyNames = set([property.name for propertyGroup in specTables[propertyGroupsName] for property in propertyGroup])
+            for customAccessor in specTables[tableName]:
+                for propertyName in customAccessor.propertyNames():
+                    if propertyName not in propertyNames:
+                        raise Exception('Invalid spec: %s: %s refers to unknown property: %s' % (specPath, customAccessor.name, propertyName, ))
+    return PropertyTables(*[specTables[tableName] for tableName in tableNames],
+                          viewInfoStorage=specTables.get('viewInfoStorage', 'dense'))
 
-                    CustomAccessor('spacing', 'int', ('hSpacing', 'vSpacing',), layoutProperty=True, ),
-                    )
 
 # --------
 
-lines = []
-lines.append('')
-lines.append('')
-for propertyGroup in view_propertyGroups:
-    for property in propertyGroup:
-        if property.comments:
-            lines.extend(FormatComments(property.comments))
-        lines.append('@property (nonatomic) %s %s;' % (property.typeName, property.name, ))
-    lines.append('')
-
-for customAccessor in view_customAccessors:
-    comments = []
-    comments.append('Convenience accessor(s) for the %s properties.' % FormatList(customAccessor.propertyNames()))
-    lines.extend(FormatComments(comments))
-    # Getter
-    if customAccessor.getterValue:
-        lines.append('- (%s)%s;' % (customAccessor.typeName, customAccessor.name, ))
-    # Setter
-    lines.append('- (void)set%s:(%s)value;\n' % (customAccessor.UpperName(), customAccessor.typeName, ))
-lines.append('')
-block = '\n'.join(lines)
-
-replaceBlock(viewInfohFilePath, 'View Info H Start', 'View Info H End', block)
+class Template:
+    # A template with ${name} placeholders.  The text is split into literal
+    # and placeholder segments once, the first time that it is rendered.
+    placeholderRegex = re.compile(r'\$\{(\w+)\}')
+
+    def __init__(self, text):
+        self.text = text
+        self.segments = None
+
+    def compile(self):
+        segments = []
+        offset = 0
+        for match in self.placeholderRegex.finditer(self.text):
+            if match.start() > offset:
+                segments.append((False, self.text[offset:match.start()]))
+            segments.append((True, match.group(1)))
+            offset = match.end()
+        if offset < len(self.text):
+            segments.append((False, self.text[offset:]))
+        self.segments = tuple(segments)
+
+    def renderInto(self, buffer, values):
+        if self.segments is None:
+            self.compile()
+        for isPlaceholder, segment in self.segments:
+            buffer.append(values[segment] if isPlaceholder else segment)
+
+    def render(self, **values):
+        buffer = []
+        self.renderInto(buffer, values)
+        return ''.join(buffer)
+
+
+class BlockWriter:
+    # Accumulates a block in a single buffer.  Each call starts a new line,
+    # ie. the result is the same as '\n'.join() of the lines.
+    def __init__(self):
+        self.buffer = []
+        self.hasLines = False
+
+    def startLine(self):
+        if self.hasLines:
+            self.buffer.append('\n')
+        self.hasLines = True
+
+    def line(self, text=''):
+        self.startLine()
+        self.buffer.append(text)
+
+    def lines(self, texts):
+        for text in texts:
+            self.line(text)
+
+    def template(self, template, **values):
+        self.startLine()
+        template.renderInto(self.buffer, values)
+
+    def getvalue(self):
+        return ''.join(self.buffer)
+
+
+class TypeInfo:
+    # Everything the generator needs to know about a property type.
+    #
+    # editorType: The ViewEditorController ParameterType of the type or None.
+    # enumValues: The values offered by the editor for enum types.
+    # displayFormatter: Formats a value for the editor (enum types only).
+    # resetValue: The value WeViewLayout resets the property to or None.
+    # zeroValue: The value of a zero-filled ivar of the type.
+    # formatter: Formats a value for DemoCodeGeneration or None.
+    # packedStorage: The (C type, bit width or None) of the property in a
+    #                packed config struct, or None if it can't be packed.
+    # sparseField: The WeViewViewInfoValue field that holds values of the type
+    #              in sparse view info storage, or None if they are stored
+    #              inline.
+    def __init__(self, typeName, editorType=None, enumValues=None, displayFormatter=None, resetValue=None, formatter=None,
+                 equalsTemplate=Template('${a} == ${b}'), differsTemplate=Template('${a} != ${b}'), packedStorage=None,
+                 zeroValue=None, sparseField=None):
+        self.typeName = typeName
+        self.editorType = editorType
+        self.enumValues = enumValues
+        self.displayFormatter = displayFormatter
+        self.resetValue = resetValue
+        self.formatter = formatter
+        self.equalsTemplate = equalsTemplate
+        self.differsTemplate = differsTemplate
+        self.packedStorage = packedStorage
+        self.zeroValue = zeroValue
+        self.sparseField = sparseField
+
+    def isObject(self):
+        return self.typeName.endswith('*')
+
+    def packedValue(self, value):
+        # Converts a value of this type for storage in a packed struct.
+        storageTypeName, bitWidth = self.packedStorage
+        if bitWidth == 1:
+            return '(%s ? 1 : 0)' % value
+        if storageTypeName != self.typeName:
+            return '(%s) %s' % (storageTypeName, value, )
+        return value
+
+    def unpackedValue(self, value):
+        # Converts a value stored in a packed struct back to this type.
+        if self.packedStorage[0] != self.typeName:
+            return '(%s) %s' % (self.typeName, value, )
+        return value
+
+    def equals(self, a, b):
+        return self.equalsTemplate.render(a=a, b=b)
+
+    def differs(self, a, b):
+        return self.differsTemplate.render(a=a, b=b)
+
+
+typeInfos = dict([(typeInfo.typeName, typeInfo) for typeInfo in (
+    TypeInfo('CGFloat',
+             packedStorage=('CGFloat', None,),
+             editorType='PARAMETER_TYPE_FLOAT',
+             resetValue='0.f',
+             zeroValue='0.f',
+             sparseField='floatValue',
+             formatter='FormatFloat'),
+    TypeInfo('int',
+             packedStorage=('int', None,),
+             editorType='PARAMETER_TYPE_INT',
+             resetValue='0',
+             zeroValue='0',
+             sparseField='intValue',
+             formatter='FormatInt'),
+    TypeInfo('BOOL',
+             packedStorage=('unsigned char', 1,),
+             editorType='PARAMETER_TYPE_BOOLEAN',
+             resetValue='NO',
+             zeroValue='NO',
+             formatter='FormatBoolean'),
+    TypeInfo('HAlign',
+             packedStorage=('uint8_t', None,),
+             editorType='PARAMETER_TYPE_ENUM',
+             enumValues=('H_ALIGN_LEFT', 'H_ALIGN_CENTER', 'H_ALIGN_RIGHT',),
+             displayFormatter='FormatHAlign',
+             resetValue='H_ALIGN_CENTER',
+             zeroValue='H_ALIGN_LEFT',
+             formatter='ReprHAlign'),
+    TypeInfo('VAlign',
+             packedStorage=('uint8_t', None,),
+             editorType='PARAMETER_TYPE_ENUM',
+             enumValues=('V_ALIGN_TOP', 'V_ALIGN_CENTER', 'V_ALIGN_BOTTOM',),
+             displayFormatter='FormatVAlign',
+             resetValue='V_ALIGN_CENTER',
+             zeroValue='V_ALIGN_TOP',
+             formatter='ReprVAlign'),
+    TypeInfo('CellPositioningMode',
+             packedStorage=('uint8_t', None,),
+             editorType='PARAMETER_TYPE_ENUM',
+             enumValues=('CELL_POSITIONING_NORMAL',
+                         'CELL_POSITIONING_FILL',
+                         'CELL_POSITIONING_FILL_W_ASPECT_RATIO',
+                         'CELL_POSITIONING_FIT_W_ASPECT_RATIO',),
+             displayFormatter='FormatCellPositioningMode',
+             resetValue='CELL_POSITIONING_NORMAL',
+             zeroValue='CELL_POSITIONING_NORMAL',
+             formatter='ReprCellPositioningMode'),
+    TypeInfo('NSString *',
+             zeroValue='nil',
+             equalsTemplate=Template('(${a} == ${b} || [${a} isEqual:${b}])'),
+             differsTemplate=Template('!(${a} == ${b} || [${a} isEqual:${b}])')),
+    # Only used by custom accessors.
+    TypeInfo('CGSize',
+             zeroValue='CGSizeZero',
+             equalsTemplate=Template('CGSizeEqualToSize(${a}, ${b})'),
+             differsTemplate=Template('!CGSizeEqualToSize(${a}, ${b})')),
+    )])
+
+
+def typeInfoForName(typeName):
+    if typeName not in typeInfos:
+        raise Exception('Unknown typeName: %s' % typeName)
+    return typeInfos[typeName]
+
+
+def formatSubsetters(customAccessor):
+    subsetters = []
+    for index, propertyName in enumerate(customAccessor.propertyNames()):
+        valueName = 'value'
+        if customAccessor.setterValues:
+            valueName += customAccessor.setterValues[index]
+        subsetters.append('    [self set%s:%s];' % (UpperName(propertyName), valueName,))
+    return '\n'.join(subsetters)
 
-# --------
 
-lines = []
-lines.append('')
-lines.append('')
-for propertyGroup in view_propertyGroups:
-    for property in propertyGroup:
-        if property.comments:
-            lines.extend(FormatComments(property.comments))
+def formatCustomAccessorComments(customAccessor):
+    return FormatComments(['Convenience accessor(s) for the %s properties.' % FormatList(customAccessor.propertyNames())])
+
+
+getterDeclarationTemplate = Template('- (${typeName})${name};')
+setterDeclarationTemplate = Template('- (${returnType})set${upperName}:(${typeName})value;')
+customSetterDeclarationTemplate = Template('- (${returnType})set${upperName}:(${typeName})value;\n')
+
+
+def renderCustomAccessorDeclarations(writer, customAccessors, returnType, layoutOnly=False):
+    for customAccessor in customAccessors:
+        if layoutOnly and not customAccessor.layoutProperty:
+            continue
+        writer.lines(formatCustomAccessorComments(customAccessor))
         # Getter
-        lines.append('- (%s)%s;' % (property.typeName, property.name, ))
+        if customAccessor.getterValue:
+            writer.template(getterDeclarationTemplate, typeName=customAccessor.typeName, name=customAccessor.name)
         # Setter
-        lines.append('- (UIView *)set%s:(%s)value;' % (property.UpperName(), property.typeName, ))
+        writer.template(customSetterDeclarationTemplate, returnType=returnType, upperName=customAccessor.UpperName(), typeName=customAccessor.typeName)
 
-    lines.append('')
 
-for customAccessor in view_customAccessors:
-    comments = []
-    comments.append('Convenience accessor(s) for the %s properties.' % FormatList(customAccessor.propertyNames()))
-    lines.extend(FormatComments(comments))
-    # Getter
-    if customAccessor.getterValue:
-        lines.append('- (%s)%s;' % (customAccessor.typeName, customAccessor.name, ))
-    # Setter
-    lines.append('- (UIView *)set%s:(%s)value;\n' % (customAccessor.UpperName(), customAccessor.typeName, ))
-lines.append('')
-block = '\n'.join(lines)
-
-replaceBlock(hFilePath, 'Start', 'End', block)
+def renderViewInfoHBlock(tables):
+    writer = BlockWriter()
+    writer.line()
+    writer.line()
+    for propertyGroup in tables.view_propertyGroups:
+        for property in propertyGroup:
+            if property.comments:
+                writer.lines(FormatComments(property.comments))
+            writer.line('@property (nonatomic) %s;' % FormatDeclaration(property.typeName, property.name))
+        writer.line()
+
+    renderCustomAccessorDeclarations(writer, tables.view_customAccessors, 'void')
+    writer.line(layoutSnapshotDeclaration)
+    writer.line()
+    writer.line()
+    return writer.getvalue()
+
+
+def renderViewHBlock(tables):
+    writer = BlockWriter()
+    writer.line()
+    writer.line()
+    for propertyGroup in tables.view_propertyGroups:
+        for property in propertyGroup:
+            if property.comments:
+                writer.lines(FormatComments(property.comments))
+            writer.template(getterDeclarationTemplate, typeName=property.typeName, name=property.name)
+            writer.template(setterDeclarationTemplate, returnType='UIView *', upperName=property.UpperName(), typeName=property.typeName)
+        writer.line()
+
+    renderCustomAccessorDeclarations(writer, tables.view_customAccessors, 'UIView *')
+    writer.lines(FormatComments('All of this view\'s layout-relevant properties, read with a single associated object lookup.'))
+    writer.line(layoutSnapshotDeclaration)
+    writer.line()
+    writer.line()
+    return writer.getvalue()
+
+
+# What a change to a property invalidates, from least to most (see the
+# LayoutInvalidation enum):
+#
+# none: Nothing, ie. debug properties.
+# position: Only where the container (the superview of a view, or the view a
+#           layout is bound to) positions its subviews, ie. alignment.
+# size: The desired size of the container too.  Only the container is laid
+#       out again, as with position.
+# full: Anything else.  The container and every WeView that contains it are
+#       laid out again.  The default.
+invalidationClasses = ('none', 'position', 'size', 'full',)
 
-# --------
+viewInvalidationTemplate = 'InvalidateViewLayout(self, viewInfo, %s);'
+layoutInvalidationTemplate = '[self invalidateLayout:%s];'
+
+
+def formatInvalidation(invalidationTemplate, invalidation, indent):
+    # The statement is preceded by a newline so that properties that
+    # invalidate nothing don't leave a blank line behind.
+    if invalidation == 'none':
+        return ''
+    return '\n' + indent + invalidationTemplate % ('LAYOUT_INVALIDATION_' + invalidation.upper(), )
 
-lines = []
-lines.append('')
 
-for propertyGroup in view_propertyGroups:
-    for property in propertyGroup:
-        if property.extraSetterLine:
-            lines.append('''
-- (void)set%s:(%s)value
+viewInfoInitTemplate = Template('''
+- (id)init
 {
-    _%s = value;
-    %s
-}''' % (property.UpperName(), property.typeName, property.name, property.extraSetterLine, ))
-
-for customAccessor in view_customAccessors:
-    asserts = ''
-    #     if pseudoProperty.asserts:
-    #         if type(pseudoProperty.asserts) == types.StringType:
-    #             asserts ='\n    WeViewAssert(%s);' % (property.asserts % 'value', )
-    #             pass
-    #         else:
-    #             raise Exception('Unknown asserts: %s' % str(property.asserts))
-
-    if customAccessor.getterValue:
-        lines.append('''
-- (%s)%s
+    if (self = [super init])
+    {${defaultAssignments}
+    }
+
+    return self;
+}''')
+viewInfoExtraSetterTemplate = Template('''
+- (void)set${upperName}:(${typeName})value
+{
+    _${name} = value;
+    ${extraSetterLine}
+}''')
+viewInfoCustomGetterTemplate = Template('''
+- (${typeName})${name}
 {
-    return %s;
-}''' % (customAccessor.typeName, customAccessor.name, customAccessor.getterValue, ))
+    return ${getterValue};
+}''')
+viewInfoCustomSetterTemplate = Template('''
+- (void)set${upperName}:(${typeName})value
+{
+${subsetters}
+}''')
+
+
+def viewDefaultValue(property):
+    # The value of a view property on a fresh WeViewViewInfo, which is also what
+    # the getters return for views without one.  Object properties start nil
+    # whatever their defaultValue, since callers test them (eg. debugName) for nil.
+    typeInfo = typeInfoForName(property.typeName)
+    if property.defaultValue and not typeInfo.isObject():
+        return property.defaultValue
+    return typeInfo.zeroValue
+
+
+def renderViewInfoMBlock(tables):
+    writer = BlockWriter()
+    writer.line()
+
+    isSparse = tables.viewInfoStorage == 'sparse'
+    if isSparse:
+        valueProperties, inlineProperties, objectProperties = sparseViewInfoProperties(tables)
+        # Properties are compared by name, since each read of a table through a
+        # DependencyRecorder wraps its entries anew.
+        valuePropertyNames = set([property.name for property in valueProperties])
+        renderSparseViewInfoIvars(writer, valueProperties, inlineProperties)
+
+    # With sparse storage, absent values already have their defaults.
+    defaultAssignments = []
+    for propertyGroup in tables.view_propertyGroups:
+        for property in propertyGroup:
+            if isSparse and property.name in valuePropertyNames:
+                continue
+            defaultValue = viewDefaultValue(property)
+            if defaultValue != typeInfoForName(property.typeName).zeroValue:
+                defaultAssignments.append('\n        self.%s = %s;' % (property.name, defaultValue, ))
+    if defaultAssignments:
+        writer.template(viewInfoInitTemplate, defaultAssignments=''.join(defaultAssignments))
+
+    if isSparse:
+        renderSparseViewInfoAccessors(writer, valueProperties, inlineProperties)
+    else:
+        for propertyGroup in tables.view_propertyGroups:
+            for property in propertyGroup:
+                if property.extraSetterLine:
+                    writer.template(viewInfoExtraSetterTemplate,
+                                    upperName=property.UpperName(),
+                                    typeName=property.typeName,
+                                    name=property.name,
+                                    extraSetterLine=property.extraSetterLine)
+
+    for customAccessor in tables.view_customAccessors:
+        if customAccessor.getterValue:
+            writer.template(viewInfoCustomGetterTemplate,
+                            typeName=customAccessor.typeName,
+                            name=customAccessor.name,
+                            getterValue=customAccessor.getterValue)
+        writer.template(viewInfoCustomSetterTemplate,
+                        upperName=customAccessor.UpperName(),
+                        typeName=customAccessor.typeName,
+                        subsetters=formatSubsetters(customAccessor))
+
+    writer.line()
+    writer.line(layoutSnapshotDeclaration[:-1])
+    writer.line('{')
+    if isSparse:
+        writer.line('    // The values are stored in bit order, so they can be read in a single pass.')
+        writer.line('    const %s *value = _values;' % sparseValueTypeName)
+    writer.line('    %s snapshot;' % layoutSnapshotTypeName)
+    for property in layoutSnapshotProperties(tables):
+        if not isSparse:
+            value = '_%s' % property.name
+        elif property.name in valuePropertyNames:
+            value = '(_valueMask & %s) ? (value++)->%s : %s' % (sparseValueBitName(property),
+                                                                  typeInfoForName(property.typeName).sparseField,
+                                                                  viewDefaultValue(property), )
+        else:
+            value = '(%s) _%s' % (property.typeName, property.name, )
+        writer.line('    snapshot.%s = %s;' % (property.name, value, ))
+    writer.line('    return snapshot;')
+    writer.line('}')
+
+    writer.line()
+    writer.line()
+    return writer.getvalue()
 
-    subsetters = []
-    for index, propertyName in enumerate(customAccessor.propertyNames()):
-        valueName = 'value'
-        if customAccessor.setterValues:
-            valueName += customAccessor.setterValues[index]
-        subsetters.append('    [self set%s:%s];' % (UpperName(propertyName), valueName,))
 
-    lines.append('''
-- (void)set%s:(%s)value
+# Sparse view info storage (see viewInfoStorageModes).  The values of value
+# properties live in a heap-allocated array of WeViewViewInfoValues, in the
+# order of their bits in the presence bitmask, _valueMask.
+sparseValueTypeName = 'WeViewViewInfoValue'
+
+# The (maximum value count, C type, popcount builtin) of each size of presence
+# bitmask.
+sparseValueMaskTypes = ((32, 'uint32_t', '__builtin_popcount',),
+                        (64, 'uint64_t', '__builtin_popcountll',),)
+
+sparseViewInfoStorageTemplate = Template('''
+typedef union
 {
-%s
-}''' % (customAccessor.UpperName(), customAccessor.typeName, '\n'.join(subsetters), ))
+${fields}
+} ${valueTypeName};
 
-lines.append('')
-lines.append('')
-block = '\n'.join(lines)
+${bits}
 
-replaceBlock(viewInfomFilePath, 'View Info M Start', 'View Info M End', block)
+// The number of values present in a value mask.
+static inline NSUInteger ${valueTypeName}Count(${maskType} valueMask)
+{
+    return ${popcount}(valueMask);
+}
 
-# --------
+// The index of a value in the values array, ie. the number of values present
+// before it.
+static inline NSUInteger ${valueTypeName}Index(${maskType} valueMask, ${maskType} bit)
+{
+    return ${popcount}(valueMask & (bit - 1));
+}''')
+sparseViewInfoIvarsTemplate = Template('''
+{
+    ${valueTypeName} *_values;
+    ${maskType} _valueMask;${bitfields}
+}''')
+sparseViewInfoStorageMethodsTemplate = Template('''
+- (void)dealloc
+{
+    free(_values);
+}
 
-lines = []
-lines.append('')
-for propertyGroup in view_propertyGroups:
-    for property in propertyGroup:
-        asserts = ''
-        if property.asserts:
-            if type(property.asserts) == types.StringType:
-                asserts ='\n    WeViewAssert(%s);' % (property.asserts % 'value', )
-                pass
-            else:
-                raise Exception('Unknown asserts: %s' % str(property.asserts))
-        defaultValue = ''
-        if property.defaultValue:
-            defaultValue = ' defaultValue:%s' % property.defaultValue
-        lines.append('''
-- (%s)%s
+// Returns the storage of a value, inserting it if it isn't present.
+- (${valueTypeName} *)insertValue:(${maskType})bit
 {
-    return [self.viewInfo %s];
+    NSUInteger index = ${valueTypeName}Index(_valueMask, bit);
+    if (!(_valueMask & bit))
+    {
+        NSUInteger count = ${valueTypeName}Count(_valueMask);
+        _values = realloc(_values, (count + 1) * sizeof(${valueTypeName}));
+        memmove(_values + index + 1, _values + index, (count - index) * sizeof(${valueTypeName}));
+        _valueMask |= bit;
+    }
+    return _values + index;
 }
 
-- (UIView *)set%s:(%s)value
+// Removes a value, if present, so that its property has its default value.
+- (void)removeValue:(${maskType})bit
 {
-    [self.viewInfo set%s:value];
-    [self.superview setNeedsLayout];
-    return self;
-}''' % (property.typeName, property.name, property.name, property.UpperName(), property.typeName, property.UpperName(), ))
-
-for customAccessor in view_customAccessors:
-    asserts = ''
-    #     if pseudoProperty.asserts:
-    #         if type(pseudoProperty.asserts) == types.StringType:
-    #             asserts ='\n    WeViewAssert(%s);' % (property.asserts % 'value', )
-    #             pass
-    #         else:
-    #             raise Exception('Unknown asserts: %s' % str(property.asserts))
-
-    # Getter
-    if customAccessor.getterValue:
-        lines.append('''
-- (%s)%s
+    if (!(_valueMask & bit))
+    {
+        return;
+    }
+    NSUInteger index = ${valueTypeName}Index(_valueMask, bit);
+    NSUInteger count = ${valueTypeName}Count(_valueMask) - 1;
+    memmove(_values + index, _values + index + 1, (count - index) * sizeof(${valueTypeName}));
+    _valueMask &= ~bit;
+    if (count == 0)
+    {
+        free(_values);
+        _values = NULL;
+    }
+    else
+    {
+        _values = realloc(_values, count * sizeof(${valueTypeName}));
+    }
+}''')
+sparseViewInfoValueAccessorsTemplate = Template('''
+- (${typeName})${name}
 {
-    return [self.viewInfo %s];
-}''' % (customAccessor.typeName, customAccessor.name, customAccessor.name, ))
-    # Setter
-    subsetters = []
-    for index, propertyName in enumerate(customAccessor.propertyNames()):
-        valueName = 'value'
-        if customAccessor.setterValues:
-            valueName += customAccessor.setterValues[index]
-        subsetters.append('    [self set%s:%s];' % (UpperName(propertyName), valueName,))
+    return (_valueMask & ${bit}) ? _values[${valueTypeName}Index(_valueMask, ${bit})].${field} : ${defaultValue};
+}
 
-    lines.append('''
-- (UIView *)set%s:(%s)value
+- (void)set${upperName}:(${typeName})value
+{
+    if (${isDefault})
+    {
+        [self removeValue:${bit}];
+    }
+    else
+    {
+        [self insertValue:${bit}]->${field} = value;
+    }${extraSetterLine}
+}''')
+sparseViewInfoInlineAccessorsTemplate = Template('''
+- (${typeName})${name}
 {
-%s
-    [self.superview setNeedsLayout];
+    return (${typeName}) _${name};
+}
+
+- (void)set${upperName}:(${typeName})value
+{
+    _${name} = ${storedValue};${extraSetterLine}
+}''')
+
+
+def inlineBitWidth(typeInfo):
+    # The width of the bitfield that sparse storage keeps a property of the
+    # type in, or None.  Enum values are assumed to be 0..n-1.
+    if typeInfo.enumValues:
+        return max(1, (len(typeInfo.enumValues) - 1).bit_length())
+    if typeInfo.packedStorage:
+        return typeInfo.packedStorage[1]
+    return None
+
+
+def sparseViewInfoProperties(tables):
+    # Returns the (value, inline, object) properties of sparse storage, ie.
+    # those stored in the values array, in bitfields and in (synthesized)
+    # ivars.
+    valueProperties, inlineProperties, objectProperties = [], [], []
+    for propertyGroup in tables.view_propertyGroups:
+        for property in propertyGroup:
+            typeInfo = typeInfoForName(property.typeName)
+            if typeInfo.isObject():
+                objectProperties.append(property)
+            elif typeInfo.sparseField:
+                valueProperties.append(property)
+            elif inlineBitWidth(typeInfo):
+                inlineProperties.append(property)
+            else:
+                raise Exception('Sparse view info storage does not support: %s' % property.typeName)
+    return valueProperties, inlineProperties, objectProperties
+
+
+def sparseValueMaskType(valueProperties):
+    # Returns the (C type, popcount builtin) of the presence bitmask.
+    for maxCount, typeName, popcount in sparseValueMaskTypes:
+        if len(valueProperties) <= maxCount:
+            return typeName, popcount
+    raise Exception('Sparse view info storage supports at most %d value properties, not %d' % (
+        sparseValueMaskTypes[-1][0], len(valueProperties), ))
+
+
+def sparseValueFields(valueProperties):
+    # Returns the (typeName, field) of each WeViewViewInfoValue field in use.
+    fields = []
+    for property in valueProperties:
+        field = (property.typeName, typeInfoForName(property.typeName).sparseField,)
+        if field not in fields:
+            fields.append(field)
+    return fields
+
+
+def sparseValueBitName(property):
+    return 'k%s_%s' % (sparseValueTypeName, property.name, )
+
+
+def renderViewInfoStorageBlock(tables):
+    writer = BlockWriter()
+    writer.line()
+    if tables.viewInfoStorage == 'sparse':
+        valueProperties, _, _ = sparseViewInfoProperties(tables)
+        maskType, popcount = sparseValueMaskType(valueProperties)
+        sizes32, sizes64 = viewInfoStorageSizes(tables, False), viewInfoStorageSizes(tables, True)
+        writer.lines(FormatComments('WeViewViewInfo only stores the values that differ from their defaults: %d bytes plus %d bytes per value on 64-bit, %d bytes plus %d bytes per value on 32-bit (vs. %d and %d bytes dense).' % (
+            sizes64[1], sizes64[2], sizes32[1], sizes32[2], sizes64[0], sizes32[0], )))
+        writer.template(sparseViewInfoStorageTemplate,
+                        fields='\n'.join(['    %s;' % FormatDeclaration(typeName, field) for typeName, field in sparseValueFields(valueProperties)]),
+                        valueTypeName=sparseValueTypeName,
+                        bits='\n'.join(['static const %s %s = ((%s) 1) << %d;' % (maskType, sparseValueBitName(property), maskType, index, )
+                                        for index, property in enumerate(valueProperties)]),
+                        maskType=maskType,
+                        popcount=popcount)
+        writer.line()
+    writer.line()
+    return writer.getvalue()
+
+
+def renderSparseViewInfoIvars(writer, valueProperties, inlineProperties):
+    maskType, _ = sparseValueMaskType(valueProperties)
+    writer.template(sparseViewInfoIvarsTemplate,
+                    valueTypeName=sparseValueTypeName,
+                    maskType=maskType,
+                    bitfields=''.join(['\n    unsigned int _%s : %d;' % (property.name, inlineBitWidth(typeInfoForName(property.typeName)), )
+                                       for property in inlineProperties]))
+
+
+def formatExtraSetterLine(property):
+    if not property.extraSetterLine:
+        return ''
+    return '\n    ' + property.extraSetterLine
+
+
+def renderSparseViewInfoAccessors(writer, valueProperties, inlineProperties):
+    maskType, _ = sparseValueMaskType(valueProperties)
+    writer.template(sparseViewInfoStorageMethodsTemplate,
+                    valueTypeName=sparseValueTypeName,
+                    maskType=maskType)
+    for property in valueProperties:
+        typeInfo = typeInfoForName(property.typeName)
+        defaultValue = viewDefaultValue(property)
+        writer.template(sparseViewInfoValueAccessorsTemplate,
+                        typeName=property.typeName,
+                        name=property.name,
+                        upperName=property.UpperName(),
+                        bit=sparseValueBitName(property),
+                        valueTypeName=sparseValueTypeName,
+                        field=typeInfo.sparseField,
+                        defaultValue=defaultValue,
+                        isDefault=typeInfo.equals('value', defaultValue),
+                        extraSetterLine=formatExtraSetterLine(property))
+    for property in inlineProperties:
+        typeInfo = typeInfoForName(property.typeName)
+        storedValue = 'value'
+        if not typeInfo.enumValues and inlineBitWidth(typeInfo) == 1:
+            storedValue = typeInfo.packedValue('value')
+        writer.template(sparseViewInfoInlineAccessorsTemplate,
+                        typeName=property.typeName,
+                        name=property.name,
+                        upperName=property.UpperName(),
+                        storedValue=storedValue,
+                        extraSetterLine=formatExtraSetterLine(property))
+
+
+def ivarStorageTypeName(typeInfo):
+    # The C type that a synthesized ivar of the type is laid out as.
+    if typeInfo.isObject():
+        return 'id'
+    if typeInfo.enumValues:
+        return 'int'
+    return typeInfo.packedStorage[0]
+
+
+def viewInfoStorageSizes(tables, is64Bit):
+    # Returns (dense size, sparse size, sparse value size): the bytes of
+    # WeViewViewInfo's generated ivars with dense and sparse storage, and the
+    # bytes each value adds to the latter's values array (allocator overhead
+    # aside).  Ivars are laid out in declaration order, like C struct fields.
+    denseFields = [(ivarStorageTypeName(typeInfoForName(property.typeName)), None,)
+                   for propertyGroup in tables.view_propertyGroups for property in propertyGroup]
+
+    valueProperties, inlineProperties, objectProperties = sparseViewInfoProperties(tables)
+    sparseFields = [('id', None,), (sparseValueMaskType(valueProperties)[0], None,)]
+    sparseFields.extend([('unsigned int', inlineBitWidth(typeInfoForName(property.typeName)),) for property in inlineProperties])
+    sparseFields.extend([('id', None,) for property in objectProperties])
+
+    valueFields = [(typeInfoForName(typeName).packedStorage[0], None,) for typeName, _ in sparseValueFields(valueProperties)]
+    valueSize = max([structSize([field], is64Bit) for field in valueFields] or [0])
+    return structSize(denseFields, is64Bit), structSize(sparseFields, is64Bit), valueSize
+
+
+def formatViewInfoStorageSizes(tables):
+    # Returns a summary of WeViewViewInfo's storage and what sparse storage
+    # saves per instance over dense storage.
+    (dense32, sparse32, value32), (dense64, sparse64, value64) = viewInfoStorageSizes(tables, False), viewInfoStorageSizes(tables, True)
+    if tables.viewInfoStorage == 'sparse':
+        summary = 'WeViewViewInfo (sparse): %d bytes + %d per value on 64-bit, %d bytes + %d per value on 32-bit.' % (
+            sparse64, value64, sparse32, value32, )
+        verb = 'saves'
+    else:
+        summary = 'WeViewViewInfo (dense): %d bytes on 64-bit, %d bytes on 32-bit.' % (dense64, dense32, )
+        verb = 'would save'
+    return [summary,
+            'Sparse storage %s %d bytes - %d per value on 64-bit, %d bytes - %d per value on 32-bit per instance.' % (
+                verb, dense64 - sparse64, value64, dense32 - sparse32, value32, )]
+
+
+# Getters never allocate a view info; views that have never set a property
+# have its default value.
+viewGetterTemplate = Template('''
+- (${typeName})${name}
+{
+    WeViewViewInfo *viewInfo = [self existingViewInfo];
+    return viewInfo ? [viewInfo ${name}] : ${defaultValue};
+}''')
+# Setters compare with the getter, so setting an unchanged value doesn't
+# allocate a view info either.
+viewSetterTemplate = Template('''
+- (UIView *)set${upperName}:(${typeName})value
+{
+    if (${differs})
+    {
+        WeViewViewInfo *viewInfo = self.viewInfo;
+        [viewInfo set${upperName}:value];${invalidation}
+    }
     return self;
-}''' % (customAccessor.UpperName(), customAccessor.typeName, '\n'.join(subsetters), ))
+}''')
+# Properties with an extraSetterLine but no extraSetterDiffers always assign,
+# since the setter has side effects even if the value doesn't change.
+viewUncheckedSetterTemplate = Template('''
+- (UIView *)set${upperName}:(${typeName})value
+{
+    WeViewViewInfo *viewInfo = self.viewInfo;
+    [viewInfo set${upperName}:value];${invalidation}
+    return self;
+}''')
+# The getter values of custom accessors only read properties, which UIView has
+# allocation-free getters for.
+viewCustomGetterTemplate = Template('''
+- (${typeName})${name}
+{
+    return ${getterValue};
+}''')
+viewCustomSetterTemplate = Template('''
+- (UIView *)set${upperName}:(${typeName})value
+{
+    [self beginLayoutUpdates];
+${subsetters}
+    [self endLayoutUpdates];
+    return self;
+}''')
 
-lines.append('')
-lines.append('')
-block = '\n'.join(lines)
 
-replaceBlock(mFilePath, 'Accessors Start', 'Accessors End', block)
+def renderViewAccessorsBlock(tables):
+    writer = BlockWriter()
+    writer.line()
+    for propertyGroup in tables.view_propertyGroups:
+        for property in propertyGroup:
+            writer.template(viewGetterTemplate,
+                            typeName=property.typeName,
+                            name=property.name,
+                            defaultValue=viewDefaultValue(property))
+            differs = typeInfoForName(property.typeName).differs('[self %s]' % property.name, 'value')
+            if property.extraSetterLine and not property.extraSetterDiffers:
+                template, indent = viewUncheckedSetterTemplate, '    '
+            else:
+                template, indent = viewSetterTemplate, '        '
+                if property.extraSetterDiffers:
+                    differs = '%s || %s' % (differs, property.extraSetterDiffers, )
+            writer.template(template,
+                            typeName=property.typeName,
+                            name=property.name,
+                            upperName=property.UpperName(),
+                            differs=differs,
+                            invalidation=formatInvalidation(viewInvalidationTemplate, property.invalidation, indent))
+
+    for customAccessor in tables.view_customAccessors:
+        # Getter
+        if customAccessor.getterValue:
+            writer.template(viewCustomGetterTemplate,
+                            typeName=customAccessor.typeName,
+                            name=customAccessor.name,
+                            getterValue=customAccessor.getterValue)
+        # Setter
+        writer.template(viewCustomSetterTemplate,
+                        upperName=customAccessor.UpperName(),
+                        typeName=customAccessor.typeName,
+                        subsetters=formatSubsetters(customAccessor))
+
+    writer.template(viewLayoutSnapshotTemplate,
+                    typeName=layoutSnapshotTypeName,
+                    defaultFields=''.join(['\n        .%s = %s,' % (property.name, viewDefaultValue(property), )
+                                           for property in layoutSnapshotProperties(tables)]))
+
+    writer.line()
+    writer.line()
+    return writer.getvalue()
+
+
+# The layout snapshot is a plain struct of every layout-relevant (ie. non-object)
+# view property, so that layouts can read all of a subview's sizing inputs with
+# a single associated object lookup.
+layoutSnapshotTypeName = 'WeViewLayoutSnapshot'
+layoutSnapshotDeclaration = '- (%s)layoutSnapshot;' % layoutSnapshotTypeName
+viewLayoutSnapshotTemplate = Template('''
+- (${typeName})layoutSnapshot
+{
+    WeViewViewInfo *viewInfo = [self existingViewInfo];
+    if (!viewInfo)
+    {
+        static const ${typeName} defaultSnapshot = {${defaultFields}
+        };
+        return defaultSnapshot;
+    }
+    return [viewInfo layoutSnapshot];
+}''')
 
-# --------
 
-lines = []
-lines.append('')
-lines.append('')
-for propertyGroup in view_propertyGroups:
-    for property in propertyGroup:
-        value = '@(self.%s)' % property.name
-        if property.typeName.endswith(' *'):
-            value = 'self.%s' % property.name
-        lines.append('    [result appendString:[self formatLayoutDescriptionItem:@"%s" value:%s]];' % (property.name, value, ))
+def layoutSnapshotProperties(tables):
+    return [property for propertyGroup in tables.view_propertyGroups for property in propertyGroup
+            if not typeInfoForName(property.typeName).isObject()]
 
-lines.append('')
-lines.append('')
-block = '\n'.join(lines)
 
-replaceBlock(viewInfomFilePath, 'View Info Debug Start', 'View Info Debug End', block)
+def renderLayoutSnapshotBlock(tables):
+    writer = BlockWriter()
+    writer.line()
+    writer.lines(FormatComments('The layout-relevant properties of a view.  See -[UIView layoutSnapshot].'))
+    writer.line('typedef struct')
+    writer.line('{')
+    for property in layoutSnapshotProperties(tables):
+        writer.line('    %s;' % FormatDeclaration(property.typeName, property.name))
+    writer.line('} %s;' % layoutSnapshotTypeName)
+    writer.line()
+    writer.line()
+    return writer.getvalue()
 
-# --------
 
-def createViewEditorControllerParameters(propertyGroups, blockStartKey, blockEndKey, itemCast):
-    lines = []
-    lines.append('')
-    for propertyGroup in propertyGroups:
+viewInfoDebugTemplate = Template('    [result appendString:[self formatLayoutDescriptionItem:@"${name}" value:${value}]];')
+
+
+def renderViewInfoDebugBlock(tables):
+    writer = BlockWriter()
+    writer.line()
+    writer.line()
+    for propertyGroup in tables.view_propertyGroups:
         for property in propertyGroup:
-            if property.typeName == 'CGFloat':
-                doubleHeight = " doubleHeight:YES" if property.doubleHeight else ""
-                lines.append('''
-                                [ViewParameterSimple floatProperty:@"%s"%s],''' % (property.name, doubleHeight, ) )
-            elif property.typeName == 'int':
-                doubleHeight = " doubleHeight:YES" if property.doubleHeight else ""
-                lines.append('''
-                                [ViewParameterSimple intProperty:@"%s"%s],''' % (property.name, doubleHeight, ) )
-            elif property.typeName == 'BOOL':
-                lines.append('''
-                                [ViewParameterSimple booleanProperty:@"%s"],''' % (property.name, ) )
-
-            elif property.typeName == 'HAlign':
-                lines.append('''
-                                [ViewParameterSimple create:@"%s"
-                                                getterBlock:^NSString *(id item) {
-                                                    return FormatHAlign(%s.%s);
-                                                }
-                                                    setters:@[
-                                 [ViewParameterSetter create:@"Left"
-                                                 setterBlock:^(id item) {
-                                                     %s.%s = H_ALIGN_LEFT;
-                                                 }],
-                                 [ViewParameterSetter create:@"Center"
-                                                 setterBlock:^(id item) {
-                                                     %s.%s = H_ALIGN_CENTER;
-                                                 }],
-                                 [ViewParameterSetter create:@"Right"
-                                                 setterBlock:^(id item) {
-                                                     %s.%s = H_ALIGN_RIGHT;
-                                                 }],
-                                 ]
-                                 doubleHeight:YES],
-                                 ''' % (property.name, itemCast, property.name, itemCast, property.name, itemCast, property.name, itemCast, property.name, ) )
-            elif property.typeName == 'VAlign':
-                lines.append('''
-                                [ViewParameterSimple create:@"%s"
-                                                getterBlock:^NSString *(id item) {
-                                                    return FormatVAlign(%s.%s);
-                                                }
-                                                    setters:@[
-                                 [ViewParameterSetter create:@"Top"
-                                                 setterBlock:^(id item) {
-                                                     %s.%s = V_ALIGN_TOP;
-                                                 }],
-                                 [ViewParameterSetter create:@"Center"
-                                                 setterBlock:^(id item) {
-                                                     %s.%s = V_ALIGN_CENTER;
-                                                 }],
-                                 [ViewParameterSetter create:@"Bottom"
-                                                 setterBlock:^(id item) {
-                                                     %s.%s = V_ALIGN_BOTTOM;
-                                                 }],
-                                 ]
-                                 doubleHeight:YES],
-                                 ''' % (property.name, itemCast, property.name, itemCast, property.name, itemCast, property.name, itemCast, property.name, ) )
-            elif property.typeName == 'CellPositioningMode':
-                lines.append('''
-                                [ViewParameterSimple create:@"%s"
-                                                getterBlock:^NSString *(id item) {
-                                                    return FormatCellPositioningMode(%s.%s);
-                                                }
-                                                    setters:@[
-                                 [ViewParameterSetter create:FormatCellPositioningMode(CELL_POSITIONING_NORMAL)
-                                                 setterBlock:^(id item) {
-                                                     %s.%s = CELL_POSITIONING_NORMAL;
-                                                 }],
-                                 [ViewParameterSetter create:FormatCellPositioningMode(CELL_POSITIONING_FILL)
-                                                 setterBlock:^(id item) {
-                                                     %s.%s = CELL_POSITIONING_FILL;
-                                                 }],
-                                 [ViewParameterSetter create:FormatCellPositioningMode(CELL_POSITIONING_FILL_W_ASPECT_RATIO)
-                                                 setterBlock:^(id item) {
-                                                     %s.%s = CELL_POSITIONING_FILL_W_ASPECT_RATIO;
-                                                 }],
-                                 [ViewParameterSetter create:FormatCellPositioningMode(CELL_POSITIONING_FIT_W_ASPECT_RATIO)
-                                                 setterBlock:^(id item) {
-                                                     %s.%s = CELL_POSITIONING_FIT_W_ASPECT_RATIO;
-                                                 }],
-                                 ]
-                                 doubleHeight:YES],
-                                 ''' % (property.name, itemCast, property.name, itemCast, property.name, itemCast, property.name, itemCast, property.name, itemCast, property.name, ) )
-            else:
-                print 'Unknown typeName(1):', property.typeName, property.name
+            value = 'self.%s' % property.name
+            if not typeInfoForName(property.typeName).isObject():
+                value = '@(%s)' % value
+            writer.template(viewInfoDebugTemplate, name=property.name, value=value)
 
-            # value = '@(self.%s)' % property.name
-            # if property.typeName.endswith(' *'):
-            #     value = 'self.%s' % property.name
-            # lines.append('    [result appendString:[self formatLayoutDescriptionItem:@"%s" value:%s]];' % (property.name, value, ))
-            pass
-    lines.append('')
-    lines.append('')
-    block = '\n'.join(lines)
+    writer.line()
+    writer.line()
+    return writer.getvalue()
 
-    replaceBlock(ViewEditorController_mFilePath, blockStartKey, blockEndKey, block)
 
-createViewEditorControllerParameters(view_propertyGroups, 'View Parameters Start', 'View Parameters End', '((UIView *) item)')
-createViewEditorControllerParameters(layout_propertyGroups, 'Layout Parameters Start', 'Layout Parameters End', '((WeViewLayout *) item)')
+# ViewEditorController builds its property parameters from static descriptor
+# tables rather than a literal tree of parameters and blocks.  Enum types get a
+# table of their values and a formatter with a common signature.
+enumParameterFormatterTemplate = Template('''
+static NSString *${displayFormatter}Parameter(int value)
+{
+    return ${displayFormatter}((${typeName}) value);
+}
 
-# --------
+static const int k${typeName}ParameterValues[] = {
+${values}
+};''')
+parameterDescriptorTemplate = Template('    { "${name}", ${editorType}, ${doubleHeight}, ${enumValues}, ${enumValueCount}, ${formatter}, },')
+
+
+def editorProperties(propertyGroups):
+    return [property for propertyGroup in propertyGroups for property in propertyGroup
+            if typeInfoForName(property.typeName).editorType]
+
+
+def renderParameterDescriptorTable(writer, propertyGroups, tableName, countName):
+    writer.line()
+    writer.line('static const ParameterDescriptor %s[] = {' % tableName)
+    for property in editorProperties(propertyGroups):
+        typeInfo = typeInfoForName(property.typeName)
+        if typeInfo.enumValues:
+            # Enum parameters are always double height.
+            writer.template(parameterDescriptorTemplate,
+                            name=property.name,
+                            editorType=typeInfo.editorType,
+                            doubleHeight='YES',
+                            enumValues='k%sParameterValues' % typeInfo.typeName,
+                            enumValueCount=str(len(typeInfo.enumValues)),
+                            formatter='%sParameter' % typeInfo.displayFormatter)
+        else:
+            writer.template(parameterDescriptorTemplate,
+                            name=property.name,
+                            editorType=typeInfo.editorType,
+                            doubleHeight='YES' if property.doubleHeight else 'NO',
+                            enumValues='NULL',
+                            enumValueCount='0',
+                            formatter='NULL')
+    writer.line('};')
+    writer.line('static const int %s = sizeof(%s) / sizeof(%s[0]);' % (countName, tableName, tableName, ))
+
+
+def renderParameterDescriptorsBlock(tables):
+    writer = BlockWriter()
+    writer.line()
+    enumTypeNames = []
+    for property in editorProperties(tables.view_propertyGroups) + editorProperties(tables.layout_propertyGroups):
+        if typeInfoForName(property.typeName).enumValues and property.typeName not in enumTypeNames:
+            enumTypeNames.append(property.typeName)
+    for typeName in enumTypeNames:
+        typeInfo = typeInfoForName(typeName)
+        writer.template(enumParameterFormatterTemplate,
+                        displayFormatter=typeInfo.displayFormatter,
+                        typeName=typeName,
+                        values='\n'.join(['    %s,' % value for value in typeInfo.enumValues]))
+
+    renderParameterDescriptorTable(writer, tables.view_propertyGroups, 'kViewParameterDescriptors', 'kViewParameterDescriptorCount')
+    renderParameterDescriptorTable(writer, tables.layout_propertyGroups, 'kLayoutParameterDescriptors', 'kLayoutParameterDescriptorCount')
+    writer.line()
+    writer.line()
+    return writer.getvalue()
+
+
+def renderLayoutHBlock(tables):
+    writer = BlockWriter()
+    writer.line()
+    writer.line()
+    for propertyGroup in tables.layout_propertyGroups:
+        hasGroup = False
+        for property in propertyGroup:
+            if not property.layoutProperty:
+                continue
+            hasGroup = True
+            if property.comments:
+                writer.lines(FormatComments(property.comments))
+            writer.template(getterDeclarationTemplate, typeName=property.typeName, name=property.name)
+            writer.template(setterDeclarationTemplate, returnType='WeViewLayout *', upperName=property.UpperName(), typeName=property.typeName)
+
+        if hasGroup:
+            writer.line()
+
+    renderCustomAccessorDeclarations(writer, tables.layout_customAccessors, 'WeViewLayout *', layoutOnly=True)
+    writer.line()
+    return writer.getvalue()
+
+
+# WeViewLayout keeps its (non-object) layout properties in a single packed
+# struct so that copying and resetting a configuration are single struct
+# assignments.  The fields are ordered by alignment, enums use narrow storage
+# and BOOLs are bitfields.
+layoutConfigTypeName = 'WeViewLayoutConfig'
+layoutDefaultConfigName = 'kWeViewLayoutDefaultConfig'
+
+# The (size, alignment) in bytes of each storage type on 32-bit and 64-bit.
+packedStorageSizes = {
+    'CGFloat': ((4, 4,), (8, 8,),),
+    'int': ((4, 4,), (4, 4,),),
+    'unsigned int': ((4, 4,), (4, 4,),),
+    'uint8_t': ((1, 1,), (1, 1,),),
+    'unsigned char': ((1, 1,), (1, 1,),),
+    'uint32_t': ((4, 4,), (4, 4,),),
+    'uint64_t': ((8, 8,), (8, 8,),),
+    'id': ((4, 4,), (8, 8,),),
+}
 
-lines = []
-lines.append('')
-lines.append('')
-for propertyGroup in layout_propertyGroups:
-    hasGroup = False
-    for property in propertyGroup:
-        if not property.layoutProperty:
-            continue
-        hasGroup = True
-        if property.comments:
-            lines.extend(FormatComments(property.comments))
-        # Getter
-        lines.append('- (%s)%s;' % (property.typeName, property.name, ))
-        # Setter
-        lines.append('- (WeViewLayout *)set%s:(%s)value;' % (property.UpperName(), property.typeName, ))
 
-    if hasGroup:
-        lines.append('')
+def isPackedLayoutProperty(property):
+    return property.layoutProperty and typeInfoForName(property.typeName).packedStorage is not None
 
-for customAccessor in layout_customAccessors:
-    if not customAccessor.layoutProperty:
-        continue
 
-    comments = []
-    comments.append('Convenience accessor(s) for the %s properties.' % FormatList(customAccessor.propertyNames()))
-    lines.extend(FormatComments(comments))
-    # Getter
-    if customAccessor.getterValue:
-        lines.append('- (%s)%s;' % (customAccessor.typeName, customAccessor.name, ))
-    # Setter
-    lines.append('- (WeViewLayout *)set%s:(%s)value;\n' % (customAccessor.UpperName(), customAccessor.typeName, ))
-lines.append('')
-block = '\n'.join(lines)
-block = block.replace('\n\n\n', '\n\n')
-
-replaceBlock(WeViewLayout_hFilePath, 'Start', 'End', block)
+def packedLayoutProperties(tables):
+    properties = [property for propertyGroup in tables.layout_propertyGroups for property in propertyGroup
+                  if isPackedLayoutProperty(property)]
 
-# --------
+    def sortKey(property):
+        storageTypeName, bitWidth = typeInfoForName(property.typeName).packedStorage
+        return (bitWidth is not None, -packedStorageSizes[storageTypeName][1][1],)
+    return sorted(properties, key=sortKey)
 
-lines = []
-lines.append('')
-lines.append('')
-for propertyGroup in layout_propertyGroups:
-    hasGroup = False
-    for property in propertyGroup:
-        if not property.layoutProperty:
-            continue
-        hasGroup = True
-        # Getter
-        lines.append('%s _%s;' % (property.typeName, property.name, ))
 
-    if hasGroup:
-        lines.append('')
-lines.append('')
-block = '\n'.join(lines)
+def packedStructSize(properties, is64Bit):
+    # The size in bytes of a struct of the packed properties.
+    return structSize([typeInfoForName(property.typeName).packedStorage for property in properties], is64Bit)
 
-replaceBlock(WeViewLayout_mFilePath, 'Members Start', 'Members End', block)
 
+def structSize(fields, is64Bit):
+    # The size in bytes of a struct of (storage type, bit width or None)
+    # fields, following the usual C layout rules: fields are aligned to their
+    # size and bitfields share a storage unit of their type until it is full.
+    bitOffset = 0
+    structAlignment = 1
+    for storageTypeName, bitWidth in fields:
+        size, alignment = packedStorageSizes[storageTypeName][1 if is64Bit else 0]
+        structAlignment = max(structAlignment, alignment)
+        if bitWidth is None:
+            alignmentBits = alignment * 8
+            bitOffset = ((bitOffset + alignmentBits - 1) // alignmentBits) * alignmentBits
+            bitOffset += size * 8
+        else:
+            unitBits = size * 8
+            if (bitOffset % unitBits) + bitWidth > unitBits:
+                bitOffset = ((bitOffset + unitBits - 1) // unitBits) * unitBits
+            bitOffset += bitWidth
+    size = (bitOffset + 7) // 8
+    return ((size + structAlignment - 1) // structAlignment) * structAlignment
+
+
+def layoutConfigSizes(tables):
+    # Returns the size in bytes of the packed layout config on 32-bit and 64-bit.
+    properties = packedLayoutProperties(tables)
+    return packedStructSize(properties, False), packedStructSize(properties, True)
+
+
+def renderLayoutConfigBlock(tables):
+    properties = packedLayoutProperties(tables)
+    writer = BlockWriter()
+    writer.line()
+    writer.lines(FormatComments('The packed layout properties of a layout: %d bytes on 64-bit, %d bytes on 32-bit.' % (
+        packedStructSize(properties, True), packedStructSize(properties, False), )))
+    writer.line('typedef struct')
+    writer.line('{')
+    for property in properties:
+        storageTypeName, bitWidth = typeInfoForName(property.typeName).packedStorage
+        declaration = FormatDeclaration(storageTypeName, property.name)
+        if bitWidth is not None:
+            declaration += ' : %d' % bitWidth
+        writer.line('    %s;' % declaration)
+    writer.line('} %s;' % layoutConfigTypeName)
+    writer.line()
+    writer.line('static const %s %s = {' % (layoutConfigTypeName, layoutDefaultConfigName, ))
+    for property in properties:
+        typeInfo = typeInfoForName(property.typeName)
+        writer.line('    .%s = %s,' % (property.name, property.defaultValue or typeInfo.resetValue, ))
+    writer.line('};')
+    writer.line()
+    writer.line()
+    return writer.getvalue()
+
+
+def renderLayoutMembersBlock(tables):
+    writer = BlockWriter()
+    writer.line()
+    writer.line()
+    writer.line('%s _config;' % layoutConfigTypeName)
+    writer.line()
+    for propertyGroup in tables.layout_propertyGroups:
+        hasGroup = False
+        for property in propertyGroup:
+            if not property.layoutProperty or isPackedLayoutProperty(property):
+                continue
+            hasGroup = True
+            writer.line('%s;' % FormatDeclaration(property.typeName, '_' + property.name))
 
-# --------
+        if hasGroup:
+            writer.line()
+    writer.line()
+    return writer.getvalue()
 
-lines = []
-lines.append('')
-for propertyGroup in layout_propertyGroups:
-    for property in propertyGroup:
-        if not property.layoutProperty:
-            continue
-        asserts = ''
-        if property.asserts:
-            if type(property.asserts) == types.StringType:
-                asserts ='\n    WeViewAssert(%s);' % (property.asserts % 'value', )
-                pass
-            else:
-                raise Exception('Unknown asserts: %s' % str(property.asserts))
-        defaultValue = ''
-        if property.defaultValue:
-            defaultValue = ' defaultValue:%s' % property.defaultValue
-        lines.append('''
-- (%s)%s
+
+layoutAccessorsTemplate = Template('''
+- (${typeName})${name}
 {
-    return _%s;
-}''' % (property.typeName, property.name, property.name, ))
-        lines.append('''
-- (WeViewLayout *)set%s:(%s)value
+    return ${storedValue};
+}
+
+- (WeViewLayout *)set${upperName}:(${typeName})value
 {
-    _%s = value;
-    [self._superview setNeedsLayout];
+    if (${differs})
+    {
+        ${storage} = ${newValue};${invalidation}
+    }
     return self;
-}''' % (property.UpperName(), property.typeName, property.name, ))
-
-for customAccessor in layout_customAccessors:
-    if not customAccessor.layoutProperty:
-        continue
-    # Getter
-    if customAccessor.getterValue:
-        lines.append('''
-- (%s)%s:(UIView *)view
+}''')
+layoutCustomGetterTemplate = Template('''
+- (${typeName})${name}:(UIView *)view
 {
-    return [view %s];
-}''' % (customAccessor.typeName, customAccessor.name, customAccessor.name, ))
-    # Setter
-    subsetters = []
-    for index, propertyName in enumerate(customAccessor.propertyNames()):
-        valueName = 'value'
-        if customAccessor.setterValues:
-            valueName += customAccessor.setterValues[index]
-        subsetters.append('    [self set%s:%s];' % (UpperName(propertyName), valueName,))
-
-    lines.append('''
-- (WeViewLayout *)set%s:(%s)value
+    return [view ${name}];
+}''')
+layoutCustomSetterTemplate = Template('''
+- (WeViewLayout *)set${upperName}:(${typeName})value
 {
-%s
-    [self._superview setNeedsLayout];
+    [self beginLayoutUpdates];
+${subsetters}
+    [self endLayoutUpdates];
     return self;
-}''' % (customAccessor.UpperName(), customAccessor.typeName, '\n'.join(subsetters), ))
+}''')
 
-lines.append('')
-lines.append('')
-block = '\n'.join(lines)
 
-replaceBlock(WeViewLayout_mFilePath, 'Accessors Start', 'Accessors End', block)
+def renderLayoutAccessorsBlock(tables):
+    writer = BlockWriter()
+    writer.line()
+    for propertyGroup in tables.layout_propertyGroups:
+        for property in propertyGroup:
+            if not property.layoutProperty:
+                continue
+            if property.extraSetterLine:
+                raise Exception('extraSetterLine is not supported for layout properties: %s' % property.name)
+            typeInfo = typeInfoForName(property.typeName)
+            if isPackedLayoutProperty(property):
+                storage = '_config.' + property.name
+                storedValue = typeInfo.unpackedValue(storage)
+                newValue = typeInfo.packedValue('value')
+            else:
+                storage = storedValue = '_' + property.name
+                newValue = 'value'
+            writer.template(layoutAccessorsTemplate,
+                            typeName=property.typeName,
+                            name=property.name,
+                            upperName=property.UpperName(),
+                            storage=storage,
+                            storedValue=storedValue,
+                            newValue=newValue,
+                            differs=typeInfo.differs(storage, newValue),
+                            invalidation=formatInvalidation(layoutInvalidationTemplate, property.invalidation, '        '))
+
+    for customAccessor in tables.layout_customAccessors:
+        if not customAccessor.layoutProperty:
+            continue
+        # Getter
+        if customAccessor.getterValue:
+            writer.template(layoutCustomGetterTemplate,
+                            typeName=customAccessor.typeName,
+                            name=customAccessor.name)
+        # Setter
+        writer.template(layoutCustomSetterTemplate,
+                        upperName=customAccessor.UpperName(),
+                        typeName=customAccessor.typeName,
+                        subsetters=formatSubsetters(customAccessor))
+
+    writer.line()
+    writer.line()
+    return writer.getvalue()
+
+
+def renderLayoutCopyConfigurationBlock(tables):
+    writer = BlockWriter()
+    writer.line()
+    writer.line()
+    writer.line('    _config = layout->_config;')
+    for propertyGroup in tables.layout_propertyGroups:
+        for property in propertyGroup:
+            if isPackedLayoutProperty(property):
+                continue
+            writer.line('    self.%s = layout.%s;' % (property.name, property.name, ))
+    writer.line('    %s' % (layoutInvalidationTemplate % 'LAYOUT_INVALIDATION_FULL', ))
+    writer.line()
+    writer.line()
+    return writer.getvalue()
+
+
+def renderLayoutResetBlock(tables):
+    writer = BlockWriter()
+    writer.line()
+    writer.line()
+    writer.line('    _config = %s;' % layoutDefaultConfigName)
+    for propertyGroup in tables.layout_propertyGroups:
+        for property in propertyGroup:
+            if isPackedLayoutProperty(property):
+                continue
+            resetValue = property.defaultValue or typeInfoForName(property.typeName).resetValue
+            if resetValue is None:
+                continue
+            writer.line('    self.%s = %s;' % (property.name, resetValue, ))
+    writer.line('    %s' % (layoutInvalidationTemplate % 'LAYOUT_INVALIDATION_FULL', ))
+    writer.line()
+    writer.line()
+    return writer.getvalue()
+
+
+codeGenerationPropertyTemplate = Template('''
+    if (${differs})
+    {
+        [lines addObject:[NSString stringWithFormat:@"%@:%@", @"set${upperName}", ${formatter}(${item}.${name})]];
+    }''')
+codeGenerationCustomAccessorTemplate = Template('''
+    if ([self doDecorations:lines haveLinesWithPrefixes:${linePrefixes}] &&
+        ${comparisons})
+    {
+        lines = [self removeLines:lines withPrefixes:${linePrefixes}];
+        [lines addObject:[NSString stringWithFormat:@"%@:%@", @"set${upperName}", ${formatter}(${item}.${name})]];
+    }''')
 
-# --------
 
-lines = []
-lines.append('')
-lines.append('')
-for propertyGroup in layout_propertyGroups:
-    for property in propertyGroup:
-        lines.append('    self.%s = layout.%s;' % (property.name, property.name, ))
-lines.append('')
-lines.append('')
-block = '\n'.join(lines)
+def renderCodeGenerationBlock(propertyGroups, customAccessors, item, virginItem):
+    writer = BlockWriter()
+    writer.line()
+    for propertyGroup in propertyGroups:
+        for property in propertyGroup:
+            typeInfo = typeInfoForName(property.typeName)
+            if typeInfo.formatter:
+                writer.template(codeGenerationPropertyTemplate,
+                                differs=typeInfo.differs('%s.%s' % (item, property.name, ), '%s.%s' % (virginItem, property.name, )),
+                                upperName=property.UpperName(),
+                                formatter=typeInfo.formatter,
+                                item=item,
+                                name=property.name)
+
+    writer.line()
+    writer.line('    // Custom Accessors')
+    writer.line()
+
+    for customAccessor in reversed(customAccessors):
+        typeInfo = typeInfoForName(customAccessor.typeName)
+        if typeInfo.formatter:
+            propertyNames = customAccessor.propertyNames()
+            linePrefixes = '@[' + (', '.join(['@"set%s:"' % UpperName(propertyName) for propertyName in propertyNames])) + ']'
+            comparisons = ' && '.join([typeInfo.equals('%s.%s' % (item, propertyNames[0], ), '%s.%s' % (item, propertyName, ))
+                                       for propertyName in propertyNames[1:]])
+            writer.template(codeGenerationCustomAccessorTemplate,
+                            linePrefixes=linePrefixes,
+                            comparisons=comparisons,
+                            upperName=customAccessor.UpperName(),
+                            formatter=typeInfo.formatter,
+                            item=item,
+                            name=propertyNames[0])
+
+    writer.line()
+    writer.line()
+    return writer.getvalue()
+
+
+def renderViewCodeGenerationBlock(tables):
+    return renderCodeGenerationBlock(tables.view_propertyGroups, tables.view_customAccessors, 'view', 'virginView')
+
+
+def renderLayoutCodeGenerationBlock(tables):
+    return renderCodeGenerationBlock(tables.layout_propertyGroups, tables.layout_customAccessors, 'layout', 'virginLayout')
 
-replaceBlock(WeViewLayout_mFilePath, 'Copy Configuration Start', 'Copy Configuration End', block)
 
 # --------
 
-lines = []
-lines.append('')
-lines.append('')
-for propertyGroup in layout_propertyGroups:
-    for property in propertyGroup:
-        defaultValue = ''
-        if property.typeName == 'CGFloat':
-            defaultValue = '0.f'
-        elif property.typeName == 'int':
-            defaultValue = '0'
-        elif property.typeName == 'BOOL':
-            defaultValue = 'NO'
-        elif property.typeName == 'HAlign':
-            defaultValue = 'H_ALIGN_CENTER'
-        elif property.typeName == 'VAlign':
-            defaultValue = 'V_ALIGN_CENTER'
-        elif property.typeName == 'CellPositioningMode':
-            defaultValue = 'CELL_POSITIONING_NORMAL'
-        elif property.typeName == 'NSString *':
-            continue
-        else:
-            print 'Reset layout, Unknown typeName(2):', property.typeName, property.name
-        lines.append('    self.%s = %s;' % (property.name, defaultValue, ))
-lines.append('')
-lines.append('')
-block = '\n'.join(lines)
+class BlockSpec:
+    # A generated block: the target file (a TargetPaths attribute), its
+    # markers and the function that renders it from the property tables.
+    def __init__(self, fileKey, blockStartKey, blockEndKey, render):
+        self.fileKey = fileKey
+        self.blockStartKey = blockStartKey
+        self.blockEndKey = blockEndKey
+        self.render = render
+
+    def blockKey(self):
+        return (self.fileKey, self.blockStartKey,)
+
+
+blockSpecs = (
+    BlockSpec('viewInfohFilePath', 'View Info Storage Start', 'View Info Storage End', renderViewInfoStorageBlock),
+    BlockSpec('viewInfohFilePath', 'View Info H Start', 'View Info H End', renderViewInfoHBlock),
+    BlockSpec('hFilePath', 'Layout Snapshot Start', 'Layout Snapshot End', renderLayoutSnapshotBlock),
+    BlockSpec('hFilePath', 'Start', 'End', renderViewHBlock),
+    BlockSpec('viewInfomFilePath', 'View Info M Start', 'View Info M End', renderViewInfoMBlock),
+    BlockSpec('mFilePath', 'Accessors Start', 'Accessors End', renderViewAccessorsBlock),
+    BlockSpec('viewInfomFilePath', 'View Info Debug Start', 'View Info Debug End', renderViewInfoDebugBlock),
+    BlockSpec('ViewEditorController_mFilePath', 'Parameter Descriptors Start', 'Parameter Descriptors End', renderParameterDescriptorsBlock),
+    BlockSpec('WeViewLayout_hFilePath', 'Start', 'End', renderLayoutHBlock),
+    BlockSpec('WeViewLayout_mFilePath', 'Config Start', 'Config End', renderLayoutConfigBlock),
+    BlockSpec('WeViewLayout_mFilePath', 'Members Start', 'Members End', renderLayoutMembersBlock),
+    BlockSpec('WeViewLayout_mFilePath', 'Accessors Start', 'Accessors End', renderLayoutAccessorsBlock),
+    BlockSpec('WeViewLayout_mFilePath', 'Copy Configuration Start', 'Copy Configuration End', renderLayoutCopyConfigurationBlock),
+    BlockSpec('WeViewLayout_mFilePath', 'Reset Start', 'Reset End', renderLayoutResetBlock),
+    BlockSpec('DemoCodeGeneration_mFilePath', 'Code Generation View Properties Start', 'Code Generation View Properties End', renderViewCodeGenerationBlock),
+    BlockSpec('DemoCodeGeneration_mFilePath', 'Code Generation Layout Properties Start', 'Code Generation Layout Properties End', renderLayoutCodeGenerationBlock),
+)
+
+
+# Below this many properties starting a pool of worker processes costs more
+# than rendering every block serially.
+parallelRenderMinProperties = 400
+
+
+def countProperties(tables):
+    return (sum([len(group) for group in tables.view_propertyGroups]) +
+            sum([len(group) for group in tables.layout_propertyGroups]))
+
+
+def resolveRenderJobs(renderJobs, tables):
+    # renderJobs is the number of worker processes to render blocks with; 1
+    # renders them serially in this process and None uses one per CPU.  0
+    # picks between the two based on the size of the tables.
+    if renderJobs != 0:
+        return renderJobs
+    if countProperties(tables) < parallelRenderMinProperties:
+        return 1
+    return None
+
+
+def renderBlockAt(tables, blockIndex, recordDependencies):
+    # Returns (block, dependencies, seconds); dependencies is None unless
+    # recordDependencies is set.
+    blockSpec = blockSpecs[blockIndex]
+    startTime = time.time()
+    if recordDependencies:
+        block, dependencies = renderBlock(blockSpec, tables)
+    else:
+        block, dependencies = blockSpec.render(tables), None
+    return block, dependencies, time.time() - startTime
 
-replaceBlock(WeViewLayout_mFilePath, 'Reset Start', 'Reset End', block)
 
-# --------
+# The tables of a render worker process, set once per pool by
+# initRenderWorker() rather than pickled with every job.
+renderWorkerTables = None
 
 
-def formatMethodNameForType(typeName):
-    if typeName == 'CGFloat':
-        return 'FormatFloat'
-    elif typeName == 'int':
-        return 'FormatInt'
-    elif typeName == 'BOOL':
-        return 'FormatBoolean'
-    elif typeName == 'HAlign':
-        return 'ReprHAlign'
-    elif typeName == 'VAlign':
-        return 'ReprVAlign'
-    elif typeName == 'CellPositioningMode':
-        return 'ReprCellPositioningMode'
-    # elif property.typeName == 'CellPositioningMode':
-    else:
-        print 'Unknown typeName(3):', typeName
+def initRenderWorker(tables):
+    global renderWorkerTables
+    renderWorkerTables = tables
 
 
-lines = []
-lines.append('')
-for propertyGroup in view_propertyGroups:
-    for property in propertyGroup:
-        if formatMethodNameForType(property.typeName):
-            lines.append('''
-    if (view.%s != virginView.%s)
-    {
-        [lines addObject:[NSString stringWithFormat:@"%s", @"set%s", %s(view.%s)]];
-    }''' % ( property.name, property.name, '%@:%@', property.UpperName(), formatMethodNameForType(property.typeName), property.name, ))
-
-lines.append('')
-lines.append('    // Custom Accessors')
-lines.append('')
-
-for customAccessor in reversed(view_customAccessors):
-    if formatMethodNameForType(customAccessor.typeName):
-
-        linePrefixes = []
-        for propName in customAccessor.propertyList:
-            linePrefixes.append('@"set%s%s:"' % ( propName[0].upper(), propName[1:]))
-        linePrefixes = '@[' + (', '.join(linePrefixes)) + ']'
-
-        comparisons = []
-        for prop in customAccessor.propertyList[1:]:
-            comparisons.append('view.%s == view.%s' % ( customAccessor.propertyList[0], prop, ) )
-        comparisons = ' && '.join(comparisons)
-        lines.append('''
-    if ([self doDecorations:lines haveLinesWithPrefixes:%s] &&
-        %s)
-    {
-        lines = [self removeLines:lines withPrefixes:%s];
-        [lines addObject:[NSString stringWithFormat:@"%s", @"set%s", %s(view.%s)]];
-    }''' % ( linePrefixes, comparisons, linePrefixes,
-             '%@:%@', customAccessor.UpperName(), formatMethodNameForType(customAccessor.typeName), customAccessor.propertyList[0], ))
+def runRenderJob(job):
+    blockIndex, recordDependencies = job
+    return renderBlockAt(renderWorkerTables, blockIndex, recordDependencies)
+
 
-lines.append('')
-lines.append('')
+def renderBlockSpecs(tables, blockIndices, recordDependencies=False, renderJobs=1):
+    # Renders blockSpecs[blockIndex] for each of blockIndices, across a pool
+    # of worker processes unless renderJobs resolves to 1 (see
+    # resolveRenderJobs()).  The blocks only read the (immutable) tables, so
+    # they can be rendered in any order; results are returned in blockIndices
+    # order so that merging them is deterministic.
+    jobs = [(blockIndex, recordDependencies,) for blockIndex in blockIndices]
+    renderJobs = resolveRenderJobs(renderJobs, tables)
+    if renderJobs == 1 or len(jobs) < 2:
+        return [renderBlockAt(tables, blockIndex, recordDependencies) for blockIndex, recordDependencies in jobs]
 
-block = '\n'.join(lines)
+    pool = multiprocessing.Pool(renderJobs, initializer=initRenderWorker, initargs=(tables,))
+    try:
+        return pool.map(runRenderJob, jobs, chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def planBlocks(targetPaths, tables, stats=None, renderJobs=1):
+    # Rendering and splicing are separate steps: blocks are rendered
+    # (possibly concurrently), then merged into the edit plan in blockSpecs
+    # order.
+    editPlan = EditPlan(stats=stats)
+    results = renderBlockSpecs(tables, range(len(blockSpecs)), renderJobs=renderJobs)
+    for blockSpec, (block, _, seconds) in zip(blockSpecs, results):
+        filePath = getattr(targetPaths, blockSpec.fileKey)
+        if stats is not None:
+            stats.recordRender(filePath, blockSpec.blockStartKey, seconds)
+        editPlan.replaceBlock(filePath,
+                              blockSpec.blockStartKey,
+                              blockSpec.blockEndKey,
+                              block)
+    return editPlan
+
+
+def buildEditPlan(rootPath, tables, stats=None, renderJobs=1):
+    return planBlocks(TargetPaths(rootPath), tables, stats=stats, renderJobs=renderJobs)
 
-replaceBlock(DemoCodeGeneration_mFilePath, 'Code Generation View Properties Start', 'Code Generation View Properties End', block)
 
 # --------
 
-lines = []
-lines.append('')
-for propertyGroup in layout_propertyGroups:
-    for property in propertyGroup:
-        # if not property.layoutProperty:
-        #     continue
+class DependencyRecorder:
+    # Stands in for a PropertyTables while a block is rendered and records
+    # what the block reads.  A dependency is a (tableName, entryName,
+    # fieldName) tuple; (tableName, None, None) is the structure of a table,
+    # ie. the names and order of its entries, and (optionName, None, None) is
+    # the value of a spec option.
+    def __init__(self, tables):
+        self.tables = tables
+        self.dependencies = set()
+
+    def __getattr__(self, tableName):
+        if tableName in specOptionNames:
+            self.dependencies.add((tableName, None, None,))
+            return getattr(self.tables, tableName)
+        if tableName not in tableNames:
+            raise AttributeError(tableName)
+        self.dependencies.add((tableName, None, None,))
+        table = getattr(self.tables, tableName)
+        if isPropertyGroupsTable(tableName):
+            return tuple([tuple([RecordingEntry(self, tableName, entry) for entry in group]) for group in table])
+        return tuple([RecordingEntry(self, tableName, entry) for entry in table])
+
+
+class RecordingEntry:
+    # Wraps a Property or CustomAccessor, recording each field that is read.
+    def __init__(self, recorder, tableName, entry):
+        self._recorder = recorder
+        self._tableName = tableName
+        self._entry = entry
+
+    def __getattr__(self, fieldName):
+        entry = self._entry
+        if fieldName in entry.__dict__:
+            self._recorder.dependencies.add((self._tableName, entry.name, fieldName,))
+            return entry.__dict__[fieldName]
+        method = entry.__class__.__dict__.get(fieldName)
+        if method is None:
+            raise AttributeError(fieldName)
+        # Bind methods (ie. UpperName()) to the wrapper so that the fields
+        # they read are recorded too.
+        return types.MethodType(method, self)
+
+
+def isPropertyGroupsTable(tableName):
+    return tableName.endswith('_propertyGroups')
+
+
+def renderBlock(blockSpec, tables):
+    # Returns the rendered block and the (frozen) set of its dependencies.
+    recorder = DependencyRecorder(tables)
+    block = blockSpec.render(recorder)
+    return block, frozenset(recorder.dependencies)
+
+
+def diffPropertyTables(oldTables, newTables):
+    # Returns the set of dependencies (see DependencyRecorder) whose values
+    # differ between two sets of tables.
+    changes = set()
+    for optionName in specOptionNames:
+        if getattr(oldTables, optionName) != getattr(newTables, optionName):
+            changes.add((optionName, None, None,))
+    for tableName in tableNames:
+        oldTable = getattr(oldTables, tableName)
+        newTable = getattr(newTables, tableName)
+        if isPropertyGroupsTable(tableName):
+            oldStructure = [[entry.name for entry in group] for group in oldTable]
+            newStructure = [[entry.name for entry in group] for group in newTable]
+            oldEntries = [entry for group in oldTable for entry in group]
+            newEntries = [entry for group in newTable for entry in group]
+        else:
+            oldStructure = [entry.name for entry in oldTable]
+            newStructure = [entry.name for entry in newTable]
+            oldEntries = oldTable
+            newEntries = newTable
+        if oldStructure != newStructure:
+            changes.add((tableName, None, None,))
+
+        oldEntryMap = dict([(entry.name, entry) for entry in oldEntries])
+        for newEntry in newEntries:
+            oldEntry = oldEntryMap.get(newEntry.name)
+            if oldEntry is None:
+                # Covered by the structure change.
+                continue
+            oldFields = vars(oldEntry)
+            newFields = vars(newEntry)
+            for fieldName in set(oldFields) | set(newFields):
+                if oldFields.get(fieldName) != newFields.get(fieldName):
+                    changes.add((tableName, newEntry.name, fieldName,))
+    return changes
+
+
+def statFile(filePath):
+    stat = os.stat(filePath)
+    return (stat.st_mtime, stat.st_size,)
+
+
+def generatorFingerprint():
+    # Incremental state is only valid for the generator that produced it.
+    sourcePath = os.path.abspath(__file__)
+    if sourcePath.endswith('.pyc') or sourcePath.endswith('.pyo'):
+        sourcePath = sourcePath[:-1]
+    with open(sourcePath, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def incrementalStatePath(rootPath, specPath=None):
+    # The state of the last incremental run of a root (and spec).
+    stateKey = '%s\n%s' % (rootPath, os.path.abspath(specPath) if specPath else '', )
+    return os.path.join(os.path.dirname(defaultSpecPath),
+                        '.codegen-cache',
+                        'state-%s.pickle' % hashlib.sha1(stateKey.encode('utf-8')).hexdigest())
+
+
+def generateIncrementally(rootPath, specPath=None, stats=None, renderJobs=0):
+    # Like generate(), but only re-renders the blocks that depend on a table
+    # entry that changed since the last incremental run of this root, or
+    # whose target file was modified since.  The tables and dependencies of
+    # the last run are kept in the cache folder next to the default spec.
+    #
+    # Returns the list of files that changed and the keys of the blocks
+    # that were rendered.
+    targetPaths = TargetPaths(rootPath)
+    startTime = time.time()
+    tables = loadPropertyTables(specPath)
+    if stats is not None:
+        stats.loadSeconds += time.time() - startTime
+
+    statePath = incrementalStatePath(targetPaths.rootPath, specPath)
+    fingerprint = generatorFingerprint()
+    state = readCacheFile(statePath)
+    if state is not None and state['fingerprint'] != fingerprint:
+        state = None
+    changes = diffPropertyTables(state['tables'], tables) if state is not None else None
+
+    blockDependencies = {}
+    staleBlockIndices = []
+    filePaths = []
+    for blockIndex, blockSpec in enumerate(blockSpecs):
+        blockKey = blockSpec.blockKey()
+        filePath = os.path.realpath(getattr(targetPaths, blockSpec.fileKey))
+        if filePath not in filePaths:
+            filePaths.append(filePath)
+        if state is not None and blockKey in state['blockDependencies']:
+            dependencies = state['blockDependencies'][blockKey]
+            if (not (dependencies & changes) and
+                state['fileStats'].get(filePath) == statFile(filePath)):
+                blockDependencies[blockKey] = dependencies
+                continue
+        staleBlockIndices.append(blockIndex)
+
+    editPlan = EditPlan(stats=stats)
+    renderedBlockKeys = []
+    results = renderBlockSpecs(tables, staleBlockIndices, recordDependencies=True, renderJobs=renderJobs)
+    for blockIndex, (block, dependencies, seconds) in zip(staleBlockIndices, results):
+        blockSpec = blockSpecs[blockIndex]
+        blockKey = blockSpec.blockKey()
+        filePath = getattr(targetPaths, blockSpec.fileKey)
+        blockDependencies[blockKey] = dependencies
+        if stats is not None:
+            stats.recordRender(filePath, blockSpec.blockStartKey, seconds)
+        editPlan.replaceBlock(filePath, blockSpec.blockStartKey, blockSpec.blockEndKey, block)
+        renderedBlockKeys.append(blockKey)
+
+    changedFilePaths = editPlan.apply()
+
+    writeCacheFile(statePath, {
+        'fingerprint': fingerprint,
+        'tables': tables,
+        'blockDependencies': blockDependencies,
+        'fileStats': dict([(filePath, statFile(filePath)) for filePath in filePaths]),
+    })
+    return changedFilePaths, renderedBlockKeys
+
+
+def resolvePropertyTables(specPath=None,
+                          view_propertyGroups=None,
+                          layout_propertyGroups=None,
+                          view_customAccessors=None,
+                          layout_customAccessors=None,
+                          viewInfoStorage=None):
+    # Tables and options passed explicitly take precedence over those of the
+    # spec(s).  The spec is only loaded if something isn't passed.
+    if viewInfoStorage is not None and viewInfoStorage not in viewInfoStorageModes:
+        raise Exception('Unknown viewInfoStorage: %s' % viewInfoStorage)
+    tables = (view_propertyGroups,
+              layout_propertyGroups,
+              view_customAccessors,
+              layout_customAccessors,
+              )
+    if None not in tables and viewInfoStorage is not None:
+        return PropertyTables(*tables, viewInfoStorage=viewInfoStorage)
+    result = loadPropertyTables(specPath)
+    for tableName, table in zip(tableNames, tables):
+        if table is not None:
+            setattr(result, tableName, table)
+    if viewInfoStorage is not None:
+        result.viewInfoStorage = viewInfoStorage
+    return result
 
-        if formatMethodNameForType(property.typeName):
-            lines.append('''
-    if (layout.%s != virginLayout.%s)
-    {
-        [lines addObject:[NSString stringWithFormat:@"%s", @"set%s", %s(layout.%s)]];
-    }''' % ( property.name, property.name, '%@:%@', property.UpperName(), formatMethodNameForType(property.typeName), property.name, ))
-
-lines.append('')
-lines.append('    // Custom Accessors')
-lines.append('')
-
-for customAccessor in reversed(layout_customAccessors):
-    if formatMethodNameForType(customAccessor.typeName):
-
-        linePrefixes = []
-        for propName in customAccessor.propertyList:
-            linePrefixes.append('@"set%s%s:"' % ( propName[0].upper(), propName[1:]))
-        linePrefixes = '@[' + (', '.join(linePrefixes)) + ']'
-
-        comparisons = []
-        for prop in customAccessor.propertyList[1:]:
-            comparisons.append('layout.%s == layout.%s' % ( customAccessor.propertyList[0], prop, ) )
-        comparisons = ' && '.join(comparisons)
-        lines.append('''
-    if ([self doDecorations:lines haveLinesWithPrefixes:%s] &&
-        %s)
-    {
-        lines = [self removeLines:lines withPrefixes:%s];
-        [lines addObject:[NSString stringWithFormat:@"%s", @"set%s", %s(layout.%s)]];
-    }''' % ( linePrefixes, comparisons, linePrefixes,
-             '%@:%@', customAccessor.UpperName(), formatMethodNameForType(customAccessor.typeName), customAccessor.propertyList[0], ))
 
-lines.append('')
-lines.append('')
-#
-block = '\n'.join(lines)
+def generate(rootPath,
+             view_propertyGroups=None,
+             layout_propertyGroups=None,
+             view_customAccessors=None,
+             layout_customAccessors=None,
+             specPath=None,
+             stats=None,
+             renderJobs=0,
+             viewInfoStorage=None):
+    # Regenerates every block under rootPath and returns the list of files
+    # that changed.  Tables and options that aren't passed are loaded from
+    # specPath or the default spec.  If stats (a RunStats) is passed, timings and I/O counters
+    # are recorded in it.  See resolveRenderJobs() for renderJobs.
+    startTime = time.time()
+    tables = resolvePropertyTables(specPath,
+                                   view_propertyGroups,
+                                   layout_propertyGroups,
+                                   view_customAccessors,
+                                   layout_customAccessors,
+                                   viewInfoStorage)
+    if stats is not None:
+        stats.loadSeconds += time.time() - startTime
+    return buildEditPlan(rootPath, tables, stats=stats, renderJobs=renderJobs).apply()
+
+
+def check(rootPath,
+          view_propertyGroups=None,
+          layout_propertyGroups=None,
+          view_customAccessors=None,
+          layout_customAccessors=None,
+          specPath=None,
+          diffFile=None,
+          stats=None,
+          renderJobs=0,
+          viewInfoStorage=None):
+    # Renders every block in memory and returns the list of files under
+    # rootPath whose generated blocks are stale.  Nothing is written to disk.
+    startTime = time.time()
+    tables = resolvePropertyTables(specPath,
+                                   view_propertyGroups,
+                                   layout_propertyGroups,
+                                   view_customAccessors,
+                                   layout_customAccessors,
+                                   viewInfoStorage)
+    if stats is not None:
+        stats.loadSeconds += time.time() - startTime
+    return buildEditPlan(rootPath, tables, stats=stats, renderJobs=renderJobs).check(diffFile=diffFile, rootPath=rootPath)
 
-replaceBlock(DemoCodeGeneration_mFilePath, 'Code Generation Layout Properties Start', 'Code Generation Layout Properties End', block)
 
 # --------
 
-print 'Complete.'
+def readManifest(manifestPath):
+    # A manifest is a JSON file listing the roots to generate, ie.
+    #
+    # {
+    #     "roots": [
+    #         "vendor/WeView2",
+    #         { "root": "forks/WeView2-a", "spec": "forks/a_spec.json" }
+    #     ]
+    # }
+    #
+    # A root's spec overrides any tables it defines.  Relative paths are
+    # relative to the manifest.  Returns a list of (rootPath, specPath)
+    # tuples.
+    with open(manifestPath, 'rt') as f:
+        manifest = json.load(f)
+    manifestFolderPath = os.path.dirname(os.path.abspath(manifestPath))
+
+    def resolvePath(path):
+        return os.path.normpath(os.path.join(manifestFolderPath, path))
+
+    roots = []
+    for entry in manifest.get('roots', []):
+        if isinstance(entry, basestring):
+            roots.append((resolvePath(entry), None,))
+        elif isinstance(entry, dict) and 'root' in entry:
+            specPath = entry.get('spec')
+            if specPath:
+                specPath = resolvePath(specPath)
+            roots.append((resolvePath(entry['root']), specPath,))
+        else:
+            raise Exception('Invalid manifest entry: %s in: %s' % (str(entry), manifestPath, ))
+    return roots
+
+
+def runRootJob(job):
+    # Generates (or checks) a single root.  Runs in a worker process, so it
+    # reports failures in its result rather than raising.
+    rootPath, specPath, checkOnly, showDiff, collectStats, incremental = job
+    result = {
+        'rootPath': rootPath,
+        'filePaths': [],
+        'renderedBlockCount': None,
+        'diff': None,
+        'error': None,
+        'stats': None,
+    }
+    startTime = time.time()
+    stats = RunStats() if collectStats else None
+    # The roots are already spread across processes (and pool workers can't
+    # start pools of their own), so render each root's blocks serially.
+    try:
+        if checkOnly:
+            diffFile = StringIO() if showDiff else None
+            result['filePaths'] = check(rootPath, specPath=specPath, diffFile=diffFile, stats=stats, renderJobs=1)
+            if diffFile is not None:
+                result['diff'] = diffFile.getvalue()
+        elif incremental:
+            # The incremental state is kept per root, so roots don't share it.
+            result['filePaths'], renderedBlockKeys = generateIncrementally(rootPath, specPath=specPath, stats=stats, renderJobs=1)
+            result['renderedBlockCount'] = len(renderedBlockKeys)
+        else:
+            result['filePaths'] = generate(rootPath, specPath=specPath, stats=stats, renderJobs=1)
+    except Exception as e:
+        result['error'] = str(e)
+    result['seconds'] = time.time() - startTime
+    if stats is not None:
+        stats.finish()
+        result['stats'] = stats.asDict(rootPath)
+    return result
+
+
+def generateRoots(jobs, processCount=None):
+    # Runs runRootJob() for each job across a pool of worker processes.
+    # Results are returned in job order.
+    if processCount == 1 or len(jobs) < 2:
+        return [runRootJob(job) for job in jobs]
+
+    pool = multiprocessing.Pool(processCount)
+    try:
+        return pool.map(runRootJob, jobs, chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+
+
+# --------
+
+class Watcher:
+    # Keeps the property tables, rendered blocks and the text and marker
+    # index of each target file in memory, and on each poll() re-splices only
+    # the blocks that are stale.  A block is stale if the spec it is rendered
+    # from changed or if its target file was edited.
+    def __init__(self, rootPath, specPath=None, renderJobs=0):
+        self.rootPath = rootPath
+        self.renderJobs = renderJobs
+        self.targetPaths = TargetPaths(rootPath)
+        self.specPath = specPath
+        self.specPaths = [defaultSpecPath]
+        if specPath and os.path.abspath(specPath) != defaultSpecPath:
+            self.specPaths.append(os.path.abspath(specPath))
+        self.specStats = None
+        self.tables = None
+        # (filePath, blockStartKey) -> dependencies
+        self.blockDependencies = {}
+        # (filePath, blockStartKey) -> (blockEndKey, block)
+        self.renderedBlocks = OrderedDict()
+        # filePath -> (stat, text, markerIndex)
+        self.fileStates = {}
+
+    def renderBlocks(self):
+        # Re-renders the blocks that depend on whatever changed in the tables
+        # and returns the keys of those whose output changed.
+        tables = loadPropertyTables(self.specPath)
+        changes = None
+        if self.tables is not None:
+            changes = diffPropertyTables(self.tables, tables)
+        self.tables = tables
+
+        staleBlockIndices = []
+        for blockIndex, blockSpec in enumerate(blockSpecs):
+            filePath = os.path.realpath(getattr(self.targetPaths, blockSpec.fileKey))
+            blockKey = (filePath, blockSpec.blockStartKey,)
+            if changes is None or self.blockDependencies[blockKey] & changes:
+                staleBlockIndices.append(blockIndex)
+
+        changedBlockKeys = set()
+        results = renderBlockSpecs(tables, staleBlockIndices, recordDependencies=True, renderJobs=self.renderJobs)
+        for blockIndex, (block, dependencies, _) in zip(staleBlockIndices, results):
+            blockSpec = blockSpecs[blockIndex]
+            filePath = os.path.realpath(getattr(self.targetPaths, blockSpec.fileKey))
+            blockKey = (filePath, blockSpec.blockStartKey,)
+            self.blockDependencies[blockKey] = dependencies
+            block = normalizeBlock(block)
+            if self.renderedBlocks.get(blockKey) != (blockSpec.blockEndKey, block,):
+                self.renderedBlocks[blockKey] = (blockSpec.blockEndKey, block,)
+                changedBlockKeys.add(blockKey)
+        return changedBlockKeys
+
+    def readFile(self, filePath):
+        with open(filePath, 'rt') as f:
+            text = f.read()
+        self.fileStates[filePath] = (statFile(filePath), text, MarkerIndex(filePath, text),)
+
+    def poll(self):
+        # Returns a list of (filePath, blockStartKeys) for each file updated.
+        staleBlockKeys = set()
+
+        specStats = [statFile(specPath) for specPath in self.specPaths]
+        if specStats != self.specStats:
+            self.specStats = specStats
+            staleBlockKeys.update(self.renderBlocks())
+
+        # Files edited since the last poll are re-read and re-indexed, and all
+        # of their blocks need to be checked.
+        editedFilePaths = set()
+        for filePath, blockStartKey in self.renderedBlocks:
+            if filePath in editedFilePaths:
+                staleBlockKeys.add((filePath, blockStartKey,))
+                continue
+            fileState = self.fileStates.get(filePath)
+            if fileState is not None and fileState[0] == statFile(filePath):
+                continue
+            self.readFile(filePath)
+            editedFilePaths.add(filePath)
+            staleBlockKeys.add((filePath, blockStartKey,))
+
+        # Only splice blocks whose text on disk actually differs.
+        for blockKey in list(staleBlockKeys):
+            filePath, blockStartKey = blockKey
+            _, text, markerIndex = self.fileStates[filePath]
+            blockEndKey, block = self.renderedBlocks[blockKey]
+            startIndex, endIndex = markerIndex.blockRange(blockStartKey, blockEndKey)
+            if text[startIndex:endIndex] == block:
+                staleBlockKeys.discard(blockKey)
+
+        updates = []
+        staleFilePaths = []
+        for filePath, blockStartKey in self.renderedBlocks:
+            if (filePath, blockStartKey,) in staleBlockKeys and filePath not in staleFilePaths:
+                staleFilePaths.append(filePath)
+        for filePath in staleFilePaths:
+            _, text, markerIndex = self.fileStates[filePath]
+            edits = []
+            for blockKey, (blockEndKey, block) in self.renderedBlocks.items():
+                if blockKey in staleBlockKeys and blockKey[0] == filePath:
+                    edits.append((blockKey[1], blockEndKey, block,))
+            chunks = spliceChunks(filePath, text, edits, markerIndex=markerIndex)
+            if writeChunksIfChanged(filePath, chunks, oldText=text):
+                updates.append((filePath, [edit[0] for edit in edits],))
+            self.readFile(filePath)
+        return updates
+
+    def run(self, interval=0.5):
+        print('Watching: %s' % self.targetPaths.rootPath)
+        while True:
+            try:
+                for filePath, blockStartKeys in self.poll():
+                    print('Updated: %s (%s)' % (os.path.relpath(filePath, self.targetPaths.rootPath),
+                                                ', '.join(blockStartKeys), ))
+            except Exception as e:
+                # ie. a syntax error in a half-edited spec.
+                print('Error:', e)
+            time.sleep(interval)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Regenerate the CODEGEN MARKER blocks of WeView.')
+    parser.add_argument('--root', action='append', dest='roots',
+                        help='The root of a WeView2 checkout (default: the current directory).  May be repeated.')
+    parser.add_argument('--manifest',
+                        help='A JSON manifest of roots (and per-root specs) to generate.')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='The number of worker processes to use when generating several roots (default: one per CPU).')
+    parser.add_argument('--render-jobs', type=int, default=0, metavar='N',
+                        help='The number of worker processes to render a root\'s blocks with; 1 renders them serially (default: one per CPU for large specs, otherwise serially).')
+    parser.add_argument('--spec',
+                        help='A JSON spec whose tables override those of CodeGenSpec.json for the root(s) given with --root.')
+    parser.add_argument('--watch', action='store_true',
+                        help='Keep running, regenerating stale blocks whenever the spec or target files change.')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only re-render the blocks that depend on what changed in the spec since the last incremental run.')
+    parser.add_argument('--check', action='store_true',
+                        help='Don\'t write anything; list stale files and exit non-zero if there are any.')
+    parser.add_argument('--diff', action='store_true',
+                        help='Like --check, but print a unified diff of each stale file.')
+    parser.add_argument('--stats', action='store_true',
+                        help='Print per-block render times, splice times and file I/O counters.')
+    parser.add_argument('--stats-json', metavar='PATH',
+                        help='Write the --stats counters as JSON to PATH (or - for stdout).')
+    parser.add_argument('--profile', type=int, nargs='?', const=25, metavar='N',
+                        help='Profile the run and print the N (default: 25) hottest functions to stderr.  Worker processes are not profiled.')
+    parser.add_argument('--profile-sort', default='tottime', choices=('tottime', 'cumulative', 'ncalls',),
+                        help='The order of the --profile functions (default: tottime, the time spent in each function itself).')
+    args = parser.parse_args(argv)
+
+    if args.profile is None:
+        return runCommand(parser, args)
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(runCommand, parser, args)
+    finally:
+        pstats.Stats(profiler, stream=sys.stderr).sort_stats(args.profile_sort).print_stats(args.profile)
+
+
+def messageFile(args):
+    # With --stats-json -, stdout is reserved for the JSON so that it can be
+    # parsed, and everything else is written to stderr.
+    if args.stats_json == '-':
+        return sys.stderr
+    return sys.stdout
+
+
+def reportStats(args, statsDicts):
+    if args.stats:
+        for statsDict in statsDicts:
+            for line in formatStatsTable(statsDict):
+                print(line, file=messageFile(args))
+    if args.stats_json:
+        statsJson = json.dumps({'roots': statsDicts}, indent=4, sort_keys=True) + '\n'
+        if args.stats_json == '-':
+            sys.stdout.write(statsJson)
+        else:
+            with open(args.stats_json, 'wt') as f:
+                f.write(statsJson)
+
+
+def runCommand(parser, args):
+    roots = [(rootPath, args.spec,) for rootPath in (args.roots or [])]
+    if args.manifest:
+        roots.extend(readManifest(args.manifest))
+    if not roots:
+        roots = [('.', args.spec,)]
+    checkOnly = args.check or args.diff
+    collectStats = bool(args.stats or args.stats_json)
+    out = messageFile(args)
+
+    if args.watch:
+        if len(roots) != 1 or checkOnly or collectStats:
+            parser.error('--watch requires a single root and cannot be combined with --check, --diff or --stats.')
+        try:
+            Watcher(roots[0][0], specPath=roots[0][1], renderJobs=args.render_jobs).run()
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    if len(roots) == 1:
+        rootPath, specPath = roots[0]
+        stats = RunStats() if collectStats else None
+        if checkOnly:
+            diffFile = out if args.diff else None
+            staleFilePaths = check(rootPath, specPath=specPath, diffFile=diffFile, stats=stats, renderJobs=args.render_jobs)
+            if not args.diff:
+                for filePath in staleFilePaths:
+                    print('Stale:', filePath, file=out)
+            if stats is not None:
+                stats.finish()
+                reportStats(args, [stats.asDict(rootPath)])
+            return 1 if staleFilePaths else 0
+
+        if args.incremental:
+            changedFilePaths, renderedBlockKeys = generateIncrementally(rootPath, specPath=specPath, stats=stats,
+                                                                        renderJobs=args.render_jobs)
+            print('Rendered %d of %d blocks.' % (len(renderedBlockKeys), len(blockSpecs), ), file=out)
+        else:
+            changedFilePaths = generate(rootPath, specPath=specPath, stats=stats, renderJobs=args.render_jobs)
+
+        for filePath in changedFilePaths:
+            print('Updated:', filePath, file=out)
+        if not changedFilePaths:
+            print('No changes.', file=out)
+        tables = loadPropertyTables(specPath)
+        configSize32, configSize64 = layoutConfigSizes(tables)
+        print('%s: %d bytes on 64-bit, %d bytes on 32-bit.' % (layoutConfigTypeName, configSize64, configSize32, ), file=out)
+        for line in formatViewInfoStorageSizes(tables):
+            print(line, file=out)
+        if stats is not None:
+            stats.finish()
+            reportStats(args, [stats.asDict(rootPath)])
+        print('Complete.', file=out)
+        return 0
+
+    jobs = [(rootPath, specPath, checkOnly, args.diff, collectStats, args.incremental,) for rootPath, specPath in roots]
+    startTime = time.time()
+    results = generateRoots(jobs, processCount=args.jobs)
+
+    hasFailures = False
+    for result in results:
+        if result['diff']:
+            out.write(result['diff'])
+        if result['error']:
+            hasFailures = True
+            print('%s: failed (%.3fs): %s' % (result['rootPath'], result['seconds'], result['error'], ), file=out)
+            continue
+        if checkOnly and result['filePaths']:
+            hasFailures = True
+        print('%s: %d %s (%.3fs)' % (result['rootPath'],
+                                     len(result['filePaths']),
+                                     'stale' if checkOnly else 'changed',
+                                     result['seconds'], ), file=out)
+        if result['renderedBlockCount'] is not None:
+            print('    Rendered %d of %d blocks.' % (result['renderedBlockCount'], len(blockSpecs), ), file=out)
+        for filePath in result['filePaths']:
+            print('    %s' % os.path.relpath(filePath, os.path.realpath(result['rootPath'])), file=out)
+    if collectStats:
+        reportStats(args, [result['stats'] for result in results if result['stats'] is not None])
+    print('Complete: %d roots in %.3fs.' % (len(results), time.time() - startTime, ), file=out)
+    return 1 if hasFailures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,331 @@
+#!/usr/bin/python
+
+# Benchmarks CodeGen.py against synthetic property tables.
+#
+# Usage: python CodeGenBenchmark.py run [--sizes 10 100 1000 10000] [--render-jobs N] [--output baseline.json]
+#        python CodeGenBenchmark.py compare <baseline.json> <current.json> [--threshold 0.1]
+#
+# Each size is a full generation of that many properties per property table
+# (and a tenth as many custom accessors) into a scratch copy of the files that
+# contain CODEGEN MARKER blocks, through CodeGen.generate() like the command
+# line.  Each size runs in its own process so that peak memory and the
+# generator's caches are per-run.
+
+from __future__ import print_function
+
+import argparse, json, multiprocessing, os, platform, shutil, sys, tempfile, time
+
+import CodeGen
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+defaultSizes = (10, 100, 1000, 10000,)
+
+baselineVersion = 2
+
+syntheticTypeNames = ('CGFloat',
+                      'int',
+                      'BOOL',
+                      'HAlign',
+                      'VAlign',
+                      'CellPositioningMode',
+                      'NSString *',
+                      )
+
+# Every fifth property gets a long, multi-paragraph comment like cellPositioning.
+syntheticLongComments = ['This synthetic property exists to exercise the comment wrapper.  ' * 6,
+                         'It has more than one paragraph, each of which is wrapped on its own and memoized.  ' * 4,
+                         ]
+
+propertyGroupSize = 8
+
+
+def syntheticPropertyGroups(prefix, count):
+    propertyGroups = []
+    for index in range(count):
+        if index % propertyGroupSize == 0:
+            propertyGroups.append([])
+        typeName = syntheticTypeNames[index % len(syntheticTypeNames)]
+        comments = 'Synthetic %s property %d.' % (typeName, index, )
+        if index % 5 == 0:
+            comments = syntheticLongComments
+        propertyGroups[-1].append(CodeGen.Property('%s%d' % (prefix, index, ),
+                                                   typeName,
+                                                   comments=comments,
+                                                   layoutProperty=True,
+                                                   doubleHeight=(index % 3 == 0)))
+    return tuple([tuple(propertyGroup) for propertyGroup in propertyGroups])
+
+
+def syntheticCustomAccessors(prefix, propertyGroups, count):
+    # Accessors over pairs of CGFloat properties, alternating with CGSize
+    # accessors like desiredSize.
+    floatPropertyNames = [property.name for propertyGroup in propertyGroups for property in propertyGroup
+                          if property.typeName == 'CGFloat']
+    customAccessors = []
+    for index in range(count):
+        propertyList = [floatPropertyNames[(index * 2) % len(floatPropertyNames)],
+                        floatPropertyNames[(index * 2 + 1) % len(floatPropertyNames)],
+                        ]
+        if index % 2:
+            customAccessors.append(CodeGen.CustomAccessor('%sSize%d' % (prefix, index, ),
+                                                          'CGSize',
+                                                          propertyList,
+                                                          setterValues=['.width', '.height',],
+                                                          getterValue='CGSizeMake(self.%s, self.%s)' % tuple(propertyList),
+                                                          layoutProperty=True))
+        else:
+            customAccessors.append(CodeGen.CustomAccessor('%sPair%d' % (prefix, index, ),
+                                                          'CGFloat',
+                                                          propertyList,
+                                                          layoutProperty=True))
+    return tuple(customAccessors)
+
+
+def syntheticPropertyTables(size):
+    view_propertyGroups = syntheticPropertyGroups('syntheticView', size)
+    layout_propertyGroups = syntheticPropertyGroups('syntheticLayout', size)
+    customAccessorCount = max(1, size // 10)
+    return CodeGen.PropertyTables(view_propertyGroups,
+                                  layout_propertyGroups,
+                                  syntheticCustomAccessors('syntheticView', view_propertyGroups, customAccessorCount),
+                                  syntheticCustomAccessors('syntheticLayout', layout_propertyGroups, customAccessorCount))
+
+
+def targetFilePaths(targetPaths):
+    return sorted(set([getattr(targetPaths, blockSpec.fileKey) for blockSpec in CodeGen.blockSpecs] +
+                      [targetPaths.ViewEditorController_hFilePath,]))
+
+
+def copyTargetFiles(rootPath, scratchPath):
+    # Copies just the files that TargetPaths requires into scratchPath.
+    rootPath = os.path.abspath(rootPath)
+    for filePath in targetFilePaths(CodeGen.TargetPaths(rootPath)):
+        scratchFilePath = os.path.join(scratchPath, os.path.relpath(filePath, rootPath))
+        if not os.path.isdir(os.path.dirname(scratchFilePath)):
+            os.makedirs(os.path.dirname(scratchFilePath))
+        shutil.copyfile(filePath, scratchFilePath)
+
+
+def generateOnce(scratchPath, tables, renderJobs=0):
+    # Runs a full generation through CodeGen.generate(), render pool and
+    # edit plan included, and returns its measurements.  Blocks are
+    # normalized and spliced as they are streamed to disk, so the three are a
+    # single phase.  With a render pool, render is the sum of the blocks'
+    # render times across the workers.
+    stats = CodeGen.RunStats()
+    startTime = time.time()
+    CodeGen.generate(scratchPath,
+                     tables.view_propertyGroups,
+                     tables.layout_propertyGroups,
+                     tables.view_customAccessors,
+                     tables.layout_customAccessors,
+                     stats=stats,
+                     renderJobs=renderJobs,
+                     viewInfoStorage=tables.viewInfoStorage)
+    wallSeconds = time.time() - startTime
+    stats.finish()
+    statsDict = stats.asDict(scratchPath)
+    return {
+        'wallSeconds': wallSeconds,
+        'phaseSeconds': {
+            'render': statsDict['renderSeconds'],
+            'spliceAndWrite': statsDict['spliceSeconds'],
+        },
+        'bytesWritten': statsDict['bytesOut'],
+        'fileOpens': statsDict['filesOpened'],
+    }
+
+
+def peakMemoryBytes():
+    # The peak resident size of this process.
+    if resource is None:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on OS X and kilobytes elsewhere.
+    if sys.platform == 'darwin':
+        return maxrss
+    return maxrss * 1024
+
+
+def runCase(job):
+    # Runs a single size.  Runs in a fresh process.
+    rootPath, size, repeat, renderJobs = job
+    tables = syntheticPropertyTables(size)
+    scratchFolderPath = tempfile.mkdtemp(prefix='codegen-benchmark-')
+    try:
+        runs = []
+        for index in range(repeat):
+            scratchPath = os.path.join(scratchFolderPath, str(index))
+            copyTargetFiles(rootPath, scratchPath)
+            runs.append(generateOnce(scratchPath, tables, renderJobs=renderJobs))
+
+        # The fastest run is the least noisy.
+        result = min(runs, key=lambda run: run['wallSeconds'])
+        result['peakMemoryBytes'] = peakMemoryBytes()
+
+        # Allocation tracing is slow, so it gets a run of its own.
+        if tracemalloc is not None:
+            scratchPath = os.path.join(scratchFolderPath, 'tracemalloc')
+            copyTargetFiles(rootPath, scratchPath)
+            tracemalloc.start()
+            try:
+                generateOnce(scratchPath, tables, renderJobs=renderJobs)
+                result['peakAllocatedBytes'] = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+    finally:
+        shutil.rmtree(scratchFolderPath)
+
+    result['size'] = size
+    return result
+
+
+def runCaseInProcess(job, queue):
+    try:
+        queue.put((runCase(job), None,))
+    except Exception as e:
+        queue.put((None, '%s: %s' % (e.__class__.__name__, str(e), ),))
+
+
+def runBenchmark(rootPath, sizes=defaultSizes, repeat=3, renderJobs=0):
+    # See CodeGen.resolveRenderJobs() for renderJobs.
+    results = []
+    for size in sizes:
+        # A plain process rather than a pool worker, since pool workers can't
+        # start the render pool of their own that generate() may use.
+        queue = multiprocessing.Queue()
+        process = multiprocessing.Process(target=runCaseInProcess, args=((rootPath, size, repeat, renderJobs,), queue,))
+        process.start()
+        result, error = queue.get()
+        process.join()
+        if error:
+            raise Exception('Size %d failed: %s' % (size, error, ))
+        results.append(result)
+    return {
+        'version': baselineVersion,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'renderJobs': renderJobs,
+        'results': results,
+    }
+
+
+def formatBytes(value):
+    if value is None:
+        return '-'
+    return '%.1f KB' % (value / 1024.0, )
+
+
+def printResults(baseline):
+    print('%8s %10s %10s %12s %12s %8s %12s' % ('size', 'wall', 'render', 'splice+write', 'written', 'opens', 'peak', ))
+    for result in baseline['results']:
+        phases = result['phaseSeconds']
+        print('%8d %9.3fs %9.3fs %11.3fs %12s %8d %12s' % (result['size'],
+                                                         result['wallSeconds'],
+                                                         phases['render'],
+                                                         phases['spliceAndWrite'],
+                                                         formatBytes(result['bytesWritten']),
+                                                         result['fileOpens'],
+                                                         formatBytes(result['peakMemoryBytes']), ))
+
+
+def comparableMetrics(result):
+    # Returns (name, value, isSeconds) for each compared metric of a result.
+    metrics = [('wallSeconds', result['wallSeconds'], True,)]
+    for phase, seconds in sorted(result['phaseSeconds'].items()):
+        metrics.append(('phaseSeconds.' + phase, seconds, True,))
+    for name in ('bytesWritten', 'fileOpens', 'peakMemoryBytes', 'peakAllocatedBytes',):
+        if result.get(name) is not None:
+            metrics.append((name, result[name], False,))
+    return metrics
+
+
+def compareBaselines(baseline, current, threshold=0.1, minSeconds=0.005):
+    # Returns a list of regression descriptions.  Timings shorter than
+    # minSeconds are too noisy to compare.
+    regressions = []
+    baselineResults = dict([(result['size'], result) for result in baseline['results']])
+    for result in current['results']:
+        if result['size'] not in baselineResults:
+            continue
+        baselineMetrics = dict([(name, value) for name, value, isSeconds in comparableMetrics(baselineResults[result['size']])])
+        for name, value, isSeconds in comparableMetrics(result):
+            baselineValue = baselineMetrics.get(name)
+            if baselineValue is None:
+                continue
+            if isSeconds and max(value, baselineValue) < minSeconds:
+                continue
+            if value > baselineValue * (1.0 + threshold):
+                if baselineValue:
+                    change = '+%.0f%%' % ((value - baselineValue) * 100.0 / baselineValue, )
+                else:
+                    change = 'new'
+                regressions.append('size %d: %s: %s -> %s (%s)' % (result['size'], name, baselineValue, value, change, ))
+    return regressions
+
+
+def readBaseline(baselinePath):
+    with open(baselinePath, 'rt') as f:
+        baseline = json.load(f)
+    if baseline.get('version') != baselineVersion:
+        raise Exception('Unknown baseline version: %s in: %s' % (str(baseline.get('version')), baselinePath, ))
+    return baseline
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks CodeGen.py against synthetic property tables.')
+    subparsers = parser.add_subparsers(dest='command')
+
+    runParser = subparsers.add_parser('run', help='run the benchmark')
+    runParser.add_argument('--root', default=os.path.dirname(os.path.abspath(__file__)),
+                           help='the WeView2 checkout whose target files are copied (default: this checkout)')
+    runParser.add_argument('--sizes', type=int, nargs='+', default=list(defaultSizes),
+                           help='the number of properties per property table')
+    runParser.add_argument('--repeat', type=int, default=3,
+                           help='the number of runs per size; the fastest is recorded')
+    runParser.add_argument('--render-jobs', type=int, default=0, metavar='N',
+                           help='passed to CodeGen.generate(); see CodeGen.py --render-jobs (default: as CodeGen.py)')
+    runParser.add_argument('--output', help='write the results as a JSON baseline')
+
+    compareParser = subparsers.add_parser('compare', help='compare two baselines and report regressions')
+    compareParser.add_argument('baseline')
+    compareParser.add_argument('current')
+    compareParser.add_argument('--threshold', type=float, default=0.1,
+                               help='the fractional increase that counts as a regression (default: 0.1)')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        baseline = runBenchmark(args.root, sizes=args.sizes, repeat=max(1, args.repeat), renderJobs=args.render_jobs)
+        printResults(baseline)
+        if args.output:
+            with open(args.output, 'wt') as f:
+                json.dump(baseline, f, indent=4, sort_keys=True)
+                f.write('\n')
+        return 0
+    elif args.command == 'compare':
+        regressions = compareBaselines(readBaseline(args.baseline), readBaseline(args.current), threshold=args.threshold)
+        for regression in regressions:
+            print('Regression:', regression)
+        if regressions:
+            return 1
+        print('No regressions.')
+        return 0
+
+    parser.print_usage()
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
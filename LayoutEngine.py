@@ -0,0 +1,905 @@
+#!/usr/bin/python
+
+# A headless reference implementation of WeViewLinearLayout,
+# WeViewStackLayout and WeViewGridLayout that solves whole batches of layouts
+# at once with NumPy.
+#
+# Usage: python LayoutEngine.py solve <cases.json> [--output results.json] [--spec CodeGenSpec.json]
+#        python LayoutEngine.py check <cases.json> <expected.json> [--spec CodeGenSpec.json]
+#
+# The engine's property schema (names, types and defaults) is read from the
+# same property tables CodeGen.py generates WeView from.
+#
+# Subviews are leaves with a fixed desired size, ie. their sizeThatFits:
+# ignores its argument.  A cases file is a JSON list of containers:
+#
+#     [{"layout": "horizontal",
+#       "layoutProperties": {"hSpacing": 5, "hAlign": "H_ALIGN_LEFT"},
+#       "subviews": [{"size": [100, 20], "hStretchWeight": 1},
+#                    {"size": [40, 40], "cellVAlign": "V_ALIGN_TOP", "hasCellVAlign": true}],
+#       "sizes": [[320, 44], [768, 44]]}]
+#
+# Grids also take the options of gridLayoutWithColumns:..., eg.
+#
+#     "grid": {"columnCount": 3, "isGridUniform": true,
+#              "stretchPolicy": "GRID_STRETCH_POLICY_STRETCH_CELLS", "cellSizeHint": [40, 40]}
+#
+# and any case can sweep its container size; each axis is a single value or a
+# [start, stop, step] range, eg. "sweep": {"width": [320, 1025, 8], "height": 480}.
+#
+# Containers are solved in batches of the same layout and subview count (and
+# column count); each (container, size) pair is one row of a batch.  For each
+# size, the results hold the container's minSizeOfContentsView:thatFitsSize:
+# for that size and the frames of its subviews when laid out at that size.
+# Grid results also hold the column widths and row heights.
+
+from __future__ import division, print_function
+
+import argparse, collections, json, numbers, sys
+
+import CodeGen
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+layoutTypes = ('horizontal', 'vertical', 'stack', 'grid',)
+
+# The GridStretchPolicy enum of WeViewGridLayout.h.
+gridStretchPolicies = ('GRID_STRETCH_POLICY_STRETCH_CELLS',
+                       'GRID_STRETCH_POLICY_STRETCH_SPACING',
+                       'GRID_STRETCH_POLICY_NO_STRETCH',
+                       )
+GRID_STRETCH_POLICY_STRETCH_CELLS = 0
+GRID_STRETCH_POLICY_STRETCH_SPACING = 1
+GRID_STRETCH_POLICY_NO_STRETCH = 2
+
+# The properties the engine implements.  They must all be in the property tables.
+engineViewPropertyNames = ('minDesiredWidth',
+                           'maxDesiredWidth',
+                           'minDesiredHeight',
+                           'maxDesiredHeight',
+                           'hStretchWeight',
+                           'vStretchWeight',
+                           'leftSpacingAdjustment',
+                           'topSpacingAdjustment',
+                           'rightSpacingAdjustment',
+                           'bottomSpacingAdjustment',
+                           'desiredWidthAdjustment',
+                           'desiredHeightAdjustment',
+                           'ignoreDesiredSize',
+                           'cellHAlign',
+                           'cellVAlign',
+                           'hasCellHAlign',
+                           'hasCellVAlign',
+                           )
+engineLayoutPropertyNames = ('leftMargin',
+                             'rightMargin',
+                             'topMargin',
+                             'bottomMargin',
+                             'vSpacing',
+                             'hSpacing',
+                             'hAlign',
+                             'vAlign',
+                             'spacingStretches',
+                             'cropSubviewOverflow',
+                             'cellPositioning',
+                             )
+
+constantValues = {
+    'YES': 1.0,
+    'NO': 0.0,
+    'CGFLOAT_MAX': sys.float_info.max,
+}
+
+# The indices of the CellPositioningMode, HAlign and VAlign enum values.
+CELL_POSITIONING_NORMAL = 0
+CELL_POSITIONING_FILL = 1
+CELL_POSITIONING_FILL_W_ASPECT_RATIO = 2
+CELL_POSITIONING_FIT_W_ASPECT_RATIO = 3
+
+ALIGN_CENTER = 1
+ALIGN_FAR = 2
+
+
+def requireNumpy():
+    if numpy is None:
+        raise Exception('LayoutEngine.py requires NumPy.')
+
+
+def parseValue(typeInfo, value):
+    # Converts a value from the property tables or a cases file to the float
+    # the engine stores it as, truncating it the way its C type would.
+    if isinstance(value, numbers.Number):
+        result = float(value)
+    elif value in constantValues:
+        result = constantValues[value]
+    elif typeInfo.enumValues and value in typeInfo.enumValues:
+        result = float(typeInfo.enumValues.index(value))
+    else:
+        try:
+            result = float(value.rstrip('f'))
+        except (AttributeError, ValueError):
+            raise Exception('Invalid %s value: %s' % (typeInfo.typeName, value, ))
+    if typeInfo.typeName == 'BOOL':
+        return 1.0 if result else 0.0
+    if typeInfo.typeName == 'int' or typeInfo.enumValues:
+        result = float(int(result))
+    if typeInfo.enumValues and not 0 <= result < len(typeInfo.enumValues):
+        raise Exception('Invalid %s value: %s' % (typeInfo.typeName, value, ))
+    return result
+
+
+class LayoutSchema:
+    # The non-object view and layout properties of the property tables, with
+    # the values a fresh view or layout has for them.
+    def __init__(self, tables):
+        self.viewTypeInfos, self.viewDefaults = self.readProperties(CodeGen.layoutSnapshotProperties(tables), False)
+        layoutProperties = [property for propertyGroup in tables.layout_propertyGroups for property in propertyGroup
+                            if not CodeGen.typeInfoForName(property.typeName).isObject()]
+        self.layoutTypeInfos, self.layoutDefaults = self.readProperties(layoutProperties, True)
+
+        for names, typeInfos, kind in ((engineViewPropertyNames, self.viewTypeInfos, 'view',),
+                                       (engineLayoutPropertyNames, self.layoutTypeInfos, 'layout',),):
+            for name in names:
+                if name not in typeInfos:
+                    raise Exception('Missing %s property: %s is not in the property tables' % (kind, name, ))
+
+    def readProperties(self, properties, hasResetValues):
+        typeInfos = {}
+        defaults = {}
+        for property in properties:
+            typeInfo = CodeGen.typeInfoForName(property.typeName)
+            # Views without a value are zero-filled; layouts are reset to resetValue.
+            defaultValue = property.defaultValue
+            if defaultValue is None and hasResetValues:
+                defaultValue = typeInfo.resetValue
+            typeInfos[property.name] = typeInfo
+            defaults[property.name] = parseValue(typeInfo, defaultValue or 0)
+        return typeInfos, defaults
+
+    def propertyArrays(self, typeInfos, defaults, rows, shape, kind):
+        # rows is a sequence of (index, {name: value}) pairs.
+        arrays = dict([(name, numpy.full(shape, defaults[name])) for name in defaults])
+        # Cases tend to reuse a handful of values per property.
+        parsedValues = {}
+        for index, values in rows:
+            for name, value in values.items():
+                key = (name, value,)
+                if key not in parsedValues:
+                    if name not in typeInfos:
+                        raise Exception('Unknown %s property: %s' % (kind, name, ))
+                    parsedValues[key] = parseValue(typeInfos[name], value)
+                arrays[name][index] = parsedValues[key]
+        return arrays
+
+    def layoutArrays(self, layoutRows):
+        # Returns (B,) arrays of every layout property given a {name: value}
+        # dictionary per container.
+        return self.propertyArrays(self.layoutTypeInfos, self.layoutDefaults,
+                                   enumerate(layoutRows), (len(layoutRows),), 'layout')
+
+    def viewArrays(self, viewRows, subviewCount):
+        # Returns (B, N) arrays of every view property given a list of
+        # {name: value} dictionaries per container.
+        rows = [((batchIndex, subviewIndex,), values)
+                for batchIndex, subviewValues in enumerate(viewRows)
+                for subviewIndex, values in enumerate(subviewValues)]
+        return self.propertyArrays(self.viewTypeInfos, self.viewDefaults,
+                                   rows, (len(viewRows), subviewCount,), 'view')
+
+    def batch(self, layoutType, layoutRows, viewRows, subviewSizes, gridRows=None):
+        subviewSizes = numpy.asarray(subviewSizes, dtype=numpy.float64).reshape((len(viewRows), -1, 2,))
+        grid = None
+        if layoutType == 'grid':
+            grid = GridOptions.fromRows(gridRows or [{}] * len(viewRows))
+        return LayoutBatch(layoutType,
+                           self.layoutArrays(layoutRows),
+                           self.viewArrays(viewRows, subviewSizes.shape[1]),
+                           subviewSizes,
+                           grid)
+
+
+class LayoutBatch:
+    # B containers with the same layout and the same number (N) of subviews.
+    #
+    # layout: (B,) arrays keyed by layout property name.
+    # views: (B, N) arrays keyed by view property name.
+    # subviewSizes: (B, N, 2) the desired size of each subview.
+    # grid: The GridOptions of grid layouts, or None.
+    def __init__(self, layoutType, layout, views, subviewSizes, grid=None):
+        if layoutType not in layoutTypes:
+            raise Exception('Unknown layout: %s' % layoutType)
+        if (layoutType == 'grid') != (grid is not None):
+            raise Exception('Grid layouts, and only grid layouts, need grid options')
+        self.layoutType = layoutType
+        self.layout = layout
+        self.views = views
+        self.subviewSizes = subviewSizes
+        self.grid = grid
+
+    def batchSize(self):
+        return self.subviewSizes.shape[0]
+
+    def subviewCount(self):
+        return self.subviewSizes.shape[1]
+
+    def subset(self, indices):
+        # Returns a batch of the given rows of this batch.
+        grid = None
+        if self.grid is not None:
+            grid = self.grid.subset(indices)
+        return LayoutBatch(self.layoutType,
+                           dict([(name, values[indices]) for name, values in self.layout.items()]),
+                           dict([(name, values[indices]) for name, values in self.views.items()]),
+                           self.subviewSizes[indices],
+                           grid)
+
+    def configurationMatrix(self):
+        # Returns a (B, K) array that holds everything that determines the
+        # layout of each row.
+        columns = [self.layout[name][:, numpy.newaxis] for name in sorted(self.layout)]
+        columns.extend([self.views[name] for name in sorted(self.views)])
+        columns.append(self.subviewSizes.reshape((self.batchSize(), -1,)))
+        if self.grid is not None:
+            columns.append(self.grid.configurationMatrix())
+        return numpy.concatenate(columns, axis=1)
+
+
+class GridOptions:
+    # The WeViewGridLayout options that aren't in the property tables (see
+    # gridLayoutWithColumns:isGridUniform:stretchPolicy:cellSizeHint:) for B
+    # grids with the same column count.
+    #
+    # isGridUniform, stretchPolicy and hasCellSizeHint are (B,) arrays,
+    # cellSizeHints is (B, 2).
+    def __init__(self, columnCount, isGridUniform, stretchPolicy, hasCellSizeHint, cellSizeHints):
+        self.columnCount = columnCount
+        self.isGridUniform = isGridUniform
+        self.stretchPolicy = stretchPolicy
+        self.hasCellSizeHint = hasCellSizeHint
+        self.cellSizeHints = cellSizeHints
+
+    @staticmethod
+    def fromRows(gridRows):
+        # Builds the options from a {name: value} dictionary per grid.  Missing
+        # options have their resetAllProperties values.
+        columnCounts = set([int(gridRow.get('columnCount', 1)) for gridRow in gridRows])
+        if len(columnCounts) != 1:
+            raise Exception('The grids of a batch must have the same columnCount')
+        for gridRow in gridRows:
+            for name in gridRow:
+                if name not in ('columnCount', 'isGridUniform', 'stretchPolicy', 'cellSizeHint',):
+                    raise Exception('Unknown grid option: %s' % name)
+        stretchPolicies = []
+        for gridRow in gridRows:
+            stretchPolicy = gridRow.get('stretchPolicy', GRID_STRETCH_POLICY_NO_STRETCH)
+            if stretchPolicy in gridStretchPolicies:
+                stretchPolicy = gridStretchPolicies.index(stretchPolicy)
+            if stretchPolicy not in range(len(gridStretchPolicies)):
+                raise Exception('Invalid stretchPolicy: %s' % stretchPolicy)
+            stretchPolicies.append(stretchPolicy)
+        return GridOptions(columnCounts.pop(),
+                           numpy.array([1.0 if gridRow.get('isGridUniform') else 0.0 for gridRow in gridRows]),
+                           numpy.array(stretchPolicies, dtype=numpy.float64),
+                           numpy.array([1.0 if 'cellSizeHint' in gridRow else 0.0 for gridRow in gridRows]),
+                           numpy.array([gridRow.get('cellSizeHint', (0, 0,)) for gridRow in gridRows], dtype=numpy.float64).reshape((-1, 2,)))
+
+    def subset(self, indices):
+        return GridOptions(self.columnCount,
+                           self.isGridUniform[indices],
+                           self.stretchPolicy[indices],
+                           self.hasCellSizeHint[indices],
+                           self.cellSizeHints[indices])
+
+    def configurationMatrix(self):
+        return numpy.concatenate((self.isGridUniform[:, numpy.newaxis],
+                                  self.stretchPolicy[:, numpy.newaxis],
+                                  self.hasCellSizeHint[:, numpy.newaxis],
+                                  self.cellSizeHints,), axis=1)
+
+
+# --------
+
+def roundf(values):
+    # C's roundf() rounds halfway cases away from zero; numpy.round doesn't.
+    return numpy.copysign(numpy.floor(numpy.abs(values) + 0.5), values)
+
+
+def distributeSpace(space, weights):
+    # WeViewLayout distributeSpace:acrossCellsWithWeights:, vectorized over the
+    # batch.  space is (B,), weights is (B, K).  Rows without a positive
+    # weight (which the ObjC asserts against) get nothing.
+    weights = numpy.maximum(0.0, weights)
+    hasWeight = weights > 0
+    spaceRemainder = numpy.array(space, dtype=numpy.float64)
+    cellRemainder = hasWeight.sum(axis=1)
+    weightRemainder = weights.sum(axis=1)
+    result = numpy.zeros(weights.shape)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        for index in range(weights.shape[1]):
+            cellWeight = weights[:, index]
+            isActive = hasWeight[:, index] & (cellRemainder > 0)
+            # The last weighted cell takes the remainder so that exactly space is distributed.
+            cellDistribution = numpy.where(cellRemainder == 1,
+                                           numpy.trunc(spaceRemainder),
+                                           numpy.floor(spaceRemainder * cellWeight / weightRemainder))
+            cellDistribution = numpy.where(isActive, cellDistribution, 0.0)
+            result[:, index] = cellDistribution
+            cellRemainder = cellRemainder - isActive
+            spaceRemainder = spaceRemainder - cellDistribution
+            weightRemainder = numpy.where(isActive, weightRemainder - cellWeight, weightRemainder)
+    return result
+
+
+def distributeAdjustment(values, totalAdjustment, weights, sign, withMaxZero, rows):
+    # WeViewLayout distributeAdjustment:acrossValues:..., applied in place to
+    # the selected rows of the (B, K) values.
+    if not rows.any() or values.shape[1] == 0:
+        return
+    adjustments = distributeSpace(roundf(totalAdjustment[rows]), weights[rows])
+    newValues = roundf(values[rows] + adjustments * sign)
+    if withMaxZero:
+        newValues = numpy.maximum(0.0, newValues)
+    values[rows] = newValues
+
+
+def contentBounds(layout, sizes):
+    # Returns the (B, 2) origins and (B, 2) sizes of the content bounds of
+    # containers of the given (B, 2) sizes.
+    left = numpy.ceil(layout['leftMargin'])
+    top = numpy.ceil(layout['topMargin'])
+    right = numpy.floor(sizes[:, 0] - numpy.ceil(layout['rightMargin']))
+    bottom = numpy.floor(sizes[:, 1] - numpy.ceil(layout['bottomMargin']))
+    origins = numpy.stack((left, top,), axis=-1)
+    contentSizes = numpy.stack((numpy.maximum(0.0, right - left),
+                                numpy.maximum(0.0, bottom - top),), axis=-1)
+    return origins, contentSizes
+
+
+def insetSizes(layout):
+    return numpy.stack((numpy.ceil(layout['leftMargin']) + numpy.ceil(layout['rightMargin']),
+                        numpy.ceil(layout['topMargin']) + numpy.ceil(layout['bottomMargin']),), axis=-1)
+
+
+def desiredItemSizes(batch):
+    # Returns the (B, N, 2) desiredItemSize:maxSize: of every subview.
+    views = batch.views
+    desiredSizes = batch.subviewSizes + numpy.stack((views['desiredWidthAdjustment'],
+                                                     views['desiredHeightAdjustment'],), axis=-1)
+    minSizes = numpy.maximum(0.0, numpy.stack((views['minDesiredWidth'], views['minDesiredHeight'],), axis=-1))
+    maxSizes = numpy.stack((views['maxDesiredWidth'], views['maxDesiredHeight'],), axis=-1)
+    result = numpy.ceil(numpy.maximum(minSizes, numpy.minimum(maxSizes, desiredSizes)))
+    result[views['ignoreDesiredSize'] > 0] = 0.0
+    return result
+
+
+def alignOffsets(align, extraSpace, centerOffsets):
+    return numpy.where(align == ALIGN_CENTER, centerOffsets,
+                       numpy.where(align == ALIGN_FAR, extraSpace, 0.0))
+
+
+def positionSubviews(layout, views, subviewSizes, sizes, cells):
+    # WeViewLayout positionSubview:..., vectorized.  Every argument has the
+    # same leading shape S (or broadcasts to it): the values of layout and
+    # views are S-shaped, subviewSizes and sizes are S + (2,) and cells are
+    # S + (4,).  Returns the S + (4,) frames.
+    cellPositioning = layout['cellPositioning']
+    hAlign = numpy.where(views['hasCellHAlign'] > 0, views['cellHAlign'], layout['hAlign'])
+    vAlign = numpy.where(views['hasCellVAlign'] > 0, views['cellVAlign'], layout['vAlign'])
+    cellX, cellY, cellWidth, cellHeight = [cells[..., index] for index in range(4)]
+
+    # CELL_POSITIONING_NORMAL
+    width = numpy.where(views['hStretchWeight'] > 0, cellWidth, sizes[..., 0])
+    height = numpy.where(views['vStretchWeight'] > 0, cellHeight, sizes[..., 1])
+
+    # CELL_POSITIONING_FILL_W_ASPECT_RATIO and CELL_POSITIONING_FIT_W_ASPECT_RATIO
+    desiredWidth, desiredHeight = subviewSizes[..., 0], subviewSizes[..., 1]
+    hasAspectRatio = ((cellPositioning == CELL_POSITIONING_FILL_W_ASPECT_RATIO) |
+                      (cellPositioning == CELL_POSITIONING_FIT_W_ASPECT_RATIO))
+    isValid = (desiredWidth > 0) & (desiredHeight > 0) & (cellWidth > 0) & (cellHeight > 0)
+    # Rows that aren't valid are replaced by their cells below.
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        widthFactor = cellWidth / desiredWidth
+        heightFactor = cellHeight / desiredHeight
+        factor = numpy.where(cellPositioning == CELL_POSITIONING_FILL_W_ASPECT_RATIO,
+                             numpy.maximum(widthFactor, heightFactor),
+                             numpy.minimum(widthFactor, heightFactor))
+        width = numpy.where(hasAspectRatio, roundf(desiredWidth * factor), width)
+        height = numpy.where(hasAspectRatio, roundf(desiredHeight * factor), height)
+
+    width = numpy.maximum(0.0, numpy.floor(width))
+    height = numpy.maximum(0.0, numpy.floor(height))
+    x = roundf(alignOffsets(hAlign, cellWidth - width, (cellWidth - width) / 2) + cellX)
+    y = roundf(alignOffsets(vAlign, cellHeight - height, (cellHeight - height) / 2) + cellY)
+
+    # CELL_POSITIONING_FILL, and aspect ratios that can't be honored.
+    isFill = cellPositioning == CELL_POSITIONING_FILL
+    x = numpy.where(isFill, roundf(cellX), x)
+    y = numpy.where(isFill, roundf(cellY), y)
+    width = numpy.where(isFill, numpy.maximum(0.0, numpy.floor(cellWidth)), width)
+    height = numpy.where(isFill, numpy.maximum(0.0, numpy.floor(cellHeight)), height)
+    frames = numpy.stack(numpy.broadcast_arrays(x, y, width, height), axis=-1)
+    cells = numpy.broadcast_to(cells, frames.shape)
+    return numpy.where((hasAspectRatio & ~isValid)[..., numpy.newaxis], cells, frames)
+
+
+# --------
+
+class LinearAxes:
+    # The property names and size indices of a linear layout's axes.
+    def __init__(self, horizontal):
+        self.horizontal = horizontal
+        self.axis = 0 if horizontal else 1
+        self.cross = 1 - self.axis
+        self.spacingName = 'hSpacing' if horizontal else 'vSpacing'
+        self.leadingAdjustmentName = 'leftSpacingAdjustment' if horizontal else 'topSpacingAdjustment'
+        self.trailingAdjustmentName = 'rightSpacingAdjustment' if horizontal else 'bottomSpacingAdjustment'
+        self.axisStretchName = 'hStretchWeight' if horizontal else 'vStretchWeight'
+        self.crossStretchName = 'vStretchWeight' if horizontal else 'hStretchWeight'
+        self.axisAlignName = 'hAlign' if horizontal else 'vAlign'
+        self.crossAlignName = 'vAlign' if horizontal else 'hAlign'
+
+
+def linearSpacings(batch, axes):
+    # Returns the (B, N - 1) spacings between adjacent subviews.
+    baseSpacing = numpy.ceil(batch.layout[axes.spacingName])[:, numpy.newaxis]
+    return roundf(baseSpacing +
+                  batch.views[axes.trailingAdjustmentName][:, :-1] +
+                  batch.views[axes.leadingAdjustmentName][:, 1:])
+
+
+def maxTotalSubviewsSizes(contentSizes, spacings, axes):
+    # Returns the (B,) max total axis size and (B,) max cross size of the subviews.
+    return contentSizes[:, axes.axis] - spacings.sum(axis=1), contentSizes[:, axes.cross]
+
+
+def updateCrossSizes(batch, axes, desiredSizes, crossSizes, maxCrossSizes, rows):
+    # WeViewLinearLayout updateSizingOfSubviews:...; leaves ignore their max
+    # cell size, so only the crop depends on the axis sizes.
+    if not axes.horizontal:
+        return
+    subviewCrossSizes = desiredSizes[:, :, axes.cross]
+    crop = (batch.layout['cropSubviewOverflow'] > 0)[:, numpy.newaxis]
+    subviewCrossSizes = numpy.where(crop, numpy.minimum(maxCrossSizes[:, numpy.newaxis], subviewCrossSizes), subviewCrossSizes)
+    crossSizes[rows] = subviewCrossSizes[rows]
+
+
+def stretchOrCropContents(batch, axes, desiredSizes, axisSizes, crossSizes, stretchWeights, spacings,
+                          hasAxisStretch, contentSizes, isLayingOut, rows):
+    # WeViewLinearLayout stretchOrCropContents:..., applied in place to the
+    # selected rows.
+    layout = batch.layout
+    cropSubviewOverflow = rows & (layout['cropSubviewOverflow'] > 0) & isLayingOut
+    maxTotalAxisSizes, maxCrossSizes = maxTotalSubviewsSizes(contentSizes, spacings, axes)
+    extraAxisSpace = maxTotalAxisSizes - axisSizes.sum(axis=1)
+
+    # Crop from subviews with axis stretch first.
+    isCropping = cropSubviewOverflow & (extraAxisSpace < 0)
+    cropStretch = isCropping & hasAxisStretch
+    distributeAdjustment(axisSizes, -extraAxisSpace, stretchWeights, -1.0, True, cropStretch)
+    updateCrossSizes(batch, axes, desiredSizes, crossSizes, maxCrossSizes, cropStretch)
+    extraAxisSpace = numpy.where(cropStretch, maxTotalAxisSizes - axisSizes.sum(axis=1), extraAxisSpace)
+
+    # If we still have underflow, crop all subviews.
+    cropAll = isCropping & (extraAxisSpace < 0)
+    distributeAdjustment(axisSizes, -extraAxisSpace, axisSizes.copy(), -1.0, True, cropAll)
+    updateCrossSizes(batch, axes, desiredSizes, crossSizes, maxCrossSizes, cropAll)
+
+    isStretching = rows & ~isCropping & (extraAxisSpace > 0)
+    stretchCells = isStretching & hasAxisStretch
+    distributeAdjustment(axisSizes, extraAxisSpace, stretchWeights, +1.0, True, stretchCells)
+    updateCrossSizes(batch, axes, desiredSizes, crossSizes, maxCrossSizes, stretchCells)
+    stretchSpacings = isStretching & ~hasAxisStretch & (layout['spacingStretches'] > 0) & isLayingOut
+    distributeAdjustment(spacings, extraAxisSpace, numpy.ones(spacings.shape), +1.0, False, stretchSpacings)
+
+    crossSizes[cropSubviewOverflow] = numpy.minimum(crossSizes, maxCrossSizes[:, numpy.newaxis])[cropSubviewOverflow]
+
+
+def linearCells(batch, axes, guideSizes, isLayingOut):
+    # The sizing shared by minSizeOfContentsView: and layoutContentsOfView:.
+    guideSizes = numpy.maximum(guideSizes, 0.0)
+    spacings = linearSpacings(batch, axes)
+    origins, contentSizes = contentBounds(batch.layout, guideSizes)
+    desiredSizes = desiredItemSizes(batch)
+    axisSizes = desiredSizes[:, :, axes.axis].copy()
+    crossSizes = desiredSizes[:, :, axes.cross].copy()
+    stretchWeights = numpy.maximum(0.0, batch.views[axes.axisStretchName])
+    hasAxisStretch = (stretchWeights > 0).any(axis=1)
+    if isLayingOut:
+        rows = numpy.ones(batch.batchSize(), dtype=bool)
+    else:
+        rows = guideSizes[:, 0] * guideSizes[:, 1] > 0
+    stretchOrCropContents(batch, axes, desiredSizes, axisSizes, crossSizes, stretchWeights, spacings,
+                          hasAxisStretch, contentSizes, isLayingOut, rows)
+    return origins, contentSizes, spacings, axisSizes, crossSizes, hasAxisStretch
+
+
+def linearMinSizes(batch, axes, guideSizes):
+    origins, contentSizes, spacings, axisSizes, crossSizes, hasAxisStretch = linearCells(batch, axes, guideSizes, False)
+    result = insetSizes(batch.layout)
+    result[:, axes.axis] += spacings.sum(axis=1) + axisSizes.sum(axis=1)
+    result[:, axes.cross] += numpy.maximum(0.0, crossSizes.max(axis=1))
+    return result
+
+
+def linearFrames(batch, axes, sizes):
+    origins, contentSizes, spacings, axisSizes, crossSizes, hasAxisStretch = linearCells(batch, axes, sizes, True)
+    layout = batch.layout
+    batchSize, subviewCount = batch.batchSize(), batch.subviewCount()
+    maxTotalAxisSizes, maxCrossSizes = maxTotalSubviewsSizes(contentSizes, spacings, axes)
+
+    hasCrossStretch = batch.views[axes.crossStretchName] > 0
+    crossSizes = numpy.where(hasCrossStretch, maxCrossSizes[:, numpy.newaxis], crossSizes)
+    bodyCrossSizes = numpy.maximum(0.0, crossSizes.max(axis=1))
+    totalAxisSizes = numpy.where(hasAxisStretch, maxTotalAxisSizes, axisSizes.sum(axis=1))
+
+    # Honor the axis alignment, and the cross alignment if no subview stretches across.
+    extraAxisSpace = maxTotalAxisSizes - totalAxisSizes
+    extraCrossSpace = maxCrossSizes - bodyCrossSizes
+    axisIndex = origins[:, axes.axis] + alignOffsets(layout[axes.axisAlignName], extraAxisSpace, roundf(extraAxisSpace / 2))
+    crossIndex = origins[:, axes.cross] + numpy.where(hasCrossStretch.any(axis=1), 0.0,
+                                                      alignOffsets(layout[axes.crossAlignName], extraCrossSpace, roundf(extraCrossSpace / 2)))
+
+    frames = numpy.zeros((batchSize, subviewCount, 4,))
+    for index in range(subviewCount):
+        cells = numpy.zeros((batchSize, 4,))
+        cells[:, axes.axis] = axisIndex
+        cells[:, axes.cross] = crossIndex
+        cells[:, 2 + axes.axis] = axisSizes[:, index]
+        cells[:, 2 + axes.cross] = bodyCrossSizes
+        subviewSizes = numpy.zeros((batchSize, 2,))
+        subviewSizes[:, axes.axis] = axisSizes[:, index]
+        subviewSizes[:, axes.cross] = crossSizes[:, index]
+        views = dict([(name, values[:, index]) for name, values in batch.views.items()])
+        frames[:, index] = positionSubviews(layout, views, batch.subviewSizes[:, index], subviewSizes, cells)
+
+        axisIndex = frames[:, index, axes.axis] + frames[:, index, 2 + axes.axis]
+        if index < spacings.shape[1]:
+            axisIndex = axisIndex + spacings[:, index]
+    return frames
+
+
+def stackMinSizes(batch, guideSizes):
+    return insetSizes(batch.layout) + numpy.maximum(0.0, desiredItemSizes(batch).max(axis=1))
+
+
+def stackFrames(batch, sizes):
+    # Stack layouts use the unclamped size of the container.
+    origins, contentSizes = contentBounds(batch.layout, sizes)
+    subviewSizes = desiredItemSizes(batch)
+    crop = (batch.layout['cropSubviewOverflow'] > 0)[:, numpy.newaxis, numpy.newaxis]
+    subviewSizes = numpy.where(crop, numpy.minimum(subviewSizes, contentSizes[:, numpy.newaxis]), subviewSizes)
+    cells = numpy.concatenate((origins, contentSizes,), axis=-1)[:, numpy.newaxis]
+    layout = dict([(name, values[:, numpy.newaxis]) for name, values in batch.layout.items()])
+    return positionSubviews(layout, batch.views, batch.subviewSizes, subviewSizes, cells)
+
+
+def gridRowAndColumnCount(batch):
+    columnCount = batch.grid.columnCount
+    if columnCount > 0:
+        return int(numpy.ceil(batch.subviewCount() / columnCount)), columnCount
+    return 1, batch.subviewCount()
+
+
+def gridSizing(batch):
+    # WeViewGridLayout getGridLayoutInfo:..., vectorized.  Returns the (B, C)
+    # column widths, (B, R) row heights, (B, C - 1) column spacings and
+    # (B, R - 1) row spacings of the grids.
+    #
+    # The max subview size it computes only matters to subviews whose desired
+    # size depends on it, which leaves don't.  The container is taken not to
+    # ignore its desired size.
+    grid = batch.grid
+    batchSize = batch.batchSize()
+    rowCount, columnCount = gridRowAndColumnCount(batch)
+
+    # Empty cells are zero-sized, like the unfilled columns and rows of the ObjC.
+    cellSizes = numpy.zeros((batchSize, rowCount * columnCount, 2,))
+    cellSizes[:, :batch.subviewCount()] = desiredItemSizes(batch)
+    cellSizes = cellSizes.reshape((batchSize, rowCount, columnCount, 2,))
+    columnWidths = cellSizes[:, :, :, 0].max(axis=1)
+    rowHeights = cellSizes[:, :, :, 1].max(axis=2)
+
+    # Uniform grids use the (int) size of the largest cell.
+    isGridUniform = (grid.isGridUniform > 0)[:, numpy.newaxis]
+    columnWidths = numpy.where(isGridUniform, numpy.trunc(columnWidths.max(axis=1))[:, numpy.newaxis], columnWidths)
+    rowHeights = numpy.where(isGridUniform, numpy.trunc(rowHeights.max(axis=1))[:, numpy.newaxis], rowHeights)
+
+    hasCellSizeHint = (grid.hasCellSizeHint > 0)[:, numpy.newaxis]
+    columnWidths = numpy.where(hasCellSizeHint, grid.cellSizeHints[:, 0:1], columnWidths)
+    rowHeights = numpy.where(hasCellSizeHint, grid.cellSizeHints[:, 1:2], rowHeights)
+
+    columnWidths = numpy.maximum(0.0, numpy.ceil(columnWidths))
+    rowHeights = numpy.maximum(0.0, numpy.ceil(rowHeights))
+    columnSpacings = numpy.repeat(numpy.ceil(batch.layout['hSpacing'])[:, numpy.newaxis], columnCount - 1, axis=1)
+    rowSpacings = numpy.repeat(numpy.ceil(batch.layout['vSpacing'])[:, numpy.newaxis], rowCount - 1, axis=1)
+    return columnWidths, rowHeights, columnSpacings, rowSpacings
+
+
+def gridMinSizes(batch, guideSizes, sizing=None):
+    # Grids ignore the guide size.  sizing is the gridSizing() of the batch, if known.
+    columnWidths, rowHeights, columnSpacings, rowSpacings = sizing or gridSizing(batch)
+    totalSizes = numpy.stack((columnWidths.sum(axis=1) + columnSpacings.sum(axis=1),
+                              rowHeights.sum(axis=1) + rowSpacings.sum(axis=1),), axis=-1)
+    return numpy.maximum(0.0, numpy.ceil(totalSizes + insetSizes(batch.layout)))
+
+
+def gridLayout(batch, sizes, sizing=None):
+    # WeViewGridLayout layoutContentsOfView:, vectorized.  Returns the (B, N,
+    # 4) frames of the subviews and the (B, C) column widths and (B, R) row
+    # heights of the grids after stretching or cropping.
+    layout = batch.layout
+    stretchPolicy = batch.grid.stretchPolicy
+    rowCount, columnCount = gridRowAndColumnCount(batch)
+    columnWidths, rowHeights, columnSpacings, rowSpacings = [values.copy() for values in sizing or gridSizing(batch)]
+    origins, contentSizes = contentBounds(layout, numpy.maximum(sizes, 0.0))
+
+    for axis, cellSizes, spacings, alignName in ((0, columnWidths, columnSpacings, 'hAlign',),
+                                                 (1, rowHeights, rowSpacings, 'vAlign',),):
+        maxTotalCellSizes = numpy.maximum(0.0, numpy.floor(contentSizes[:, axis] - spacings.sum(axis=1)))
+        extraCellSpace = maxTotalCellSizes - cellSizes.sum(axis=1)
+        isStretching = extraCellSpace > 0
+        # Stretch the cells or the spacings in proportion to their size, or align the grid body.
+        distributeAdjustment(cellSizes, extraCellSpace, cellSizes.copy(), +1.0, True,
+                             isStretching & (stretchPolicy == GRID_STRETCH_POLICY_STRETCH_CELLS))
+        distributeAdjustment(spacings, extraCellSpace, spacings.copy(), +1.0, True,
+                             isStretching & (stretchPolicy == GRID_STRETCH_POLICY_STRETCH_SPACING))
+        origins[:, axis] += numpy.where(isStretching & (stretchPolicy == GRID_STRETCH_POLICY_NO_STRETCH),
+                                        alignOffsets(layout[alignName], extraCellSpace, roundf(extraCellSpace / 2)),
+                                        0.0)
+        # Crop larger cells more.
+        distributeAdjustment(cellSizes, -extraCellSpace, cellSizes.copy(), -1.0, True,
+                             (extraCellSpace < 0) & (layout['cropSubviewOverflow'] > 0))
+
+    columnXs = origins[:, 0:1] + numpy.concatenate((numpy.zeros((batch.batchSize(), 1,)),
+                                                    numpy.cumsum(columnWidths[:, :-1] + columnSpacings, axis=1),), axis=1)
+    rowYs = origins[:, 1:2] + numpy.concatenate((numpy.zeros((batch.batchSize(), 1,)),
+                                                 numpy.cumsum(rowHeights[:, :-1] + rowSpacings, axis=1),), axis=1)
+    subviewIndices = numpy.arange(batch.subviewCount())
+    columns, rows = subviewIndices % columnCount, subviewIndices // columnCount
+    cells = numpy.stack((columnXs[:, columns],
+                         rowYs[:, rows],
+                         columnWidths[:, columns],
+                         rowHeights[:, rows],), axis=-1)
+    layoutValues = dict([(name, values[:, numpy.newaxis]) for name, values in layout.items()])
+    frames = positionSubviews(layoutValues, batch.views, batch.subviewSizes, desiredItemSizes(batch), cells)
+    return frames, columnWidths, rowHeights
+
+
+class GridSolver:
+    # Solves batches of grids, memoizing the column and row sizing of each
+    # configuration (properties, subviews and grid options) so that sweeps of
+    # container sizes, and repeated sweeps, only size each grid once.
+    def __init__(self, maxCacheSize=1 << 16):
+        self.maxCacheSize = maxCacheSize
+        self.cache = collections.OrderedDict()
+        self.hitCount = 0
+        self.missCount = 0
+
+    def sizing(self, batch):
+        # Returns the gridSizing() of the batch.
+        configurations, indices, inverse = numpy.unique(batch.configurationMatrix(), axis=0,
+                                                        return_index=True, return_inverse=True)
+        keys = [(batch.subviewCount(), batch.grid.columnCount, configuration.tobytes(),)
+                for configuration in configurations]
+        missingIndices = [index for index, key in enumerate(keys) if key not in self.cache]
+        self.missCount += len(missingIndices)
+        self.hitCount += len(keys) - len(missingIndices)
+
+        sizings = [self.cache.get(key) for key in keys]
+        if missingIndices:
+            missingSizing = gridSizing(batch.subset(indices[missingIndices]))
+            for missingIndex, index in enumerate(missingIndices):
+                sizings[index] = [values[missingIndex] for values in missingSizing]
+                self.cache[keys[index]] = sizings[index]
+            while len(self.cache) > self.maxCacheSize:
+                self.cache.popitem(last=False)
+
+        inverse = inverse.reshape(-1)
+        return [numpy.stack([sizing[index] for sizing in sizings])[inverse] for index in range(4)]
+
+    def solve(self, batch, sizes, rowIndices=None):
+        # Returns a dictionary of the (S, ...) results of laying out the grids
+        # at the given (S, 2) sizes.  rowIndices maps each size to its row of
+        # the batch; by default there is a row per size.
+        sizes = numpy.asarray(sizes, dtype=numpy.float64).reshape((-1, 2,))
+        if rowIndices is None:
+            rowIndices = numpy.arange(batch.batchSize())
+        rowBatch = batch.subset(rowIndices)
+        if batch.subviewCount() < 1:
+            return {
+                'minSize': insetSizes(rowBatch.layout),
+                'frames': numpy.zeros((len(rowIndices), 0, 4,)),
+                'columnWidths': numpy.zeros((len(rowIndices), 0,)),
+                'rowHeights': numpy.zeros((len(rowIndices), 0,)),
+            }
+        sizing = [values[rowIndices] for values in self.sizing(batch)]
+        frames, columnWidths, rowHeights = gridLayout(rowBatch, sizes, sizing)
+        return {
+            'minSize': gridMinSizes(rowBatch, sizes, sizing),
+            'frames': frames,
+            'columnWidths': columnWidths,
+            'rowHeights': rowHeights,
+        }
+
+
+def minSizes(batch, guideSizes):
+    # Returns the (B, 2) minSizeOfContentsView:thatFitsSize: of each container
+    # for the given (B, 2) guide sizes.
+    guideSizes = numpy.asarray(guideSizes, dtype=numpy.float64)
+    if batch.subviewCount() < 1:
+        return insetSizes(batch.layout)
+    if batch.layoutType == 'stack':
+        return stackMinSizes(batch, guideSizes)
+    if batch.layoutType == 'grid':
+        return gridMinSizes(batch, guideSizes)
+    return linearMinSizes(batch, LinearAxes(batch.layoutType == 'horizontal'), guideSizes)
+
+
+def layoutFrames(batch, sizes):
+    # Returns the (B, N, 4) frames that layoutContentsOfView: gives the
+    # subviews of containers of the given (B, 2) sizes.
+    sizes = numpy.asarray(sizes, dtype=numpy.float64)
+    if batch.subviewCount() < 1:
+        return numpy.zeros((batch.batchSize(), 0, 4,))
+    if batch.layoutType == 'stack':
+        return stackFrames(batch, sizes)
+    if batch.layoutType == 'grid':
+        return gridLayout(batch, sizes)[0]
+    return linearFrames(batch, LinearAxes(batch.layoutType == 'horizontal'), sizes)
+
+
+# --------
+
+def sweepValues(caseIndex, value):
+    if isinstance(value, numbers.Number):
+        return [float(value)]
+    if not isinstance(value, list) or len(value) != 3 or not value[2] > 0:
+        raise Exception('Invalid case %d: invalid sweep: %s' % (caseIndex, str(value), ))
+    return numpy.arange(*value, dtype=numpy.float64).tolist()
+
+
+def caseSizes(caseIndex, case):
+    # Returns the container sizes of a case: its sizes, then its sweep.
+    sizes = list(case.get('sizes', []))
+    for size in sizes:
+        if len(size) != 2:
+            raise Exception('Invalid case %d: invalid size: %s' % (caseIndex, str(size), ))
+    if 'sweep' in case:
+        sweep = case['sweep']
+        sizes.extend([[width, height]
+                      for height in sweepValues(caseIndex, sweep.get('height', 0))
+                      for width in sweepValues(caseIndex, sweep.get('width', 0))])
+    return sizes
+
+
+def validateCase(caseIndex, case):
+    if case.get('layout') not in layoutTypes:
+        raise Exception('Invalid case %d: unknown layout: %s' % (caseIndex, case.get('layout'), ))
+    for subview in case.get('subviews', []):
+        if len(subview.get('size', ())) != 2:
+            raise Exception('Invalid case %d: every subview needs a size' % caseIndex)
+    if 'grid' in case and case['layout'] != 'grid':
+        raise Exception('Invalid case %d: only grid layouts have grid options' % caseIndex)
+
+
+def solveCases(schema, cases, gridSolver=None):
+    # Returns the results of a list of cases, solving them in batches.
+    requireNumpy()
+    if gridSolver is None:
+        gridSolver = GridSolver()
+    batchCases = collections.OrderedDict()
+    allSizes = []
+    for caseIndex, case in enumerate(cases):
+        validateCase(caseIndex, case)
+        allSizes.append(caseSizes(caseIndex, case))
+        batchKey = (case['layout'], len(case.get('subviews', [])), int(case.get('grid', {}).get('columnCount', 1)),)
+        batchCases.setdefault(batchKey, []).append(caseIndex)
+
+    results = [{'layouts': []} for case in cases]
+    for (layoutType, subviewCount, columnCount), caseIndices in batchCases.items():
+        # Each case is a row of the batch, and each of its sizes refers to that row.
+        sizeCounts = [len(allSizes[caseIndex]) for caseIndex in caseIndices]
+        if sum(sizeCounts) == 0:
+            continue
+        rowIndices = numpy.repeat(numpy.arange(len(caseIndices)), sizeCounts)
+        sizes = numpy.array([size for caseIndex in caseIndices for size in allSizes[caseIndex]], dtype=numpy.float64)
+        batchCaseList = [cases[caseIndex] for caseIndex in caseIndices]
+        batch = schema.batch(layoutType,
+                             [case.get('layoutProperties', {}) for case in batchCaseList],
+                             [[dict([(name, value) for name, value in subview.items() if name != 'size'])
+                               for subview in case.get('subviews', [])]
+                              for case in batchCaseList],
+                             [[subview['size'] for subview in case.get('subviews', [])] for case in batchCaseList],
+                             [case.get('grid', {}) for case in batchCaseList])
+        if layoutType == 'grid':
+            batchResults = gridSolver.solve(batch, sizes, rowIndices)
+        else:
+            rowBatch = batch.subset(rowIndices)
+            batchResults = {
+                'minSize': minSizes(rowBatch, sizes),
+                'frames': layoutFrames(rowBatch, sizes),
+            }
+        batchResults['size'] = sizes
+        names = sorted(batchResults)
+        rows = iter(zip(*[batchResults[name].tolist() for name in names]))
+        for caseIndex, sizeCount in zip(caseIndices, sizeCounts):
+            results[caseIndex]['layouts'] = [dict(zip(names, next(rows))) for sizeIndex in range(sizeCount)]
+    return results
+
+
+def compareResults(expected, results):
+    # Returns a description of each layout that differs from expected.
+    differences = []
+    if len(expected) != len(results):
+        return ['expected %d cases, found %d' % (len(expected), len(results), )]
+    for caseIndex, (expectedCase, case) in enumerate(zip(expected, results)):
+        if len(expectedCase['layouts']) != len(case['layouts']):
+            differences.append('case %d: expected %d sizes, found %d' % (caseIndex, len(expectedCase['layouts']), len(case['layouts']), ))
+            continue
+        for expectedLayout, layout in zip(expectedCase['layouts'], case['layouts']):
+            for key in ('size', 'minSize', 'frames', 'columnWidths', 'rowHeights',):
+                # Either side may lack a key, eg. columnWidths outside grids.
+                if key not in expectedLayout and key not in layout:
+                    continue
+                if key not in expectedLayout:
+                    differences.append('case %d, size %s: %s: not expected' % (caseIndex, layout.get('size'), key, ))
+                elif key not in layout:
+                    differences.append('case %d, size %s: %s: missing' % (caseIndex, layout.get('size'), key, ))
+                elif expectedLayout[key] != layout[key]:
+                    differences.append('case %d, size %s: %s: %s != %s' % (caseIndex, layout.get('size'), key, expectedLayout[key], layout[key], ))
+    return differences
+
+
+def readJson(path):
+    with open(path, 'rt') as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Solves WeView linear, stack and grid layouts headlessly.')
+    parser.add_argument('--spec',
+                        help='a JSON spec whose property tables override those of CodeGenSpec.json')
+    subparsers = parser.add_subparsers(dest='command')
+
+    solveParser = subparsers.add_parser('solve', help='solve a cases file')
+    solveParser.add_argument('cases')
+    solveParser.add_argument('--output', help='write the results to a file rather than stdout')
+
+    checkParser = subparsers.add_parser('check', help='solve a cases file and compare it with saved results')
+    checkParser.add_argument('cases')
+    checkParser.add_argument('expected')
+
+    args = parser.parse_args(argv)
+
+    if args.command not in ('solve', 'check',):
+        parser.print_usage()
+        return 2
+
+    requireNumpy()
+    schema = LayoutSchema(CodeGen.loadPropertyTables(args.spec))
+    results = solveCases(schema, readJson(args.cases))
+
+    if args.command == 'solve':
+        if args.output:
+            with open(args.output, 'wt') as f:
+                json.dump(results, f, indent=4, sort_keys=True)
+                f.write('\n')
+        else:
+            print(json.dumps(results, indent=4, sort_keys=True))
+        return 0
+
+    differences = compareResults(readJson(args.expected), results)
+    for difference in differences:
+        print('Difference:', difference)
+    if differences:
+        return 1
+    print('No differences.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
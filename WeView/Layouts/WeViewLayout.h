@@ -83,19 +83,16 @@
 // Extra space will be distributed evenly between the spacings.
 //
 // Layouts will prefer to stretch subviews if possible.  Spacings will only be stretched if there
-// are no stretching subviews to receive the extra
-// space.
+// are no stretching subviews to receive the extra space.
 //
 // The spacings will not be cropped if the layout cannot fit its subviews within their superview,
 // even if this property is YES.Only applies to the horizontal, vertical and flow layouts.  In a
-// flow layout where spacingStretches is YES, the subviews are
-// justified.
+// flow layout where spacingStretches is YES, the subviews are justified.
 - (BOOL)spacingStretches;
 - (WeViewLayout *)setSpacingStretches:(BOOL)value;
 
 // By default, if the content size (ie. the total subview size plus margins and spacing) of a
-// WeView overflows its bounds, subviews are cropped to fit inside the available
-// space.
+// WeView overflows its bounds, subviews are cropped to fit inside the available space.
 //
 // If cropSubviewOverflow is NO, no cropping occurs and subviews may overflow the bounds of their
 // superview.
@@ -103,20 +100,16 @@
 - (WeViewLayout *)setCropSubviewOverflow:(BOOL)value;
 
 // By default, cellPositioning has a value of CELL_POSITIONING_NORMAL and cell size is based on
-// their desired size and they are aligned within their layout
-// cell.
+// their desired size and they are aligned within their layout cell.
 //
 // If cellPositioning is set to CELL_POSITIONING_FILL, subviews fill the entire bounds of their
-// layout cell, regardless of their desired
-// size.
+// layout cell, regardless of their desired size.
 //
 // If cellPositioning is set to CELL_POSITIONING_FILL_W_ASPECT_RATIO, subviews fill the entire
-// bounds of their layout cell but retain the aspect ratio of their desired
-// size.
+// bounds of their layout cell but retain the aspect ratio of their desired size.
 //
 // If cellPositioning is set to CELL_POSITIONING_FIT_W_ASPECT_RATIO, subviews are "fit" inside
-// the bounds of their layout cell and retain the aspect ratio of their desired
-// size.
+// the bounds of their layout cell and retain the aspect ratio of their desired size.
 - (CellPositioningMode)cellPositioning;
 - (WeViewLayout *)setCellPositioning:(CellPositioningMode)value;
 
@@ -142,6 +135,15 @@
 
 - (void)resetAllProperties;
 
+// Changes to the properties of this layout between beginLayoutUpdates and
+// endLayoutUpdates are coalesced into a single invalidation when the outermost
+// endLayoutUpdates is called.  Calls may be nested.
+- (void)beginLayoutUpdates;
+- (void)endLayoutUpdates;
+
+// Calls block between beginLayoutUpdates and endLayoutUpdates.
+- (WeViewLayout *)batchLayoutUpdates:(void (^)(void))block;
+
 #pragma mark - Utility Methods
 
 - (void)positionSubview:(UIView *)subview
@@ -58,32 +58,58 @@ CG_INLINE CGRect FitSizeInRect(CGRect srcRect, CGSize srcSize)
     return CenterSizeOnRect(srcRect, resultSize);
 }
 
+/* CODEGEN MARKER: Config Start */
+
+// The packed layout properties of a layout: 48 bytes on 64-bit, 28 bytes on 32-bit.
+typedef struct
+{
+    CGFloat leftMargin;
+    CGFloat rightMargin;
+    CGFloat topMargin;
+    CGFloat bottomMargin;
+    int vSpacing;
+    int hSpacing;
+    uint8_t hAlign;
+    uint8_t vAlign;
+    uint8_t cellPositioning;
+    unsigned char spacingStretches : 1;
+    unsigned char cropSubviewOverflow : 1;
+    unsigned char debugLayout : 1;
+    unsigned char debugMinSize : 1;
+} WeViewLayoutConfig;
+
+static const WeViewLayoutConfig kWeViewLayoutDefaultConfig = {
+    .leftMargin = 0.f,
+    .rightMargin = 0.f,
+    .topMargin = 0.f,
+    .bottomMargin = 0.f,
+    .vSpacing = 0,
+    .hSpacing = 0,
+    .hAlign = H_ALIGN_CENTER,
+    .vAlign = V_ALIGN_CENTER,
+    .cellPositioning = CELL_POSITIONING_NORMAL,
+    .spacingStretches = NO,
+    .cropSubviewOverflow = YES,
+    .debugLayout = NO,
+    .debugMinSize = NO,
+};
+
+/* CODEGEN MARKER: Config End */
+
 #pragma mark -
 
 @interface WeViewLayout ()
 {
 /* CODEGEN MARKER: Members Start */
 
-CGFloat _leftMargin;
-CGFloat _rightMargin;
-CGFloat _topMargin;
-CGFloat _bottomMargin;
-
-int _vSpacing;
-int _hSpacing;
-
-HAlign _hAlign;
-VAlign _vAlign;
-
-BOOL _spacingStretches;
-
-BOOL _cropSubviewOverflow;
-CellPositioningMode _cellPositioning;
-
-BOOL _debugLayout;
-BOOL _debugMinSize;
+WeViewLayoutConfig _config;
 
 /* CODEGEN MARKER: Members End */
+
+// The depth of nested beginLayoutUpdates calls and the invalidation deferred
+// until the outermost endLayoutUpdates.
+int _layoutUpdateDepth;
+LayoutInvalidation _pendingInvalidation;
 }
 
 @property (nonatomic, weak) WeView *_superview;
@@ -122,197 +148,292 @@ BOOL _debugMinSize;
     return CGSizeZero;
 }
 
+#pragma mark - Layout Updates
+
+// Applies (or, inside a batch of layout updates, defers) the invalidation
+// caused by a change to a property of this layout.
+- (void)invalidateLayout:(LayoutInvalidation)invalidation
+{
+    if (_layoutUpdateDepth > 0)
+    {
+        _pendingInvalidation = MAX(_pendingInvalidation, invalidation);
+        return;
+    }
+
+    switch (invalidation)
+    {
+        case LAYOUT_INVALIDATION_NONE:
+            break;
+        case LAYOUT_INVALIDATION_POSITION:
+        case LAYOUT_INVALIDATION_SIZE:
+            [self._superview setNeedsLayout];
+            break;
+        case LAYOUT_INVALIDATION_FULL:
+            [self._superview setNeedsLayoutIncludingContainers];
+            break;
+        default:
+            WeViewAssert(0);
+            break;
+    }
+}
+
+- (void)beginLayoutUpdates
+{
+    _layoutUpdateDepth++;
+}
+
+- (void)endLayoutUpdates
+{
+    WeViewAssert(_layoutUpdateDepth > 0);
+    _layoutUpdateDepth--;
+    if (_layoutUpdateDepth == 0)
+    {
+        LayoutInvalidation invalidation = _pendingInvalidation;
+        _pendingInvalidation = LAYOUT_INVALIDATION_NONE;
+        [self invalidateLayout:invalidation];
+    }
+}
+
+- (WeViewLayout *)batchLayoutUpdates:(void (^)(void))block
+{
+    [self beginLayoutUpdates];
+    block();
+    [self endLayoutUpdates];
+    return self;
+}
+
 #pragma mark - Per-Layout Properties
 
 /* CODEGEN MARKER: Accessors Start */
 
 - (CGFloat)leftMargin
 {
-    return _leftMargin;
+    return _config.leftMargin;
 }
 
 - (WeViewLayout *)setLeftMargin:(CGFloat)value
 {
-    _leftMargin = value;
-    [self._superview setNeedsLayout];
+    if (_config.leftMargin != value)
+    {
+        _config.leftMargin = value;
+        [self invalidateLayout:LAYOUT_INVALIDATION_SIZE];
+    }
     return self;
 }
 
 - (CGFloat)rightMargin
 {
-    return _rightMargin;
+    return _config.rightMargin;
 }
 
 - (WeViewLayout *)setRightMargin:(CGFloat)value
 {
-    _rightMargin = value;
-    [self._superview setNeedsLayout];
+    if (_config.rightMargin != value)
+    {
+        _config.rightMargin = value;
+        [self invalidateLayout:LAYOUT_INVALIDATION_SIZE];
+    }
     return self;
 }
 
 - (CGFloat)topMargin
 {
-    return _topMargin;
+    return _config.topMargin;
 }
 
 - (WeViewLayout *)setTopMargin:(CGFloat)value
 {
-    _topMargin = value;
-    [self._superview setNeedsLayout];
+    if (_config.topMargin != value)
+    {
+        _config.topMargin = value;
+        [self invalidateLayout:LAYOUT_INVALIDATION_SIZE];
+    }
     return self;
 }
 
 - (CGFloat)bottomMargin
 {
-    return _bottomMargin;
+    return _config.bottomMargin;
 }
 
 - (WeViewLayout *)setBottomMargin:(CGFloat)value
 {
-    _bottomMargin = value;
-    [self._superview setNeedsLayout];
+    if (_config.bottomMargin != value)
+    {
+        _config.bottomMargin = value;
+        [self invalidateLayout:LAYOUT_INVALIDATION_SIZE];
+    }
     return self;
 }
 
 - (int)vSpacing
 {
-    return _vSpacing;
+    return _config.vSpacing;
 }
 
 - (WeViewLayout *)setVSpacing:(int)value
 {
-    _vSpacing = value;
-    [self._superview setNeedsLayout];
+    if (_config.vSpacing != value)
+    {
+        _config.vSpacing = value;
+        [self invalidateLayout:LAYOUT_INVALIDATION_SIZE];
+    }
     return self;
 }
 
 - (int)hSpacing
 {
-    return _hSpacing;
+    return _config.hSpacing;
 }
 
 - (WeViewLayout *)setHSpacing:(int)value
 {
-    _hSpacing = value;
-    [self._superview setNeedsLayout];
+    if (_config.hSpacing != value)
+    {
+        _config.hSpacing = value;
+        [self invalidateLayout:LAYOUT_INVALIDATION_SIZE];
+    }
     return self;
 }
 
 - (HAlign)hAlign
 {
-    return _hAlign;
+    return (HAlign) _config.hAlign;
 }
 
 - (WeViewLayout *)setHAlign:(HAlign)value
 {
-    _hAlign = value;
-    [self._superview setNeedsLayout];
+    if (_config.hAlign != (uint8_t) value)
+    {
+        _config.hAlign = (uint8_t) value;
+        [self invalidateLayout:LAYOUT_INVALIDATION_POSITION];
+    }
     return self;
 }
 
 - (VAlign)vAlign
 {
-    return _vAlign;
+    return (VAlign) _config.vAlign;
 }
 
 - (WeViewLayout *)setVAlign:(VAlign)value
 {
-    _vAlign = value;
-    [self._superview setNeedsLayout];
+    if (_config.vAlign != (uint8_t) value)
+    {
+        _config.vAlign = (uint8_t) value;
+        [self invalidateLayout:LAYOUT_INVALIDATION_POSITION];
+    }
     return self;
 }
 
 - (BOOL)spacingStretches
 {
-    return _spacingStretches;
+    return (BOOL) _config.spacingStretches;
 }
 
 - (WeViewLayout *)setSpacingStretches:(BOOL)value
 {
-    _spacingStretches = value;
-    [self._superview setNeedsLayout];
+    if (_config.spacingStretches != (value ? 1 : 0))
+    {
+        _config.spacingStretches = (value ? 1 : 0);
+        [self invalidateLayout:LAYOUT_INVALIDATION_POSITION];
+    }
     return self;
 }
 
 - (BOOL)cropSubviewOverflow
 {
-    return _cropSubviewOverflow;
+    return (BOOL) _config.cropSubviewOverflow;
 }
 
 - (WeViewLayout *)setCropSubviewOverflow:(BOOL)value
 {
-    _cropSubviewOverflow = value;
-    [self._superview setNeedsLayout];
+    if (_config.cropSubviewOverflow != (value ? 1 : 0))
+    {
+        _config.cropSubviewOverflow = (value ? 1 : 0);
+        [self invalidateLayout:LAYOUT_INVALIDATION_FULL];
+    }
     return self;
 }
 
 - (CellPositioningMode)cellPositioning
 {
-    return _cellPositioning;
+    return (CellPositioningMode) _config.cellPositioning;
 }
 
 - (WeViewLayout *)setCellPositioning:(CellPositioningMode)value
 {
-    _cellPositioning = value;
-    [self._superview setNeedsLayout];
+    if (_config.cellPositioning != (uint8_t) value)
+    {
+        _config.cellPositioning = (uint8_t) value;
+        [self invalidateLayout:LAYOUT_INVALIDATION_POSITION];
+    }
     return self;
 }
 
 - (BOOL)debugLayout
 {
-    return _debugLayout;
+    return (BOOL) _config.debugLayout;
 }
 
 - (WeViewLayout *)setDebugLayout:(BOOL)value
 {
-    _debugLayout = value;
-    [self._superview setNeedsLayout];
+    if (_config.debugLayout != (value ? 1 : 0))
+    {
+        _config.debugLayout = (value ? 1 : 0);
+    }
     return self;
 }
 
 - (BOOL)debugMinSize
 {
-    return _debugMinSize;
+    return (BOOL) _config.debugMinSize;
 }
 
 - (WeViewLayout *)setDebugMinSize:(BOOL)value
 {
-    _debugMinSize = value;
-    [self._superview setNeedsLayout];
+    if (_config.debugMinSize != (value ? 1 : 0))
+    {
+        _config.debugMinSize = (value ? 1 : 0);
+    }
     return self;
 }
 
 - (WeViewLayout *)setHMargin:(CGFloat)value
 {
+    [self beginLayoutUpdates];
     [self setLeftMargin:value];
     [self setRightMargin:value];
-    [self._superview setNeedsLayout];
+    [self endLayoutUpdates];
     return self;
 }
 
 - (WeViewLayout *)setVMargin:(CGFloat)value
 {
+    [self beginLayoutUpdates];
     [self setTopMargin:value];
     [self setBottomMargin:value];
-    [self._superview setNeedsLayout];
+    [self endLayoutUpdates];
     return self;
 }
 
 - (WeViewLayout *)setMargin:(CGFloat)value
 {
+    [self beginLayoutUpdates];
     [self setLeftMargin:value];
     [self setRightMargin:value];
     [self setTopMargin:value];
     [self setBottomMargin:value];
-    [self._superview setNeedsLayout];
+    [self endLayoutUpdates];
     return self;
 }
 
 - (WeViewLayout *)setSpacing:(int)value
 {
+    [self beginLayoutUpdates];
     [self setHSpacing:value];
     [self setVSpacing:value];
-    [self._superview setNeedsLayout];
+    [self endLayoutUpdates];
     return self;
 }
 
@@ -322,23 +443,10 @@ BOOL _debugMinSize;
 {
     /* CODEGEN MARKER: Reset Start */
 
-    self.leftMargin = 0.f;
-    self.rightMargin = 0.f;
-    self.topMargin = 0.f;
-    self.bottomMargin = 0.f;
-    self.vSpacing = 0;
-    self.hSpacing = 0;
-    self.hAlign = H_ALIGN_CENTER;
-    self.vAlign = V_ALIGN_CENTER;
-    self.spacingStretches = NO;
-    self.cropSubviewOverflow = NO;
-    self.cellPositioning = CELL_POSITIONING_NORMAL;
-    self.debugLayout = NO;
-    self.debugMinSize = NO;
+    _config = kWeViewLayoutDefaultConfig;
+    [self invalidateLayout:LAYOUT_INVALIDATION_FULL];
 
 /* CODEGEN MARKER: Reset End */
-
-    _cropSubviewOverflow = YES;
 }
 
 #pragma mark - Utility Methods
@@ -364,7 +472,7 @@ BOOL _debugMinSize;
     {
         return subview.cellHAlign;
     }
-    return _hAlign;
+    return self.hAlign;
 }
 
 - (VAlign)subviewCellVAlign:(UIView *)view
@@ -374,7 +482,7 @@ BOOL _debugMinSize;
     {
         return subview.cellVAlign;
     }
-    return _vAlign;
+    return self.vAlign;
 }
 
 - (CGRect)alignSize:(CGSize)size
@@ -520,17 +628,23 @@ BOOL _debugMinSize;
 - (CGSize)desiredItemSize:(UIView *)subview
                   maxSize:(CGSize)maxSize
 {
-    if (subview.ignoreDesiredSize)
+    // Read all of the subview's sizing properties with a single associated
+    // object lookup.
+    WeViewLayoutSnapshot snapshot = [subview layoutSnapshot];
+    if (snapshot.ignoreDesiredSize)
     {
         return CGSizeZero;
     }
 
     CGSize desiredSize = CGSizeAdd([subview sizeThatFits:maxSize],
-                                   [subview desiredSizeAdjustment]);
+                                   CGSizeMake(snapshot.desiredWidthAdjustment,
+                                              snapshot.desiredHeightAdjustment));
 
     return CGSizeCeil(CGSizeMax(CGSizeMax(CGSizeZero,
-                                          subview.minDesiredSize),
-                                CGSizeMin(subview.maxDesiredSize,
+                                          CGSizeMake(snapshot.minDesiredWidth,
+                                                     snapshot.minDesiredHeight)),
+                                CGSizeMin(CGSizeMake(snapshot.maxDesiredWidth,
+                                                     snapshot.maxDesiredHeight),
                                           desiredSize)));
 }
 
@@ -644,19 +758,8 @@ BOOL _debugMinSize;
 {
     /* CODEGEN MARKER: Copy Configuration Start */
 
-    self.leftMargin = layout.leftMargin;
-    self.rightMargin = layout.rightMargin;
-    self.topMargin = layout.topMargin;
-    self.bottomMargin = layout.bottomMargin;
-    self.vSpacing = layout.vSpacing;
-    self.hSpacing = layout.hSpacing;
-    self.hAlign = layout.hAlign;
-    self.vAlign = layout.vAlign;
-    self.spacingStretches = layout.spacingStretches;
-    self.cropSubviewOverflow = layout.cropSubviewOverflow;
-    self.cellPositioning = layout.cellPositioning;
-    self.debugLayout = layout.debugLayout;
-    self.debugMinSize = layout.debugMinSize;
+    _config = layout->_config;
+    [self invalidateLayout:LAYOUT_INVALIDATION_FULL];
 
 /* CODEGEN MARKER: Copy Configuration End */
 }
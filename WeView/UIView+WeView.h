@@ -15,6 +15,32 @@
 
 #import "WeViewEnums.h"
 
+/* CODEGEN MARKER: Layout Snapshot Start */
+
+// The layout-relevant properties of a view.  See -[UIView layoutSnapshot].
+typedef struct
+{
+    CGFloat minDesiredWidth;
+    CGFloat maxDesiredWidth;
+    CGFloat minDesiredHeight;
+    CGFloat maxDesiredHeight;
+    CGFloat hStretchWeight;
+    CGFloat vStretchWeight;
+    int leftSpacingAdjustment;
+    int topSpacingAdjustment;
+    int rightSpacingAdjustment;
+    int bottomSpacingAdjustment;
+    CGFloat desiredWidthAdjustment;
+    CGFloat desiredHeightAdjustment;
+    BOOL ignoreDesiredSize;
+    HAlign cellHAlign;
+    VAlign cellVAlign;
+    BOOL hasCellHAlign;
+    BOOL hasCellVAlign;
+} WeViewLayoutSnapshot;
+
+/* CODEGEN MARKER: Layout Snapshot End */
+
 @interface UIView (WeView) <NSCopying>
 
 /* CODEGEN MARKER: Start */
@@ -36,16 +62,14 @@
 - (UIView *)setMaxDesiredHeight:(CGFloat)value;
 
 // The horizontal stretch weight of this view. If non-zero, the view is willing to take available
-// space or be cropped if
-// necessary.
+// space or be cropped if necessary.
 //
 // Subviews with larger relative stretch weights will be stretched more.
 - (CGFloat)hStretchWeight;
 - (UIView *)setHStretchWeight:(CGFloat)value;
 
 // The vertical stretch weight of this view. If non-zero, the view is willing to take available
-// space or be cropped if
-// necessary.
+// space or be cropped if necessary.
 //
 // Subviews with larger relative stretch weights will be stretched more.
 - (CGFloat)vStretchWeight;
@@ -143,13 +167,15 @@
 - (UIView *)setFixedDesiredHeight:(CGFloat)value;
 
 // Convenience accessor(s) for the minDesiredWidth, minDesiredHeight, maxDesiredWidth and
-// maxDesiredHeight
-// properties.
+// maxDesiredHeight properties.
 - (UIView *)setFixedDesiredSize:(CGSize)value;
 
 // Convenience accessor(s) for the vStretchWeight and hStretchWeight properties.
 - (UIView *)setStretchWeight:(CGFloat)value;
 
+// All of this view's layout-relevant properties, read with a single associated object lookup.
+- (WeViewLayoutSnapshot)layoutSnapshot;
+
 /* CODEGEN MARKER: End */
 
 // The layout should stretch this subview horizontally to fit any available space.
@@ -215,4 +241,19 @@
 
 - (void)resetAllLayoutProperties;
 
+// Marks this view as needing layout, along with each WeView that contains it,
+// since the desired size of a WeView depends on those of its subviews.  Layout
+// property setters only do this for full invalidations; call it after changing
+// a desired size that the enclosing WeViews must pick up right away.
+- (void)setNeedsLayoutIncludingContainers;
+
+// Changes to the layout properties of this view between beginLayoutUpdates and
+// endLayoutUpdates are coalesced into a single invalidation when the outermost
+// endLayoutUpdates is called.  Calls may be nested.
+- (void)beginLayoutUpdates;
+- (void)endLayoutUpdates;
+
+// Calls block between beginLayoutUpdates and endLayoutUpdates.
+- (UIView *)batchLayoutUpdates:(void (^)(void))block;
+
 @end
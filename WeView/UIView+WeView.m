@@ -12,10 +12,14 @@
 #import <objc/runtime.h>
 
 #import "UIView+WeView.h"
+#import "WeView.h"
 #import "WeViewMacros.h"
 
 static const void *kWeViewKey_ViewInfo = &kWeViewKey_ViewInfo;
 
+/* CODEGEN MARKER: View Info Storage Start */
+/* CODEGEN MARKER: View Info Storage End */
+
 @interface WeViewViewInfo : NSObject
 
 /* CODEGEN MARKER: View Info H Start */
@@ -33,15 +37,13 @@ static const void *kWeViewKey_ViewInfo = &kWeViewKey_ViewInfo;
 @property (nonatomic) CGFloat maxDesiredHeight;
 
 // The horizontal stretch weight of this view. If non-zero, the view is willing to take available
-// space or be cropped if
-// necessary.
+// space or be cropped if necessary.
 //
 // Subviews with larger relative stretch weights will be stretched more.
 @property (nonatomic) CGFloat hStretchWeight;
 
 // The vertical stretch weight of this view. If non-zero, the view is willing to take available
-// space or be cropped if
-// necessary.
+// space or be cropped if necessary.
 //
 // Subviews with larger relative stretch weights will be stretched more.
 @property (nonatomic) CGFloat vStretchWeight;
@@ -126,21 +128,29 @@ static const void *kWeViewKey_ViewInfo = &kWeViewKey_ViewInfo;
 - (void)setFixedDesiredHeight:(CGFloat)value;
 
 // Convenience accessor(s) for the minDesiredWidth, minDesiredHeight, maxDesiredWidth and
-// maxDesiredHeight
-// properties.
+// maxDesiredHeight properties.
 - (void)setFixedDesiredSize:(CGSize)value;
 
 // Convenience accessor(s) for the vStretchWeight and hStretchWeight properties.
 - (void)setStretchWeight:(CGFloat)value;
 
+- (WeViewLayoutSnapshot)layoutSnapshot;
+
 /* CODEGEN MARKER: View Info H End */
 
+// The depth of nested beginLayoutUpdates calls and the invalidation deferred
+// until the outermost endLayoutUpdates.
+@property (nonatomic) int layoutUpdateDepth;
+@property (nonatomic) LayoutInvalidation pendingInvalidation;
+
 @end
 
 #pragma mark -
 
 @implementation WeViewViewInfo
 
+/* CODEGEN MARKER: View Info M Start */
+
 - (id)init
 {
     if (self = [super init])
@@ -152,8 +162,6 @@ static const void *kWeViewKey_ViewInfo = &kWeViewKey_ViewInfo;
     return self;
 }
 
-/* CODEGEN MARKER: View Info M Start */
-
 - (void)setCellHAlign:(HAlign)value
 {
     _cellHAlign = value;
@@ -225,6 +233,29 @@ static const void *kWeViewKey_ViewInfo = &kWeViewKey_ViewInfo;
     [self setHStretchWeight:value];
 }
 
+- (WeViewLayoutSnapshot)layoutSnapshot
+{
+    WeViewLayoutSnapshot snapshot;
+    snapshot.minDesiredWidth = _minDesiredWidth;
+    snapshot.maxDesiredWidth = _maxDesiredWidth;
+    snapshot.minDesiredHeight = _minDesiredHeight;
+    snapshot.maxDesiredHeight = _maxDesiredHeight;
+    snapshot.hStretchWeight = _hStretchWeight;
+    snapshot.vStretchWeight = _vStretchWeight;
+    snapshot.leftSpacingAdjustment = _leftSpacingAdjustment;
+    snapshot.topSpacingAdjustment = _topSpacingAdjustment;
+    snapshot.rightSpacingAdjustment = _rightSpacingAdjustment;
+    snapshot.bottomSpacingAdjustment = _bottomSpacingAdjustment;
+    snapshot.desiredWidthAdjustment = _desiredWidthAdjustment;
+    snapshot.desiredHeightAdjustment = _desiredHeightAdjustment;
+    snapshot.ignoreDesiredSize = _ignoreDesiredSize;
+    snapshot.cellHAlign = _cellHAlign;
+    snapshot.cellVAlign = _cellVAlign;
+    snapshot.hasCellHAlign = _hasCellHAlign;
+    snapshot.hasCellVAlign = _hasCellVAlign;
+    return snapshot;
+}
+
 /* CODEGEN MARKER: View Info M End */
 
 - (NSString *)formatLayoutDescriptionItem:(NSString *)key
@@ -267,6 +298,35 @@ static const void *kWeViewKey_ViewInfo = &kWeViewKey_ViewInfo;
 
 #pragma mark -
 
+// Applies (or, inside a batch of layout updates, defers) the invalidation
+// caused by a change to a layout property of view.
+static void InvalidateViewLayout(UIView *view, WeViewViewInfo *viewInfo, LayoutInvalidation invalidation)
+{
+    if (viewInfo.layoutUpdateDepth > 0)
+    {
+        viewInfo.pendingInvalidation = MAX(viewInfo.pendingInvalidation, invalidation);
+        return;
+    }
+
+    switch (invalidation)
+    {
+        case LAYOUT_INVALIDATION_NONE:
+            break;
+        case LAYOUT_INVALIDATION_POSITION:
+        case LAYOUT_INVALIDATION_SIZE:
+            [view.superview setNeedsLayout];
+            break;
+        case LAYOUT_INVALIDATION_FULL:
+            [view.superview setNeedsLayoutIncludingContainers];
+            break;
+        default:
+            WeViewAssert(0);
+            break;
+    }
+}
+
+#pragma mark -
+
 @implementation UIView (WeView)
 
 #pragma mark - Associated Values
@@ -282,302 +342,483 @@ static const void *kWeViewKey_ViewInfo = &kWeViewKey_ViewInfo;
     return value;
 }
 
+// Unlike viewInfo, doesn't create the view info if the view doesn't have one.
+- (WeViewViewInfo *)existingViewInfo
+{
+    return objc_getAssociatedObject(self, kWeViewKey_ViewInfo);
+}
+
 - (void)resetAllLayoutProperties
 {
+    WeViewViewInfo *viewInfo = [self existingViewInfo];
     objc_setAssociatedObject(self, kWeViewKey_ViewInfo, nil, OBJC_ASSOCIATION_RETAIN_NONATOMIC);
+    if (viewInfo.layoutUpdateDepth > 0)
+    {
+        // Don't lose track of an open batch of layout updates.
+        WeViewViewInfo *newViewInfo = self.viewInfo;
+        newViewInfo.layoutUpdateDepth = viewInfo.layoutUpdateDepth;
+        newViewInfo.pendingInvalidation = viewInfo.pendingInvalidation;
+    }
+}
+
+#pragma mark - Invalidation
+
+- (void)setNeedsLayoutIncludingContainers
+{
+    UIView *view = self;
+    while (view)
+    {
+        [view setNeedsLayout];
+        if (![view.superview isKindOfClass:[WeView class]])
+        {
+            break;
+        }
+        view = view.superview;
+    }
+}
+
+- (void)beginLayoutUpdates
+{
+    self.viewInfo.layoutUpdateDepth++;
+}
+
+- (void)endLayoutUpdates
+{
+    WeViewViewInfo *viewInfo = self.viewInfo;
+    WeViewAssert(viewInfo.layoutUpdateDepth > 0);
+    viewInfo.layoutUpdateDepth--;
+    if (viewInfo.layoutUpdateDepth == 0)
+    {
+        LayoutInvalidation invalidation = viewInfo.pendingInvalidation;
+        viewInfo.pendingInvalidation = LAYOUT_INVALIDATION_NONE;
+        InvalidateViewLayout(self, viewInfo, invalidation);
+    }
+}
+
+- (UIView *)batchLayoutUpdates:(void (^)(void))block
+{
+    [self beginLayoutUpdates];
+    block();
+    [self endLayoutUpdates];
+    return self;
 }
 
 /* CODEGEN MARKER: Accessors Start */
 
 - (CGFloat)minDesiredWidth
 {
-    return [self.viewInfo minDesiredWidth];
+    WeViewViewInfo *viewInfo = [self existingViewInfo];
+    return viewInfo ? [viewInfo minDesiredWidth] : 0.f;
 }
 
 - (UIView *)setMinDesiredWidth:(CGFloat)value
 {
-    [self.viewInfo setMinDesiredWidth:value];
-    [self.superview setNeedsLayout];
+    if ([self minDesiredWidth] != value)
+    {
+        WeViewViewInfo *viewInfo = self.viewInfo;
+        [viewInfo setMinDesiredWidth:value];
+        InvalidateViewLayout(self, viewInfo, LAYOUT_INVALIDATION_SIZE);
+    }
     return self;
 }
 
 - (CGFloat)maxDesiredWidth
 {
-    return [self.viewInfo maxDesiredWidth];
+    WeViewViewInfo *viewInfo = [self existingViewInfo];
+    return viewInfo ? [viewInfo maxDesiredWidth] : CGFLOAT_MAX;
 }
 
 - (UIView *)setMaxDesiredWidth:(CGFloat)value
 {
-    [self.viewInfo setMaxDesiredWidth:value];
-    [self.superview setNeedsLayout];
+    if ([self maxDesiredWidth] != value)
+    {
+        WeViewViewInfo *viewInfo = self.viewInfo;
+        [viewInfo setMaxDesiredWidth:value];
+        InvalidateViewLayout(self, viewInfo, LAYOUT_INVALIDATION_SIZE);
+    }
     return self;
 }
 
 - (CGFloat)minDesiredHeight
 {
-    return [self.viewInfo minDesiredHeight];
+    WeViewViewInfo *viewInfo = [self existingViewInfo];
+    return viewInfo ? [viewInfo minDesiredHeight] : 0.f;
 }
 
 - (UIView *)setMinDesiredHeight:(CGFloat)value
 {
-    [self.viewInfo setMinDesiredHeight:value];
-    [self.superview setNeedsLayout];
+    if ([self minDesiredHeight] != value)
+    {
+        WeViewViewInfo *viewInfo = self.viewInfo;
+        [viewInfo setMinDesiredHeight:value];
+        InvalidateViewLayout(self, viewInfo, LAYOUT_INVALIDATION_SIZE);
+    }
     return self;
 }
 
 - (CGFloat)maxDesiredHeight
 {
-    return [self.viewInfo maxDesiredHeight];
+    WeViewViewInfo *viewInfo = [self existingViewInfo];
+    return viewInfo ? [viewInfo maxDesiredHeight] : CGFLOAT_MAX;
 }
 
 - (UIView *)setMaxDesiredHeight:(CGFloat)value
 {
-    [self.viewInfo setMaxDesiredHeight:value];
-    [self.superview setNeedsLayout];
+    if ([self maxDesiredHeight] != value)
+    {
+        WeViewViewInfo *viewInfo = self.viewInfo;
+        [viewInfo setMaxDesiredHeight:value];
+        InvalidateViewLayout(self, viewInfo, LAYOUT_INVALIDATION_SIZE);
+    }
     return self;
 }
 
 - (CGFloat)hStretchWeight
 {
-    return [self.viewInfo hStretchWeight];
+    WeViewViewInfo *viewInfo = [self existingViewInfo];
+    return viewInfo ? [viewInfo hStretchWeight] : 0.f;
 }
 
 - (UIView *)setHStretchWeight:(CGFloat)value
 {
-    [self.viewInfo setHStretchWeight:value];
-    [self.superview setNeedsLayout];
+    if ([self hStretchWeight] != value)
+    {
+        WeViewViewInfo *viewInfo = self.viewInfo;
+        [viewInfo setHStretchWeight:value];
+        InvalidateViewLayout(self, viewInfo, LAYOUT_INVALIDATION_SIZE);
+    }
     return self;
 }
 
 - (CGFloat)vStretchWeight
 {
-    return [self.viewInfo vStretchWeight];
+    WeViewViewInfo *viewInfo = [self existingViewInfo];
+    return viewInfo ? [viewInfo vStretchWeight] : 0.f;
 }
 
 - (UIView *)setVStretchWeight:(CGFloat)value
 {
-    [self.viewInfo setVStretchWeight:value];
-    [self.superview setNeedsLayout];
+    if ([self vStretchWeight] != value)
+    {
+        WeViewViewInfo *viewInfo = self.viewInfo;
+        [viewInfo setVStretchWeight:value];
+        InvalidateViewLayout(self, viewInfo, LAYOUT_INVALIDATION_SIZE);
+    }
     return self;
 }
 
 - (int)leftSpacingAdjustment
 {
-    return [self.viewInfo leftSpacingAdjustment];
+    WeViewViewInfo *viewInfo = [self existingViewInfo];
+    return viewInfo ? [viewInfo leftSpacingAdjustment] : 0;
 }
 
 - (UIView *)setLeftSpacingAdjustment:(int)value
 {
-    [self.viewInfo setLeftSpacingAdjustment:value];
-    [self.superview setNeedsLayout];
+    if ([self leftSpacingAdjustment] != value)
+    {
+        WeViewViewInfo *viewInfo = self.viewInfo;
+        [viewInfo setLeftSpacingAdjustment:value];
+        InvalidateViewLayout(self, viewInfo, LAYOUT_INVALIDATION_SIZE);
+    }
     return self;
 }
 
 - (int)topSpacingAdjustment
 {
-    return [self.viewInfo topSpacingAdjustment];
+    WeViewViewInfo *viewInfo = [self existingViewInfo];
+    return viewInfo ? [viewInfo topSpacingAdjustment] : 0;
 }
 
 - (UIView *)setTopSpacingAdjustment:(int)value
 {
-    [self.viewInfo setTopSpacingAdjustment:value];
-    [self.superview setNeedsLayout];
+    if ([self topSpacingAdjustment] != value)
+    {
+        WeViewViewInfo *viewInfo = self.viewInfo;
+        [viewInfo setTopSpacingAdjustment:value];
+        InvalidateViewLayout(self, viewInfo, LAYOUT_INVALIDATION_SIZE);
+    }
     return self;
 }
 
 - (int)rightSpacingAdjustment
 {
-    return [self.viewInfo rightSpacingAdjustment];
+    WeViewViewInfo *viewInfo = [self existingViewInfo];
+    return viewInfo ? [viewInfo rightSpacingAdjustment] : 0;
 }
 
 - (UIView *)setRightSpacingAdjustment:(int)value
 {
-    [self.viewInfo setRightSpacingAdjustment:value];
-    [self.superview setNeedsLayout];
+    if ([self rightSpacingAdjustment] != value)
+    {
+        WeViewViewInfo *viewInfo = self.viewInfo;
+        [viewInfo setRightSpacingAdjustment:value];
+        InvalidateViewLayout(self, viewInfo, LAYOUT_INVALIDATION_SIZE);
+    }
     return self;
 }
 
 - (int)bottomSpacingAdjustment
 {
-    return [self.viewInfo bottomSpacingAdjustment];
+    WeViewViewInfo *viewInfo = [self existingViewInfo];
+    return viewInfo ? [viewInfo bottomSpacingAdjustment] : 0;
 }
 
 - (UIView *)setBottomSpacingAdjustment:(int)value
 {
-    [self.viewInfo setBottomSpacingAdjustment:value];
-    [self.superview setNeedsLayout];
+    if ([self bottomSpacingAdjustment] != value)
+    {
+        WeViewViewInfo *viewInfo = self.viewInfo;
+        [viewInfo setBottomSpacingAdjustment:value];
+        InvalidateViewLayout(self, viewInfo, LAYOUT_INVALIDATION_SIZE);
+    }
     return self;
 }
 
 - (CGFloat)desiredWidthAdjustment
 {
-    return [self.viewInfo desiredWidthAdjustment];
+    WeViewViewInfo *viewInfo = [self existingViewInfo];
+    return viewInfo ? [viewInfo desiredWidthAdjustment] : 0.f;
 }
 
 - (UIView *)setDesiredWidthAdjustment:(CGFloat)value
 {
-    [self.viewInfo setDesiredWidthAdjustment:value];
-    [self.superview setNeedsLayout];
+    if ([self desiredWidthAdjustment] != value)
+    {
+        WeViewViewInfo *viewInfo = self.viewInfo;
+        [viewInfo setDesiredWidthAdjustment:value];
+        InvalidateViewLayout(self, viewInfo, LAYOUT_INVALIDATION_SIZE);
+    }
     return self;
 }
 
 - (CGFloat)desiredHeightAdjustment
 {
-    return [self.viewInfo desiredHeightAdjustment];
+    WeViewViewInfo *viewInfo = [self existingViewInfo];
+    return viewInfo ? [viewInfo desiredHeightAdjustment] : 0.f;
 }
 
 - (UIView *)setDesiredHeightAdjustment:(CGFloat)value
 {
-    [self.viewInfo setDesiredHeightAdjustment:value];
-    [self.superview setNeedsLayout];
+    if ([self desiredHeightAdjustment] != value)
+    {
+        WeViewViewInfo *viewInfo = self.viewInfo;
+        [viewInfo setDesiredHeightAdjustment:value];
+        InvalidateViewLayout(self, viewInfo, LAYOUT_INVALIDATION_SIZE);
+    }
     return self;
 }
 
 - (BOOL)ignoreDesiredSize
 {
-    return [self.viewInfo ignoreDesiredSize];
+    WeViewViewInfo *viewInfo = [self existingViewInfo];
+    return viewInfo ? [viewInfo ignoreDesiredSize] : NO;
 }
 
 - (UIView *)setIgnoreDesiredSize:(BOOL)value
 {
-    [self.viewInfo setIgnoreDesiredSize:value];
-    [self.superview setNeedsLayout];
+    if ([self ignoreDesiredSize] != value)
+    {
+        WeViewViewInfo *viewInfo = self.viewInfo;
+        [viewInfo setIgnoreDesiredSize:value];
+        InvalidateViewLayout(self, viewInfo, LAYOUT_INVALIDATION_SIZE);
+    }
     return self;
 }
 
 - (HAlign)cellHAlign
 {
-    return [self.viewInfo cellHAlign];
+    WeViewViewInfo *viewInfo = [self existingViewInfo];
+    return viewInfo ? [viewInfo cellHAlign] : H_ALIGN_LEFT;
 }
 
 - (UIView *)setCellHAlign:(HAlign)value
 {
-    [self.viewInfo setCellHAlign:value];
-    [self.superview setNeedsLayout];
+    if ([self cellHAlign] != value || !self.hasCellHAlign)
+    {
+        WeViewViewInfo *viewInfo = self.viewInfo;
+        [viewInfo setCellHAlign:value];
+        InvalidateViewLayout(self, viewInfo, LAYOUT_INVALIDATION_POSITION);
+    }
     return self;
 }
 
 - (VAlign)cellVAlign
 {
-    return [self.viewInfo cellVAlign];
+    WeViewViewInfo *viewInfo = [self existingViewInfo];
+    return viewInfo ? [viewInfo cellVAlign] : V_ALIGN_TOP;
 }
 
 - (UIView *)setCellVAlign:(VAlign)value
 {
-    [self.viewInfo setCellVAlign:value];
-    [self.superview setNeedsLayout];
+    if ([self cellVAlign] != value || !self.hasCellVAlign)
+    {
+        WeViewViewInfo *viewInfo = self.viewInfo;
+        [viewInfo setCellVAlign:value];
+        InvalidateViewLayout(self, viewInfo, LAYOUT_INVALIDATION_POSITION);
+    }
     return self;
 }
 
 - (BOOL)hasCellHAlign
 {
-    return [self.viewInfo hasCellHAlign];
+    WeViewViewInfo *viewInfo = [self existingViewInfo];
+    return viewInfo ? [viewInfo hasCellHAlign] : NO;
 }
 
 - (UIView *)setHasCellHAlign:(BOOL)value
 {
-    [self.viewInfo setHasCellHAlign:value];
-    [self.superview setNeedsLayout];
+    if ([self hasCellHAlign] != value)
+    {
+        WeViewViewInfo *viewInfo = self.viewInfo;
+        [viewInfo setHasCellHAlign:value];
+        InvalidateViewLayout(self, viewInfo, LAYOUT_INVALIDATION_POSITION);
+    }
     return self;
 }
 
 - (BOOL)hasCellVAlign
 {
-    return [self.viewInfo hasCellVAlign];
+    WeViewViewInfo *viewInfo = [self existingViewInfo];
+    return viewInfo ? [viewInfo hasCellVAlign] : NO;
 }
 
 - (UIView *)setHasCellVAlign:(BOOL)value
 {
-    [self.viewInfo setHasCellVAlign:value];
-    [self.superview setNeedsLayout];
+    if ([self hasCellVAlign] != value)
+    {
+        WeViewViewInfo *viewInfo = self.viewInfo;
+        [viewInfo setHasCellVAlign:value];
+        InvalidateViewLayout(self, viewInfo, LAYOUT_INVALIDATION_POSITION);
+    }
     return self;
 }
 
 - (NSString *)debugName
 {
-    return [self.viewInfo debugName];
+    WeViewViewInfo *viewInfo = [self existingViewInfo];
+    return viewInfo ? [viewInfo debugName] : nil;
 }
 
 - (UIView *)setDebugName:(NSString *)value
 {
-    [self.viewInfo setDebugName:value];
-    [self.superview setNeedsLayout];
+    if (!([self debugName] == value || [[self debugName] isEqual:value]))
+    {
+        WeViewViewInfo *viewInfo = self.viewInfo;
+        [viewInfo setDebugName:value];
+    }
     return self;
 }
 
 - (CGSize)minDesiredSize
 {
-    return [self.viewInfo minDesiredSize];
+    return CGSizeMake(self.minDesiredWidth, self.minDesiredHeight);
 }
 
 - (UIView *)setMinDesiredSize:(CGSize)value
 {
+    [self beginLayoutUpdates];
     [self setMinDesiredWidth:value.width];
     [self setMinDesiredHeight:value.height];
-    [self.superview setNeedsLayout];
+    [self endLayoutUpdates];
     return self;
 }
 
 - (CGSize)maxDesiredSize
 {
-    return [self.viewInfo maxDesiredSize];
+    return CGSizeMake(self.maxDesiredWidth, self.maxDesiredHeight);
 }
 
 - (UIView *)setMaxDesiredSize:(CGSize)value
 {
+    [self beginLayoutUpdates];
     [self setMaxDesiredWidth:value.width];
     [self setMaxDesiredHeight:value.height];
-    [self.superview setNeedsLayout];
+    [self endLayoutUpdates];
     return self;
 }
 
 - (CGSize)desiredSizeAdjustment
 {
-    return [self.viewInfo desiredSizeAdjustment];
+    return CGSizeMake(self.desiredWidthAdjustment, self.desiredHeightAdjustment);
 }
 
 - (UIView *)setDesiredSizeAdjustment:(CGSize)value
 {
+    [self beginLayoutUpdates];
     [self setDesiredWidthAdjustment:value.width];
     [self setDesiredHeightAdjustment:value.height];
-    [self.superview setNeedsLayout];
+    [self endLayoutUpdates];
     return self;
 }
 
 - (UIView *)setFixedDesiredWidth:(CGFloat)value
 {
+    [self beginLayoutUpdates];
     [self setMinDesiredWidth:value];
     [self setMaxDesiredWidth:value];
-    [self.superview setNeedsLayout];
+    [self endLayoutUpdates];
     return self;
 }
 
 - (UIView *)setFixedDesiredHeight:(CGFloat)value
 {
+    [self beginLayoutUpdates];
     [self setMinDesiredHeight:value];
     [self setMaxDesiredHeight:value];
-    [self.superview setNeedsLayout];
+    [self endLayoutUpdates];
     return self;
 }
 
 - (UIView *)setFixedDesiredSize:(CGSize)value
 {
+    [self beginLayoutUpdates];
     [self setMinDesiredWidth:value.width];
     [self setMinDesiredHeight:value.height];
     [self setMaxDesiredWidth:value.width];
     [self setMaxDesiredHeight:value.height];
-    [self.superview setNeedsLayout];
+    [self endLayoutUpdates];
     return self;
 }
 
 - (UIView *)setStretchWeight:(CGFloat)value
 {
+    [self beginLayoutUpdates];
     [self setVStretchWeight:value];
     [self setHStretchWeight:value];
-    [self.superview setNeedsLayout];
+    [self endLayoutUpdates];
     return self;
 }
 
+- (WeViewLayoutSnapshot)layoutSnapshot
+{
+    WeViewViewInfo *viewInfo = [self existingViewInfo];
+    if (!viewInfo)
+    {
+        static const WeViewLayoutSnapshot defaultSnapshot = {
+        .minDesiredWidth = 0.f,
+        .maxDesiredWidth = CGFLOAT_MAX,
+        .minDesiredHeight = 0.f,
+        .maxDesiredHeight = CGFLOAT_MAX,
+        .hStretchWeight = 0.f,
+        .vStretchWeight = 0.f,
+        .leftSpacingAdjustment = 0,
+        .topSpacingAdjustment = 0,
+        .rightSpacingAdjustment = 0,
+        .bottomSpacingAdjustment = 0,
+        .desiredWidthAdjustment = 0.f,
+        .desiredHeightAdjustment = 0.f,
+        .ignoreDesiredSize = NO,
+        .cellHAlign = H_ALIGN_LEFT,
+        .cellVAlign = V_ALIGN_TOP,
+        .hasCellHAlign = NO,
+        .hasCellVAlign = NO,
+        };
+        return defaultSnapshot;
+    }
+    return [viewInfo layoutSnapshot];
+}
+
 /* CODEGEN MARKER: Accessors End */
 
 - (UIView *)setHStretches
@@ -761,7 +1002,7 @@ static const void *kWeViewKey_ViewInfo = &kWeViewKey_ViewInfo;
 
 - (NSString *)layoutDescription
 {
-    return [self.viewInfo layoutDescription];
+    return [([self existingViewInfo] ?: [[WeViewViewInfo alloc] init]) layoutDescription];
 }
 
 #pragma mark - NSCopying
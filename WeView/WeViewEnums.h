@@ -86,6 +86,24 @@ typedef enum
     CELL_POSITIONING_FIT_W_ASPECT_RATIO,
 } CellPositioningMode;
 
+/**
+ * What a change to a layout property invalidates, from least to most.
+ */
+typedef enum
+{
+    // Nothing, ie. debug properties.
+    LAYOUT_INVALIDATION_NONE = 0,
+
+    // Only the positions of the subviews of the view's (or layout's) container.
+    LAYOUT_INVALIDATION_POSITION = 1,
+
+    // The desired size of the container too.  Only the container is laid out again.
+    LAYOUT_INVALIDATION_SIZE = 2,
+
+    // Anything else.  The container and every WeView that contains it are laid out again.
+    LAYOUT_INVALIDATION_FULL = 3,
+} LayoutInvalidation;
+
 CG_INLINE
 NSString* FormatCellPositioningMode(CellPositioningMode value)
 {
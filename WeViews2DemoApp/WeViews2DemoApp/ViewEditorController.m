@@ -102,6 +102,31 @@ typedef void (^SetterBlock)(id item);
 
 #pragma mark -
 
+typedef enum
+{
+    PARAMETER_TYPE_FLOAT,
+    PARAMETER_TYPE_INT,
+    PARAMETER_TYPE_BOOLEAN,
+    PARAMETER_TYPE_ENUM,
+} ParameterType;
+
+typedef NSString *(*ParameterValueFormatter)(int value);
+
+// A static description of a property parameter.  The descriptor tables are
+// generated by CodeGen.py.
+typedef struct
+{
+    const char *name;
+    ParameterType type;
+    BOOL doubleHeight;
+    // Only used by enum parameters.
+    const int *enumValues;
+    int enumValueCount;
+    ParameterValueFormatter formatter;
+} ParameterDescriptor;
+
+#pragma mark -
+
 @interface ViewParameterSimple : ViewParameter
 
 @property (nonatomic) NSString *name;
@@ -350,14 +375,147 @@ typedef void (^SetterBlock)(id item);
                           doubleHeight:doubleHeight];
 }
 
++ (ViewParameterSimple *)enumProperty:(NSString *)name
+                               values:(const int *)values
+                           valueCount:(int)valueCount
+                            formatter:(ParameterValueFormatter)formatter
+                         doubleHeight:(BOOL)doubleHeight
+{
+    NSMutableArray *setters = [NSMutableArray array];
+    for (int i=0; i < valueCount; i++)
+    {
+        int value = values[i];
+        [setters addObject:[ViewParameterSetter create:formatter(value)
+                                           setterBlock:^(UIView *view) {
+                                               [view setValue:@(value) forKey:name];
+                                           }]];
+    }
+    return [ViewParameterSimple create:name
+                           getterBlock:^NSString *(UIView *view) {
+                               int value = [[view valueForKey:name] intValue];
+                               return formatter(value);
+                           }
+                               setters:setters
+                          doubleHeight:doubleHeight];
+}
+
++ (ViewParameterSimple *)parameterWithDescriptor:(const ParameterDescriptor *)descriptor
+{
+    NSString *name = @(descriptor->name);
+    switch (descriptor->type)
+    {
+        case PARAMETER_TYPE_FLOAT:
+            return [self floatProperty:name
+                          doubleHeight:descriptor->doubleHeight];
+        case PARAMETER_TYPE_INT:
+            return [self intProperty:name
+                        doubleHeight:descriptor->doubleHeight];
+        case PARAMETER_TYPE_BOOLEAN:
+            return [self booleanProperty:name];
+        case PARAMETER_TYPE_ENUM:
+            return [self enumProperty:name
+                               values:descriptor->enumValues
+                           valueCount:descriptor->enumValueCount
+                            formatter:descriptor->formatter
+                         doubleHeight:descriptor->doubleHeight];
+        default:
+            WeViewAssert(0);
+            return nil;
+    }
+}
+
 @end
 
 #pragma mark -
 
+/* CODEGEN MARKER: Parameter Descriptors Start */
+
+static NSString *FormatHAlignParameter(int value)
+{
+    return FormatHAlign((HAlign) value);
+}
+
+static const int kHAlignParameterValues[] = {
+    H_ALIGN_LEFT,
+    H_ALIGN_CENTER,
+    H_ALIGN_RIGHT,
+};
+
+static NSString *FormatVAlignParameter(int value)
+{
+    return FormatVAlign((VAlign) value);
+}
+
+static const int kVAlignParameterValues[] = {
+    V_ALIGN_TOP,
+    V_ALIGN_CENTER,
+    V_ALIGN_BOTTOM,
+};
+
+static NSString *FormatCellPositioningModeParameter(int value)
+{
+    return FormatCellPositioningMode((CellPositioningMode) value);
+}
+
+static const int kCellPositioningModeParameterValues[] = {
+    CELL_POSITIONING_NORMAL,
+    CELL_POSITIONING_FILL,
+    CELL_POSITIONING_FILL_W_ASPECT_RATIO,
+    CELL_POSITIONING_FIT_W_ASPECT_RATIO,
+};
+
+static const ParameterDescriptor kViewParameterDescriptors[] = {
+    { "minDesiredWidth", PARAMETER_TYPE_FLOAT, NO, NULL, 0, NULL, },
+    { "maxDesiredWidth", PARAMETER_TYPE_FLOAT, NO, NULL, 0, NULL, },
+    { "minDesiredHeight", PARAMETER_TYPE_FLOAT, NO, NULL, 0, NULL, },
+    { "maxDesiredHeight", PARAMETER_TYPE_FLOAT, NO, NULL, 0, NULL, },
+    { "hStretchWeight", PARAMETER_TYPE_FLOAT, NO, NULL, 0, NULL, },
+    { "vStretchWeight", PARAMETER_TYPE_FLOAT, NO, NULL, 0, NULL, },
+    { "leftSpacingAdjustment", PARAMETER_TYPE_INT, YES, NULL, 0, NULL, },
+    { "topSpacingAdjustment", PARAMETER_TYPE_INT, YES, NULL, 0, NULL, },
+    { "rightSpacingAdjustment", PARAMETER_TYPE_INT, YES, NULL, 0, NULL, },
+    { "bottomSpacingAdjustment", PARAMETER_TYPE_INT, YES, NULL, 0, NULL, },
+    { "desiredWidthAdjustment", PARAMETER_TYPE_FLOAT, YES, NULL, 0, NULL, },
+    { "desiredHeightAdjustment", PARAMETER_TYPE_FLOAT, YES, NULL, 0, NULL, },
+    { "ignoreDesiredSize", PARAMETER_TYPE_BOOLEAN, NO, NULL, 0, NULL, },
+    { "cellHAlign", PARAMETER_TYPE_ENUM, YES, kHAlignParameterValues, 3, FormatHAlignParameter, },
+    { "cellVAlign", PARAMETER_TYPE_ENUM, YES, kVAlignParameterValues, 3, FormatVAlignParameter, },
+    { "hasCellHAlign", PARAMETER_TYPE_BOOLEAN, NO, NULL, 0, NULL, },
+    { "hasCellVAlign", PARAMETER_TYPE_BOOLEAN, NO, NULL, 0, NULL, },
+};
+static const int kViewParameterDescriptorCount = sizeof(kViewParameterDescriptors) / sizeof(kViewParameterDescriptors[0]);
+
+static const ParameterDescriptor kLayoutParameterDescriptors[] = {
+    { "leftMargin", PARAMETER_TYPE_FLOAT, NO, NULL, 0, NULL, },
+    { "rightMargin", PARAMETER_TYPE_FLOAT, NO, NULL, 0, NULL, },
+    { "topMargin", PARAMETER_TYPE_FLOAT, NO, NULL, 0, NULL, },
+    { "bottomMargin", PARAMETER_TYPE_FLOAT, NO, NULL, 0, NULL, },
+    { "vSpacing", PARAMETER_TYPE_INT, NO, NULL, 0, NULL, },
+    { "hSpacing", PARAMETER_TYPE_INT, NO, NULL, 0, NULL, },
+    { "hAlign", PARAMETER_TYPE_ENUM, YES, kHAlignParameterValues, 3, FormatHAlignParameter, },
+    { "vAlign", PARAMETER_TYPE_ENUM, YES, kVAlignParameterValues, 3, FormatVAlignParameter, },
+    { "spacingStretches", PARAMETER_TYPE_BOOLEAN, NO, NULL, 0, NULL, },
+    { "cropSubviewOverflow", PARAMETER_TYPE_BOOLEAN, NO, NULL, 0, NULL, },
+    { "cellPositioning", PARAMETER_TYPE_ENUM, YES, kCellPositioningModeParameterValues, 4, FormatCellPositioningModeParameter, },
+    { "debugLayout", PARAMETER_TYPE_BOOLEAN, NO, NULL, 0, NULL, },
+    { "debugMinSize", PARAMETER_TYPE_BOOLEAN, NO, NULL, 0, NULL, },
+};
+static const int kLayoutParameterDescriptorCount = sizeof(kLayoutParameterDescriptors) / sizeof(kLayoutParameterDescriptors[0]);
+
+/* CODEGEN MARKER: Parameter Descriptors End */
+
+#pragma mark -
+
 @interface ViewEditorController () <ViewParameterDelegate>
 
 @property (nonatomic) NSArray *viewParams;
 
+// The property parameters follow viewParams.  They are described by a static
+// table and only created once their row is displayed.
+@property (nonatomic) const ParameterDescriptor *parameterDescriptors;
+@property (nonatomic) int parameterDescriptorCount;
+@property (nonatomic) NSMutableDictionary *describedParams;
+
 @property (nonatomic) id currentItem;
 
 @end
@@ -525,81 +683,9 @@ typedef void (^SetterBlock)(id item);
                             [ViewParameterSimple booleanProperty:@"hidden"],
                             [ViewParameterSimple booleanProperty:@"opaque"],
                             [ViewParameterSimple booleanProperty:@"clipsToBounds"],
-
-                            /* CODEGEN MARKER: View Parameters Start */
-
-                                [ViewParameterSimple floatProperty:@"minDesiredWidth"],
-
-                                [ViewParameterSimple floatProperty:@"maxDesiredWidth"],
-
-                                [ViewParameterSimple floatProperty:@"minDesiredHeight"],
-
-                                [ViewParameterSimple floatProperty:@"maxDesiredHeight"],
-
-                                [ViewParameterSimple floatProperty:@"hStretchWeight"],
-
-                                [ViewParameterSimple floatProperty:@"vStretchWeight"],
-
-                                [ViewParameterSimple intProperty:@"leftSpacingAdjustment" doubleHeight:YES],
-
-                                [ViewParameterSimple intProperty:@"topSpacingAdjustment" doubleHeight:YES],
-
-                                [ViewParameterSimple intProperty:@"rightSpacingAdjustment" doubleHeight:YES],
-
-                                [ViewParameterSimple intProperty:@"bottomSpacingAdjustment" doubleHeight:YES],
-
-                                [ViewParameterSimple floatProperty:@"desiredWidthAdjustment" doubleHeight:YES],
-
-                                [ViewParameterSimple floatProperty:@"desiredHeightAdjustment" doubleHeight:YES],
-
-                                [ViewParameterSimple booleanProperty:@"ignoreDesiredSize"],
-
-                                [ViewParameterSimple create:@"cellHAlign"
-                                                getterBlock:^NSString *(id item) {
-                                                    return FormatHAlign(((UIView *) item).cellHAlign);
-                                                }
-                                                    setters:@[
-                                 [ViewParameterSetter create:@"Left"
-                                                 setterBlock:^(id item) {
-                                                     ((UIView *) item).cellHAlign = H_ALIGN_LEFT;
-                                                 }],
-                                 [ViewParameterSetter create:@"Center"
-                                                 setterBlock:^(id item) {
-                                                     ((UIView *) item).cellHAlign = H_ALIGN_CENTER;
-                                                 }],
-                                 [ViewParameterSetter create:@"Right"
-                                                 setterBlock:^(id item) {
-                                                     ((UIView *) item).cellHAlign = H_ALIGN_RIGHT;
-                                                 }],
-                                 ]
-                                 doubleHeight:YES],
-
-                                [ViewParameterSimple create:@"cellVAlign"
-                                                getterBlock:^NSString *(id item) {
-                                                    return FormatVAlign(((UIView *) item).cellVAlign);
-                                                }
-                                                    setters:@[
-                                 [ViewParameterSetter create:@"Top"
-                                                 setterBlock:^(id item) {
-                                                     ((UIView *) item).cellVAlign = V_ALIGN_TOP;
-                                                 }],
-                                 [ViewParameterSetter create:@"Center"
-                                                 setterBlock:^(id item) {
-                                                     ((UIView *) item).cellVAlign = V_ALIGN_CENTER;
-                                                 }],
-                                 [ViewParameterSetter create:@"Bottom"
-                                                 setterBlock:^(id item) {
-                                                     ((UIView *) item).cellVAlign = V_ALIGN_BOTTOM;
-                                                 }],
-                                 ]
-                                 doubleHeight:YES],
-
-                                [ViewParameterSimple booleanProperty:@"hasCellHAlign"],
-
-                                [ViewParameterSimple booleanProperty:@"hasCellVAlign"],
-
-/* CODEGEN MARKER: View Parameters End */
                             ];
+        self.parameterDescriptors = kViewParameterDescriptors;
+        self.parameterDescriptorCount = kViewParameterDescriptorCount;
     }
     else if ([self.currentItem isKindOfClass:[WeViewLayout class]])
     {
@@ -706,100 +792,34 @@ typedef void (^SetterBlock)(id item);
                                                  [layout setSpacing:+20];
                                              }],
                              ]],
-
-                            /* CODEGEN MARKER: Layout Parameters Start */
-
-                                [ViewParameterSimple floatProperty:@"leftMargin"],
-
-                                [ViewParameterSimple floatProperty:@"rightMargin"],
-
-                                [ViewParameterSimple floatProperty:@"topMargin"],
-
-                                [ViewParameterSimple floatProperty:@"bottomMargin"],
-
-                                [ViewParameterSimple intProperty:@"vSpacing"],
-
-                                [ViewParameterSimple intProperty:@"hSpacing"],
-
-                                [ViewParameterSimple create:@"hAlign"
-                                                getterBlock:^NSString *(id item) {
-                                                    return FormatHAlign(((WeViewLayout *) item).hAlign);
-                                                }
-                                                    setters:@[
-                                 [ViewParameterSetter create:@"Left"
-                                                 setterBlock:^(id item) {
-                                                     ((WeViewLayout *) item).hAlign = H_ALIGN_LEFT;
-                                                 }],
-                                 [ViewParameterSetter create:@"Center"
-                                                 setterBlock:^(id item) {
-                                                     ((WeViewLayout *) item).hAlign = H_ALIGN_CENTER;
-                                                 }],
-                                 [ViewParameterSetter create:@"Right"
-                                                 setterBlock:^(id item) {
-                                                     ((WeViewLayout *) item).hAlign = H_ALIGN_RIGHT;
-                                                 }],
-                                 ]
-                                 doubleHeight:YES],
-
-                                [ViewParameterSimple create:@"vAlign"
-                                                getterBlock:^NSString *(id item) {
-                                                    return FormatVAlign(((WeViewLayout *) item).vAlign);
-                                                }
-                                                    setters:@[
-                                 [ViewParameterSetter create:@"Top"
-                                                 setterBlock:^(id item) {
-                                                     ((WeViewLayout *) item).vAlign = V_ALIGN_TOP;
-                                                 }],
-                                 [ViewParameterSetter create:@"Center"
-                                                 setterBlock:^(id item) {
-                                                     ((WeViewLayout *) item).vAlign = V_ALIGN_CENTER;
-                                                 }],
-                                 [ViewParameterSetter create:@"Bottom"
-                                                 setterBlock:^(id item) {
-                                                     ((WeViewLayout *) item).vAlign = V_ALIGN_BOTTOM;
-                                                 }],
-                                 ]
-                                 doubleHeight:YES],
-
-                                [ViewParameterSimple booleanProperty:@"spacingStretches"],
-
-                                [ViewParameterSimple booleanProperty:@"cropSubviewOverflow"],
-
-                                [ViewParameterSimple create:@"cellPositioning"
-                                                getterBlock:^NSString *(id item) {
-                                                    return FormatCellPositioningMode(((WeViewLayout *) item).cellPositioning);
-                                                }
-                                                    setters:@[
-                                 [ViewParameterSetter create:FormatCellPositioningMode(CELL_POSITIONING_NORMAL)
-                                                 setterBlock:^(id item) {
-                                                     ((WeViewLayout *) item).cellPositioning = CELL_POSITIONING_NORMAL;
-                                                 }],
-                                 [ViewParameterSetter create:FormatCellPositioningMode(CELL_POSITIONING_FILL)
-                                                 setterBlock:^(id item) {
-                                                     ((WeViewLayout *) item).cellPositioning = CELL_POSITIONING_FILL;
-                                                 }],
-                                 [ViewParameterSetter create:FormatCellPositioningMode(CELL_POSITIONING_FILL_W_ASPECT_RATIO)
-                                                 setterBlock:^(id item) {
-                                                     ((WeViewLayout *) item).cellPositioning = CELL_POSITIONING_FILL_W_ASPECT_RATIO;
-                                                 }],
-                                 [ViewParameterSetter create:FormatCellPositioningMode(CELL_POSITIONING_FIT_W_ASPECT_RATIO)
-                                                 setterBlock:^(id item) {
-                                                     ((WeViewLayout *) item).cellPositioning = CELL_POSITIONING_FIT_W_ASPECT_RATIO;
-                                                 }],
-                                 ]
-                                 doubleHeight:YES],
-
-                                [ViewParameterSimple booleanProperty:@"debugLayout"],
-
-                                [ViewParameterSimple booleanProperty:@"debugMinSize"],
-
-/* CODEGEN MARKER: Layout Parameters End */
                             ];
+        self.parameterDescriptors = kLayoutParameterDescriptors;
+        self.parameterDescriptorCount = kLayoutParameterDescriptorCount;
     }
     else
     {
         self.viewParams = @[];
+        self.parameterDescriptors = NULL;
+        self.parameterDescriptorCount = 0;
     }
+    self.describedParams = [NSMutableDictionary dictionary];
+}
+
+- (ViewParameter *)parameterAtIndex:(NSInteger)index
+{
+    if (index < self.viewParams.count)
+    {
+        return self.viewParams[index];
+    }
+
+    NSNumber *key = @(index);
+    ViewParameter *result = self.describedParams[key];
+    if (!result)
+    {
+        result = [ViewParameterSimple parameterWithDescriptor:self.parameterDescriptors + (index - self.viewParams.count)];
+        self.describedParams[key] = result;
+    }
+    return result;
 }
 
 - (void)handleItemAdded:(NSNotification *)notification
@@ -851,7 +871,7 @@ typedef void (^SetterBlock)(id item);
 
 - (NSInteger)tableView:(UITableView *)tableView numberOfRowsInSection:(NSInteger)section
 {
-    return self.viewParams.count;
+    return self.viewParams.count + self.parameterDescriptorCount;
 }
 
 // Customize the appearance of table view cells.
@@ -874,7 +894,7 @@ typedef void (^SetterBlock)(id item);
         [subview removeFromSuperview];
     }
 
-    ViewParameter *viewParameter = self.viewParams[indexPath.row];
+    ViewParameter *viewParameter = [self parameterAtIndex:indexPath.row];
     viewParameter.delegate = self;
     [viewParameter configureCell:cell
                         withItem:self.currentItem];
@@ -0,0 +1,28 @@
+- (WeViewLayoutSnapshot)layoutSnapshot
+{
+    WeViewViewInfo *viewInfo = [self existingViewInfo];
+    if (!viewInfo)
+    {
+        static const WeViewLayoutSnapshot defaultSnapshot = {
+        .minDesiredWidth = 0.f,
+        .maxDesiredWidth = CGFLOAT_MAX,
+        .minDesiredHeight = 0.f,
+        .maxDesiredHeight = CGFLOAT_MAX,
+        .hStretchWeight = 0.f,
+        .vStretchWeight = 0.f,
+        .leftSpacingAdjustment = 0,
+        .topSpacingAdjustment = 0,
+        .rightSpacingAdjustment = 0,
+        .bottomSpacingAdjustment = 0,
+        .desiredWidthAdjustment = 0.f,
+        .desiredHeightAdjustment = 0.f,
+        .ignoreDesiredSize = NO,
+        .cellHAlign = H_ALIGN_LEFT,
+        .cellVAlign = V_ALIGN_TOP,
+        .hasCellHAlign = NO,
+        .hasCellVAlign = NO,
+        };
+        return defaultSnapshot;
+    }
+    return [viewInfo layoutSnapshot];
+}
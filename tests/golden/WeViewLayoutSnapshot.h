@@ -0,0 +1,24 @@
+
+
+// The layout-relevant properties of a view.  See -[UIView layoutSnapshot].
+typedef struct
+{
+    CGFloat minDesiredWidth;
+    CGFloat maxDesiredWidth;
+    CGFloat minDesiredHeight;
+    CGFloat maxDesiredHeight;
+    CGFloat hStretchWeight;
+    CGFloat vStretchWeight;
+    int leftSpacingAdjustment;
+    int topSpacingAdjustment;
+    int rightSpacingAdjustment;
+    int bottomSpacingAdjustment;
+    CGFloat desiredWidthAdjustment;
+    CGFloat desiredHeightAdjustment;
+    BOOL ignoreDesiredSize;
+    HAlign cellHAlign;
+    VAlign cellVAlign;
+    BOOL hasCellHAlign;
+    BOOL hasCellVAlign;
+} WeViewLayoutSnapshot;
+
@@ -0,0 +1,22 @@
+- (WeViewLayoutSnapshot)layoutSnapshot
+{
+    WeViewLayoutSnapshot snapshot;
+    snapshot.minDesiredWidth = _minDesiredWidth;
+    snapshot.maxDesiredWidth = _maxDesiredWidth;
+    snapshot.minDesiredHeight = _minDesiredHeight;
+    snapshot.maxDesiredHeight = _maxDesiredHeight;
+    snapshot.hStretchWeight = _hStretchWeight;
+    snapshot.vStretchWeight = _vStretchWeight;
+    snapshot.leftSpacingAdjustment = _leftSpacingAdjustment;
+    snapshot.topSpacingAdjustment = _topSpacingAdjustment;
+    snapshot.rightSpacingAdjustment = _rightSpacingAdjustment;
+    snapshot.bottomSpacingAdjustment = _bottomSpacingAdjustment;
+    snapshot.desiredWidthAdjustment = _desiredWidthAdjustment;
+    snapshot.desiredHeightAdjustment = _desiredHeightAdjustment;
+    snapshot.ignoreDesiredSize = _ignoreDesiredSize;
+    snapshot.cellHAlign = _cellHAlign;
+    snapshot.cellVAlign = _cellVAlign;
+    snapshot.hasCellHAlign = _hasCellHAlign;
+    snapshot.hasCellVAlign = _hasCellVAlign;
+    return snapshot;
+}
@@ -0,0 +1,24 @@
+- (WeViewLayoutSnapshot)layoutSnapshot
+{
+    // The values are stored in bit order, so they can be read in a single pass.
+    const WeViewViewInfoValue *value = _values;
+    WeViewLayoutSnapshot snapshot;
+    snapshot.minDesiredWidth = (_valueMask & kWeViewViewInfoValue_minDesiredWidth) ? (value++)->floatValue : 0.f;
+    snapshot.maxDesiredWidth = (_valueMask & kWeViewViewInfoValue_maxDesiredWidth) ? (value++)->floatValue : CGFLOAT_MAX;
+    snapshot.minDesiredHeight = (_valueMask & kWeViewViewInfoValue_minDesiredHeight) ? (value++)->floatValue : 0.f;
+    snapshot.maxDesiredHeight = (_valueMask & kWeViewViewInfoValue_maxDesiredHeight) ? (value++)->floatValue : CGFLOAT_MAX;
+    snapshot.hStretchWeight = (_valueMask & kWeViewViewInfoValue_hStretchWeight) ? (value++)->floatValue : 0.f;
+    snapshot.vStretchWeight = (_valueMask & kWeViewViewInfoValue_vStretchWeight) ? (value++)->floatValue : 0.f;
+    snapshot.leftSpacingAdjustment = (_valueMask & kWeViewViewInfoValue_leftSpacingAdjustment) ? (value++)->intValue : 0;
+    snapshot.topSpacingAdjustment = (_valueMask & kWeViewViewInfoValue_topSpacingAdjustment) ? (value++)->intValue : 0;
+    snapshot.rightSpacingAdjustment = (_valueMask & kWeViewViewInfoValue_rightSpacingAdjustment) ? (value++)->intValue : 0;
+    snapshot.bottomSpacingAdjustment = (_valueMask & kWeViewViewInfoValue_bottomSpacingAdjustment) ? (value++)->intValue : 0;
+    snapshot.desiredWidthAdjustment = (_valueMask & kWeViewViewInfoValue_desiredWidthAdjustment) ? (value++)->floatValue : 0.f;
+    snapshot.desiredHeightAdjustment = (_valueMask & kWeViewViewInfoValue_desiredHeightAdjustment) ? (value++)->floatValue : 0.f;
+    snapshot.ignoreDesiredSize = (BOOL) _ignoreDesiredSize;
+    snapshot.cellHAlign = (HAlign) _cellHAlign;
+    snapshot.cellVAlign = (VAlign) _cellVAlign;
+    snapshot.hasCellHAlign = (BOOL) _hasCellHAlign;
+    snapshot.hasCellVAlign = (BOOL) _hasCellVAlign;
+    return snapshot;
+}
@@ -0,0 +1,937 @@
+# Tests of CodeGen.py.  Run with: python -m unittest discover tests
+
+import json, os, pickle, shutil, subprocess, sys, tempfile, unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import CodeGen
+import CodeGenBenchmark
+
+rootPath = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Golden output of generated code that layouts depend on.  Set
+# CODEGEN_UPDATE_GOLDEN=1 to rewrite the files from the current generator.
+goldenFolderPath = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden')
+
+
+def loadTables(viewInfoStorage):
+    tables = CodeGen.loadPropertyTables()
+    tables.viewInfoStorage = viewInfoStorage
+    return tables
+
+
+class RecordedRenderTest(unittest.TestCase):
+    # --incremental and --watch render through a DependencyRecorder; their
+    # output must match that of a plain run.
+    def assertRecordedRendersMatch(self, tables):
+        for blockSpec in CodeGen.blockSpecs:
+            block, _ = CodeGen.renderBlock(blockSpec, tables)
+            self.assertEqual(block, blockSpec.render(tables), blockSpec.blockStartKey)
+
+    def testDense(self):
+        self.assertRecordedRendersMatch(loadTables('dense'))
+
+    def testSparse(self):
+        self.assertRecordedRendersMatch(loadTables('sparse'))
+
+    def testSparseDependsOnStorageMode(self):
+        tables = loadTables('sparse')
+        for blockSpec in CodeGen.blockSpecs:
+            if blockSpec.blockStartKey in ('View Info Storage Start', 'View Info M Start',):
+                _, dependencies = CodeGen.renderBlock(blockSpec, tables)
+                self.assertIn(('viewInfoStorage', None, None,), dependencies)
+
+
+def renderBlockNamed(tables, blockStartKey, fileKey):
+    for blockSpec in CodeGen.blockSpecs:
+        if blockSpec.blockStartKey == blockStartKey and blockSpec.fileKey == fileKey:
+            return CodeGen.normalizeBlock(blockSpec.render(tables))
+    raise Exception('Unknown block: %s' % blockStartKey)
+
+
+def extractMethod(block, declaration):
+    # Returns the text of an Objective-C method, from its declaration to its
+    # closing brace.
+    startIndex = block.index(declaration + '\n{\n')
+    endIndex = block.index('\n}\n', startIndex) + len('\n}\n')
+    return block[startIndex:endIndex]
+
+
+class LayoutSnapshotGoldenTest(unittest.TestCase):
+    def assertMatchesGolden(self, text, fileName):
+        goldenPath = os.path.join(goldenFolderPath, fileName)
+        if os.environ.get('CODEGEN_UPDATE_GOLDEN'):
+            with open(goldenPath, 'wt') as f:
+                f.write(text)
+        with open(goldenPath, 'rt') as f:
+            self.assertEqual(text, f.read(), fileName)
+
+    def testStruct(self):
+        block = renderBlockNamed(loadTables('dense'), 'Layout Snapshot Start', 'hFilePath')
+        self.assertMatchesGolden(block, 'WeViewLayoutSnapshot.h')
+
+    def testViewAccessor(self):
+        block = renderBlockNamed(loadTables('dense'), 'Accessors Start', 'mFilePath')
+        self.assertMatchesGolden(extractMethod(block, '- (WeViewLayoutSnapshot)layoutSnapshot'), 'UIView+WeView.layoutSnapshot.m')
+
+    def testViewInfoAccessor(self):
+        for viewInfoStorage in CodeGen.viewInfoStorageModes:
+            block = renderBlockNamed(loadTables(viewInfoStorage), 'View Info M Start', 'viewInfomFilePath')
+            self.assertMatchesGolden(extractMethod(block, '- (WeViewLayoutSnapshot)layoutSnapshot'),
+                                     'WeViewViewInfo.layoutSnapshot.%s.m' % viewInfoStorage)
+
+    def testTreeMatchesGolden(self):
+        # The checked-in files are what the goldens were rendered into.
+        with open(os.path.join(rootPath, 'WeView', 'UIView+WeView.h'), 'rt') as f:
+            self.assertIn(self.readGolden('WeViewLayoutSnapshot.h'), f.read())
+        with open(os.path.join(rootPath, 'WeView', 'UIView+WeView.m'), 'rt') as f:
+            text = f.read()
+        self.assertIn(self.readGolden('UIView+WeView.layoutSnapshot.m'), text)
+        self.assertIn(self.readGolden('WeViewViewInfo.layoutSnapshot.dense.m'), text)
+
+    def readGolden(self, fileName):
+        with open(os.path.join(goldenFolderPath, fileName), 'rt') as f:
+            return f.read()
+
+
+class LayoutUpdatesTest(unittest.TestCase):
+    # Generated setters defer their invalidation to InvalidateViewLayout() or
+    # -[WeViewLayout invalidateLayout:], which coalesce it inside a batch.
+    def setUp(self):
+        self.tables = loadTables('dense')
+
+    def testFormatInvalidation(self):
+        self.assertEqual('', CodeGen.formatInvalidation(CodeGen.viewInvalidationTemplate, 'none', '    '))
+        self.assertEqual('\n    InvalidateViewLayout(self, viewInfo, LAYOUT_INVALIDATION_SIZE);',
+                         CodeGen.formatInvalidation(CodeGen.viewInvalidationTemplate, 'size', '    '))
+        self.assertEqual('\n        [self invalidateLayout:LAYOUT_INVALIDATION_POSITION];',
+                         CodeGen.formatInvalidation(CodeGen.layoutInvalidationTemplate, 'position', '        '))
+
+    def testEnumOrder(self):
+        # Batches keep the MAX() of their invalidations, so the enum must
+        # order the classes from least to most.
+        with open(os.path.join(rootPath, 'WeView', 'WeViewEnums.h'), 'rt') as f:
+            text = f.read()
+        for value, invalidation in enumerate(CodeGen.invalidationClasses):
+            self.assertIn('LAYOUT_INVALIDATION_%s = %d,' % (invalidation.upper(), value, ), text)
+
+    def assertSetterInvalidation(self, setter, invalidationTemplate, invalidation):
+        self.assertNotIn('setNeedsLayout', setter)
+        if invalidation == 'none':
+            self.assertNotIn('LAYOUT_INVALIDATION_', setter)
+        else:
+            self.assertEqual(1, setter.count('LAYOUT_INVALIDATION_'), setter)
+            self.assertIn(invalidationTemplate % ('LAYOUT_INVALIDATION_' + invalidation.upper(), ), setter)
+
+    def testViewSetters(self):
+        block = renderBlockNamed(self.tables, 'Accessors Start', 'mFilePath')
+        for propertyGroup in self.tables.view_propertyGroups:
+            for property in propertyGroup:
+                setter = extractMethod(block, '- (UIView *)set%s:(%s)value' % (property.UpperName(), property.typeName, ))
+                self.assertSetterInvalidation(setter, CodeGen.viewInvalidationTemplate, property.invalidation)
+
+    def testLayoutSetters(self):
+        block = renderBlockNamed(self.tables, 'Accessors Start', 'WeViewLayout_mFilePath')
+        for propertyGroup in self.tables.layout_propertyGroups:
+            for property in propertyGroup:
+                setter = extractMethod(block, '- (WeViewLayout *)set%s:(%s)value' % (property.UpperName(), property.typeName, ))
+                self.assertSetterInvalidation(setter, CodeGen.layoutInvalidationTemplate, property.invalidation)
+
+    def testCustomSetters(self):
+        # Custom setters batch their subsetters, which invalidate on their own.
+        for blockKey, returnTypeName, customAccessors in ((('Accessors Start', 'mFilePath',), 'UIView *', self.tables.view_customAccessors,),
+                                                          (('Accessors Start', 'WeViewLayout_mFilePath',), 'WeViewLayout *', self.tables.layout_customAccessors,),):
+            block = renderBlockNamed(self.tables, *blockKey)
+            for customAccessor in customAccessors:
+                if not customAccessor.layoutProperty and returnTypeName == 'WeViewLayout *':
+                    continue
+                setter = extractMethod(block, '- (%s)set%s:(%s)value' % (returnTypeName, customAccessor.UpperName(), customAccessor.typeName, ))
+                lines = [line.strip() for line in setter.split('\n')]
+                self.assertEqual('[self beginLayoutUpdates];', lines[2], setter)
+                self.assertEqual(['[self endLayoutUpdates];', 'return self;', '}', ''], lines[-4:], setter)
+                self.assertNotIn('LAYOUT_INVALIDATION_', setter)
+
+    def testResetAndCopy(self):
+        for blockStartKey in ('Reset Start', 'Copy Configuration Start',):
+            block = renderBlockNamed(self.tables, blockStartKey, 'WeViewLayout_mFilePath')
+            self.assertEqual(1, block.count('[self invalidateLayout:LAYOUT_INVALIDATION_FULL];'), blockStartKey)
+            self.assertNotIn('setNeedsLayout', block)
+
+
+class PackedLayoutConfigTest(unittest.TestCase):
+    def testStructSize(self):
+        # (fields, 32-bit size, 64-bit size)
+        for fields, size32, size64 in (([], 0, 0,),
+                                       ([('uint8_t', None,), ('CGFloat', None,)], 8, 16,),
+                                       ([('CGFloat', None,), ('uint8_t', None,)], 8, 16,),
+                                       ([('int', None,), ('uint8_t', None,), ('uint8_t', None,)], 8, 8,),
+                                       ([('unsigned char', 1,)] * 8, 1, 1,),
+                                       ([('unsigned char', 1,)] * 9, 2, 2,),
+                                       ([('unsigned char', 7,), ('unsigned char', 2,)], 2, 2,),
+                                       ([('uint8_t', None,), ('uint64_t', None,)], 16, 16,),
+                                       ([('id', None,), ('int', None,)], 8, 16,),
+                                       ):
+            self.assertEqual(size32, CodeGen.structSize(fields, False), fields)
+            self.assertEqual(size64, CodeGen.structSize(fields, True), fields)
+
+    def testFieldOrder(self):
+        # Widest fields first and bitfields last, so that the struct has no
+        # padding between fields.  Fields of the same size keep their spec order.
+        tables = CodeGen.loadPropertyTables()
+        properties = CodeGen.packedLayoutProperties(tables)
+        fields = [CodeGen.typeInfoForName(property.typeName).packedStorage for property in properties]
+        sizes = [CodeGen.packedStorageSizes[storageTypeName][1][0] if bitWidth is None else 0
+                 for storageTypeName, bitWidth in fields]
+        self.assertEqual(sorted(sizes, reverse=True), sizes)
+        specNames = [property.name for propertyGroup in tables.layout_propertyGroups for property in propertyGroup]
+        for index in range(1, len(properties)):
+            if sizes[index - 1] == sizes[index]:
+                self.assertTrue(specNames.index(properties[index - 1].name) < specNames.index(properties[index].name))
+        self.assertEqual(set([property.name for property in properties]),
+                         set([property.name for propertyGroup in tables.layout_propertyGroups for property in propertyGroup
+                              if CodeGen.isPackedLayoutProperty(property)]))
+
+    def testConfigSizes(self):
+        tables = CodeGen.loadPropertyTables()
+        self.assertEqual((28, 48,), CodeGen.layoutConfigSizes(tables))
+        block = renderBlockNamed(tables, 'Config Start', 'WeViewLayout_mFilePath')
+        self.assertIn('// The packed layout properties of a layout: 48 bytes on 64-bit, 28 bytes on 32-bit.', block)
+        declarations = [line.strip() for line in block.split('typedef struct')[1].split('} WeViewLayoutConfig;')[0].split('\n')
+                        if line.strip().endswith(';')]
+        self.assertEqual([property.name for property in CodeGen.packedLayoutProperties(tables)],
+                         [declaration.split(':')[0].split()[-1].rstrip(';') for declaration in declarations])
+
+
+def floatPropertyTables(count, viewInfoStorage='sparse'):
+    # Tables of count CGFloat view properties.
+    properties = tuple([CodeGen.Property('value%d' % index, 'CGFloat') for index in range(count)])
+    return CodeGen.PropertyTables((properties,), (), (), (), viewInfoStorage=viewInfoStorage)
+
+
+class SparseStorageTest(unittest.TestCase):
+    # The values array is indexed by the popcount of the presence bits below
+    # a property's bit, so each value property needs its own bit, in order.
+    def setUp(self):
+        self.tables = loadTables('sparse')
+        self.valueProperties, self.inlineProperties, self.objectProperties = CodeGen.sparseViewInfoProperties(self.tables)
+
+    def testBits(self):
+        block = renderBlockNamed(self.tables, 'View Info Storage Start', 'viewInfohFilePath')
+        for index, property in enumerate(self.valueProperties):
+            self.assertIn('static const uint32_t %s = ((uint32_t) 1) << %d;' % (CodeGen.sparseValueBitName(property), index, ), block)
+        self.assertIn('return __builtin_popcount(valueMask & (bit - 1));', block)
+
+    def testAccessorsUseTheirOwnBit(self):
+        block = renderBlockNamed(self.tables, 'View Info M Start', 'viewInfomFilePath')
+        for property in self.valueProperties:
+            getter = extractMethod(block, '- (%s)%s' % (property.typeName, property.name, ))
+            bitName = CodeGen.sparseValueBitName(property)
+            self.assertIn('(_valueMask & %s) ? _values[WeViewViewInfoValueIndex(_valueMask, %s)]' % (bitName, bitName, ), getter)
+            setter = extractMethod(block, '- (void)set%s:(%s)value' % (property.UpperName(), property.typeName, ))
+            self.assertIn('[self removeValue:%s];' % bitName, setter)
+            self.assertIn('[self insertValue:%s]->' % bitName, setter)
+
+    def testPropertyKinds(self):
+        self.assertEqual(['debugName'], [property.name for property in self.objectProperties])
+        for property in self.inlineProperties:
+            self.assertTrue(CodeGen.inlineBitWidth(CodeGen.typeInfoForName(property.typeName)))
+        self.assertEqual(1, CodeGen.inlineBitWidth(CodeGen.typeInfoForName('BOOL')))
+        self.assertEqual(2, CodeGen.inlineBitWidth(CodeGen.typeInfoForName('HAlign')))
+
+    def testMaskType(self):
+        for count, maskType in ((1, ('uint32_t', '__builtin_popcount',),),
+                                (32, ('uint32_t', '__builtin_popcount',),),
+                                (33, ('uint64_t', '__builtin_popcountll',),),
+                                (64, ('uint64_t', '__builtin_popcountll',),),
+                                ):
+            valueProperties = CodeGen.sparseViewInfoProperties(floatPropertyTables(count))[0]
+            self.assertEqual(maskType, CodeGen.sparseValueMaskType(valueProperties))
+        self.assertRaises(Exception, CodeGen.sparseValueMaskType, CodeGen.sparseViewInfoProperties(floatPropertyTables(65))[0])
+
+    def testWideMask(self):
+        block = renderBlockNamed(floatPropertyTables(40), 'View Info Storage Start', 'viewInfohFilePath')
+        self.assertIn('static const uint64_t kWeViewViewInfoValue_value39 = ((uint64_t) 1) << 39;', block)
+        self.assertIn('return __builtin_popcountll(valueMask & (bit - 1));', block)
+
+    def testSizes(self):
+        dense64, sparse64, value64 = CodeGen.viewInfoStorageSizes(self.tables, True)
+        self.assertEqual((104, 24, 8,), (dense64, sparse64, value64,))
+        self.assertTrue(sparse64 < dense64)
+
+
+class ViewGetterTest(unittest.TestCase):
+    # Reading a property never allocates a view info.
+    def setUp(self):
+        self.tables = loadTables('dense')
+        self.block = renderBlockNamed(self.tables, 'Accessors Start', 'mFilePath')
+
+    def testGetters(self):
+        for propertyGroup in self.tables.view_propertyGroups:
+            for property in propertyGroup:
+                getter = extractMethod(self.block, '- (%s)%s' % (property.typeName, property.name, ))
+                self.assertIn('WeViewViewInfo *viewInfo = [self existingViewInfo];', getter)
+                self.assertIn('return viewInfo ? [viewInfo %s] : %s;' % (property.name, CodeGen.viewDefaultValue(property), ), getter)
+                self.assertNotIn('self.viewInfo', getter)
+
+    def testCustomGetters(self):
+        for customAccessor in self.tables.view_customAccessors:
+            if not customAccessor.getterValue:
+                continue
+            getter = extractMethod(self.block, '- (%s)%s' % (customAccessor.typeName, customAccessor.name, ))
+            self.assertNotIn('viewInfo', getter)
+
+    def testDefaultsMatchViewInfoInit(self):
+        # A view without a view info reads the same values as one with a
+        # fresh view info.
+        block = renderBlockNamed(self.tables, 'View Info M Start', 'viewInfomFilePath')
+        for propertyGroup in self.tables.view_propertyGroups:
+            for property in propertyGroup:
+                defaultValue = CodeGen.viewDefaultValue(property)
+                assignment = 'self.%s = %s;' % (property.name, defaultValue, )
+                if defaultValue == CodeGen.typeInfoForName(property.typeName).zeroValue:
+                    self.assertNotIn('self.%s = ' % property.name, block.split('- (id)init')[-1].split('return self;')[0])
+                else:
+                    self.assertIn(assignment, block)
+
+    def testObjectDefaultsAreNil(self):
+        property = CodeGen.Property('debugName', 'NSString *', defaultValue='@"view"')
+        self.assertEqual('nil', CodeGen.viewDefaultValue(property))
+
+
+class ViewSetterTest(unittest.TestCase):
+    def viewSetters(self):
+        tables = loadTables('dense')
+        block = renderBlockNamed(tables, 'Accessors Start', 'mFilePath')
+        for propertyGroup in tables.view_propertyGroups:
+            for property in propertyGroup:
+                yield property, extractMethod(block, '- (UIView *)set%s:(%s)value' % (property.UpperName(), property.typeName, ))
+
+    def testCompareBeforeAllocating(self):
+        # self.viewInfo allocates a view info, so it must not be read before
+        # the setter knows the value changes.
+        for property, setter in self.viewSetters():
+            lines = setter.split('\n')
+            self.assertTrue(lines[2].strip().startswith('if ('), setter)
+            self.assertNotIn('viewInfo', lines[2], setter)
+            self.assertEqual(1, setter.count('self.viewInfo'), setter)
+            self.assertTrue(setter.index('self.viewInfo') > setter.index('if ('), setter)
+
+    def testExtraSetterDiffers(self):
+        setters = dict([(property.name, setter) for property, setter in self.viewSetters()])
+        self.assertIn('if ([self cellHAlign] != value || !self.hasCellHAlign)', setters['cellHAlign'])
+
+
+class ResolvePropertyTablesTest(unittest.TestCase):
+    def setUp(self):
+        self.folderPath = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folderPath)
+
+    def testExplicitTablesKeepTheSpecStorageMode(self):
+        specPath = os.path.join(self.folderPath, 'spec.json')
+        with open(specPath, 'wt') as f:
+            json.dump({'viewInfoStorage': 'sparse'}, f)
+        specTables = CodeGen.loadPropertyTables()
+        tables = CodeGen.resolvePropertyTables(specPath, *[getattr(specTables, tableName) for tableName in CodeGen.tableNames])
+        self.assertEqual(tables.viewInfoStorage, 'sparse')
+
+    def testExplicitStorageMode(self):
+        specTables = CodeGen.loadPropertyTables()
+        tables = CodeGen.resolvePropertyTables(None, *[getattr(specTables, tableName) for tableName in CodeGen.tableNames],
+                                               viewInfoStorage='sparse')
+        self.assertEqual(tables.viewInfoStorage, 'sparse')
+        tables = CodeGen.resolvePropertyTables(viewInfoStorage='sparse')
+        self.assertEqual(tables.viewInfoStorage, 'sparse')
+
+
+def makeStale(filePath):
+    # Edits a generated block of a file.
+    with open(filePath, 'rt') as f:
+        text = f.read()
+    with open(filePath, 'wt') as f:
+        f.write(text.replace('} WeViewLayoutSnapshot;', '} WeViewLayoutSnapshot_;').replace('- (UIView *)set', '- (UIView *) set', 1))
+
+
+def writeFile(filePath, text):
+    with open(filePath, 'wt') as f:
+        f.write(text)
+
+
+def readFile(filePath):
+    with open(filePath, 'rt') as f:
+        return f.read()
+
+
+# A target file with two blocks.
+twoBlockText = '''header
+/* CODEGEN MARKER: A Start */
+old a
+/* CODEGEN MARKER: A End */
+middle
+/* CODEGEN MARKER: B Start */
+old b
+/* CODEGEN MARKER: B End */
+footer
+'''
+
+
+class WrapCommentLineTest(unittest.TestCase):
+    def testGreedyWrap(self):
+        self.assertEqual(('One.  Two', 'three four',), CodeGen.WrapCommentLine('One.  Two three four', 10))
+        self.assertEqual(('exactly ten',), CodeGen.WrapCommentLine('exactly ten', 11))
+
+    def testLongWord(self):
+        # Words longer than the width get a line of their own and aren't broken.
+        longWord = 'x' * 30
+        self.assertEqual(('a', longWord, 'b c',), CodeGen.WrapCommentLine('a %s b c' % longWord, 10))
+        self.assertEqual((longWord,), CodeGen.WrapCommentLine(longWord, 10))
+
+    def testWhitespace(self):
+        self.assertEqual((), CodeGen.WrapCommentLine('', 10))
+        self.assertEqual(('lead',), CodeGen.WrapCommentLine('  lead  ', 10))
+
+    def testSpecComments(self):
+        # Wrapping only moves line breaks, and lines fit unless they are a
+        # single long word.
+        tables = CodeGen.loadPropertyTables()
+        for propertyGroup in tables.view_propertyGroups + tables.layout_propertyGroups:
+            for property in propertyGroup:
+                comments = property.comments or []
+                if not isinstance(comments, list):
+                    comments = [comments]
+                for comment in comments:
+                    lines = CodeGen.WrapCommentLine(comment)
+                    self.assertEqual(comment.split(), ' '.join(lines).split())
+                    for line in lines:
+                        self.assertTrue(len(line) <= CodeGen.commentWidth or ' ' not in line, line)
+
+    def testMemoized(self):
+        comment = 'A comment that is only wrapped once per width.'
+        lines = CodeGen.WrapCommentLine(comment, 12)
+        self.assertTrue(CodeGen.wrappedCommentCache[(comment, 12,)] is lines)
+        self.assertTrue(CodeGen.WrapCommentLine(comment, 12) is lines)
+        self.assertFalse(CodeGen.WrapCommentLine(comment, 20) is lines)
+
+    def testFormatComments(self):
+        self.assertEqual(['', '// a', '// ', '// b'], CodeGen.FormatComments(['a', 'b']))
+        self.assertEqual([], CodeGen.FormatComments([]))
+
+
+class TempFolderTestCase(unittest.TestCase):
+    def setUp(self):
+        self.folderPath = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folderPath)
+
+
+class EditPlanTest(TempFolderTestCase):
+    def setUp(self):
+        TempFolderTestCase.setUp(self)
+        self.filePath = os.path.join(self.folderPath, 'File.m')
+        writeFile(self.filePath, twoBlockText)
+
+    def testSplicesEveryBlockInOnePass(self):
+        stats = CodeGen.RunStats()
+        editPlan = CodeGen.EditPlan(stats=stats)
+        # Blocks may be queued in any order.
+        editPlan.replaceBlock(self.filePath, 'B Start', 'B End', '\nnew b\n')
+        editPlan.replaceBlock(self.filePath, 'A Start', 'A End', '\nnew a\n')
+        self.assertEqual([os.path.realpath(self.filePath)], editPlan.apply())
+        self.assertEqual(twoBlockText.replace('old', 'new'), readFile(self.filePath))
+        fileStat = stats.fileStat(self.filePath)
+        self.assertEqual((1, 1), (fileStat['reads'], fileStat['writes']))
+
+    def testAliasedPaths(self):
+        # Edits through different paths to the same file are applied together.
+        aliasPath = os.path.join(self.folderPath, '.', 'File.m')
+        editPlan = CodeGen.EditPlan()
+        editPlan.replaceBlock(self.filePath, 'A Start', 'A End', '\nnew a\n')
+        editPlan.replaceBlock(aliasPath, 'B Start', 'B End', '\nnew b\n')
+        self.assertEqual(1, len(editPlan.fileEdits))
+        editPlan.apply()
+        self.assertEqual(twoBlockText.replace('old', 'new'), readFile(self.filePath))
+
+    def testOverlappingBlocks(self):
+        editPlan = CodeGen.EditPlan()
+        editPlan.replaceBlock(self.filePath, 'A Start', 'A End', '\nnew a\n')
+        editPlan.replaceBlock(self.filePath, 'A Start', 'B End', '\nnew\n')
+        self.assertRaises(Exception, editPlan.apply)
+        self.assertEqual(twoBlockText, readFile(self.filePath))
+
+    def testGenerateReadsEachFileOnce(self):
+        tempRootPath = os.path.join(self.folderPath, 'root')
+        CodeGenBenchmark.copyTargetFiles(rootPath, tempRootPath)
+        makeStale(os.path.join(tempRootPath, 'WeView', 'UIView+WeView.h'))
+        stats = CodeGen.RunStats()
+        CodeGen.generate(tempRootPath, stats=stats, renderJobs=1)
+        for fileStat in stats.fileStats.values():
+            self.assertEqual(1, fileStat['reads'])
+            self.assertTrue(fileStat['writes'] <= 1)
+
+
+class WriteIfChangedTest(TempFolderTestCase):
+    def setUp(self):
+        TempFolderTestCase.setUp(self)
+        self.filePath = os.path.join(self.folderPath, 'File.m')
+        writeFile(self.filePath, twoBlockText)
+        # Far enough in the past that a rewrite would change it.
+        os.utime(self.filePath, (1000000000, 1000000000,))
+
+    def testIdenticalFile(self):
+        chunks = iter([twoBlockText[:10], twoBlockText[10:]])
+        self.assertFalse(CodeGen.writeChunksIfChanged(self.filePath, chunks))
+        self.assertEqual(1000000000, int(os.stat(self.filePath).st_mtime))
+
+    def testChangedFile(self):
+        self.assertTrue(CodeGen.writeChunksIfChanged(self.filePath, iter([twoBlockText, 'more\n'])))
+        self.assertEqual(twoBlockText + 'more\n', readFile(self.filePath))
+        self.assertNotEqual(1000000000, int(os.stat(self.filePath).st_mtime))
+
+    def testTruncatedFile(self):
+        # The new text is a prefix of the old text.
+        self.assertTrue(CodeGen.writeChunksIfChanged(self.filePath, iter([twoBlockText[:10]])))
+        self.assertEqual(twoBlockText[:10], readFile(self.filePath))
+
+    def testNewFile(self):
+        filePath = os.path.join(self.folderPath, 'New.m')
+        self.assertTrue(CodeGen.writeChunksIfChanged(filePath, iter(['new\n'])))
+        self.assertEqual('new\n', readFile(filePath))
+
+    def testGenerateReportsChangedFiles(self):
+        tempRootPath = os.path.join(self.folderPath, 'root')
+        CodeGenBenchmark.copyTargetFiles(rootPath, tempRootPath)
+        self.assertEqual([], CodeGen.generate(tempRootPath, renderJobs=1))
+        filePath = os.path.join(tempRootPath, 'WeView', 'UIView+WeView.h')
+        makeStale(filePath)
+        self.assertEqual([os.path.realpath(filePath)], CodeGen.generate(tempRootPath, renderJobs=1))
+
+
+class MarkerIndexTest(unittest.TestCase):
+    def assertRejects(self, text, message):
+        try:
+            CodeGen.MarkerIndex('File.m', text)
+        except Exception as e:
+            self.assertIn(message, str(e))
+        else:
+            self.fail('Accepted: %r' % text)
+
+    def testIndex(self):
+        markerIndex = CodeGen.MarkerIndex('File.m', twoBlockText)
+        self.assertEqual(['A Start', 'A End', 'B Start', 'B End'], list(markerIndex.markers))
+        self.assertEqual(6, markerIndex.marker('B Start').lineNumber)
+        startIndex, endIndex = markerIndex.blockRange('A Start', 'A End')
+        self.assertEqual('\nold a\n', twoBlockText[startIndex:endIndex])
+
+    def testDuplicate(self):
+        self.assertRejects(twoBlockText + twoBlockText, 'Duplicate block marker: A Start in file: File.m (lines 2 and 11)')
+
+    def testNested(self):
+        text = twoBlockText.replace('/* CODEGEN MARKER: A End */', '/* CODEGEN MARKER: C Start */')
+        self.assertRejects(text, 'Block marker: C Start in file: File.m (line 4) is nested inside: A Start (line 2)')
+
+    def testUnterminated(self):
+        text = twoBlockText.replace('/* CODEGEN MARKER: B End */', '')
+        self.assertRejects(text, 'Unterminated block marker: B Start in file: File.m (line 6)')
+
+    def testEndWithoutStart(self):
+        text = twoBlockText.replace('/* CODEGEN MARKER: B Start */', '')
+        self.assertRejects(text, 'Block marker: B End in file: File.m (line 8) does not follow its start marker: B Start')
+
+    def testInverted(self):
+        markerIndex = CodeGen.MarkerIndex('File.m', twoBlockText)
+        try:
+            markerIndex.blockRange('B Start', 'A End')
+        except Exception as e:
+            self.assertIn('Block marker: A End (line 4) precedes: B Start (line 6) in file: File.m', str(e))
+        else:
+            self.fail('Accepted an inverted block')
+
+    def testMissing(self):
+        markerIndex = CodeGen.MarkerIndex('File.m', twoBlockText)
+        self.assertRaises(Exception, markerIndex.blockRange, 'C Start', 'C End')
+
+
+class SpecCacheTest(TempFolderTestCase):
+    def setUp(self):
+        TempFolderTestCase.setUp(self)
+        self.specPath = os.path.join(self.folderPath, 'spec.json')
+        self.cacheFolderPath = os.path.join(self.folderPath, 'cache')
+        writeFile(self.specPath, json.dumps({'viewInfoStorage': 'sparse'}))
+
+    def cachePaths(self):
+        return sorted(os.listdir(self.cacheFolderPath))
+
+    def replaceCachedSpec(self, value):
+        # Overwrites every cached spec, so that a load that uses the cache
+        # returns value.
+        for fileName in self.cachePaths():
+            with open(os.path.join(self.cacheFolderPath, fileName), 'wb') as f:
+                pickle.dump(value, f)
+
+    def testCacheHit(self):
+        self.assertEqual({'viewInfoStorage': 'sparse'}, CodeGen.loadSpec(self.specPath, self.cacheFolderPath))
+        self.assertEqual(1, len(self.cachePaths()))
+        self.assertTrue(self.cachePaths()[0].endswith('-%d-py%d.pickle' % (CodeGen.specCacheVersion, sys.version_info[0], )))
+        self.replaceCachedSpec({'cached': True})
+        self.assertEqual({'cached': True}, CodeGen.loadSpec(self.specPath, self.cacheFolderPath))
+
+    def testSpecChange(self):
+        CodeGen.loadSpec(self.specPath, self.cacheFolderPath)
+        self.replaceCachedSpec({'cached': True})
+        writeFile(self.specPath, json.dumps({'viewInfoStorage': 'dense'}))
+        self.assertEqual({'viewInfoStorage': 'dense'}, CodeGen.loadSpec(self.specPath, self.cacheFolderPath))
+        self.assertEqual(2, len(self.cachePaths()))
+
+    def testVersionChange(self):
+        CodeGen.loadSpec(self.specPath, self.cacheFolderPath)
+        self.replaceCachedSpec({'cached': True})
+        specCacheVersion = CodeGen.specCacheVersion
+        CodeGen.specCacheVersion = specCacheVersion + 1
+        try:
+            self.assertEqual({'viewInfoStorage': 'sparse'}, CodeGen.loadSpec(self.specPath, self.cacheFolderPath))
+        finally:
+            CodeGen.specCacheVersion = specCacheVersion
+        self.assertEqual(2, len(self.cachePaths()))
+
+    def testCorruptCache(self):
+        CodeGen.loadSpec(self.specPath, self.cacheFolderPath)
+        for fileName in self.cachePaths():
+            writeFile(os.path.join(self.cacheFolderPath, fileName), 'corrupt')
+        self.assertEqual({'viewInfoStorage': 'sparse'}, CodeGen.loadSpec(self.specPath, self.cacheFolderPath))
+
+    def testInvalidSpecs(self):
+        property = {'name': 'width', 'typeName': 'CGFloat'}
+        for spec, message in (({'unknown': []}, 'unknown table: unknown'),
+                              ({'view_propertyGroups': [[property, property]]}, 'duplicate property: width'),
+                              ({'view_propertyGroups': [[dict(property, typeName='double')]]}, 'unknown typeName: double'),
+                              ({'view_propertyGroups': [[dict(property, invalidation='most')]]}, 'unknown invalidation: most'),
+                              ({'viewInfoStorage': 'packed'}, 'unknown viewInfoStorage: packed'),
+                              ):
+            writeFile(self.specPath, json.dumps(spec))
+            try:
+                CodeGen.loadSpec(self.specPath, self.cacheFolderPath)
+            except Exception as e:
+                self.assertIn(message, str(e))
+            else:
+                self.fail('Accepted: %r' % spec)
+
+    def testOverride(self):
+        # A spec only overrides the tables it defines.
+        tables = CodeGen.loadPropertyTables(self.specPath)
+        defaultTables = CodeGen.loadPropertyTables()
+        self.assertEqual('sparse', tables.viewInfoStorage)
+        self.assertEqual([property.name for propertyGroup in defaultTables.view_propertyGroups for property in propertyGroup],
+                         [property.name for propertyGroup in tables.view_propertyGroups for property in propertyGroup])
+
+
+class StreamingSpliceTest(TempFolderTestCase):
+    def setUp(self):
+        TempFolderTestCase.setUp(self)
+        self.filePath = os.path.join(self.folderPath, 'File.m')
+        writeFile(self.filePath, twoBlockText)
+        self.copySliceSize = CodeGen.copySliceSize
+
+    def tearDown(self):
+        CodeGen.copySliceSize = self.copySliceSize
+        TempFolderTestCase.tearDown(self)
+
+    def testNormalizedSlices(self):
+        # Slicing never changes the normalized text: trailing whitespace is
+        # stripped and runs of blank lines collapsed across slice boundaries.
+        block = '\n\n\nfirst  \n\n\n\nsecond\t\n' + 'line \n' * 20 + '\n\n\n\nlast\n\n\n'
+        expected = '\n\nfirst\n\nsecond\n' + 'line\n' * 20 + '\nlast\n\n'
+        for copySliceSize in (1, 2, 3, 7, 64, 1 << 16,):
+            CodeGen.copySliceSize = copySliceSize
+            self.assertEqual(expected, ''.join(CodeGen.normalizedBlockChunks(block)), copySliceSize)
+
+    def testSplicedSlices(self):
+        edits = [('B Start', 'B End', '\nnew b  \n\n\n\n',), ('A Start', 'A End', '\nnew a\n',)]
+        expected = twoBlockText.replace('old a', 'new a').replace('old b\n', 'new b\n\n')
+        for copySliceSize in (1, 5, 1 << 16,):
+            CodeGen.copySliceSize = copySliceSize
+            chunks = list(CodeGen.spliceChunks(self.filePath, twoBlockText, edits))
+            self.assertEqual(expected, ''.join(chunks))
+            self.assertTrue(CodeGen.chunksMatchText(iter(chunks), expected))
+            self.assertFalse(CodeGen.chunksMatchText(iter(chunks), expected + '\n'))
+            self.assertFalse(CodeGen.chunksMatchText(iter(chunks), expected[:-1]))
+
+    def testRenamedIntoPlace(self):
+        os.chmod(self.filePath, 0o640)
+        self.assertTrue(CodeGen.writeChunksIfChanged(self.filePath, iter(['new\n'])))
+        self.assertEqual('new\n', readFile(self.filePath))
+        self.assertEqual(0o640, os.stat(self.filePath).st_mode & 0o777)
+        self.assertEqual(['File.m'], os.listdir(self.folderPath))
+
+    def testFailedWrite(self):
+        # A failure while streaming leaves the target untouched and removes
+        # the temporary file.
+        def chunks():
+            yield 'changed\n'
+            raise ValueError('render failed')
+        self.assertRaises(ValueError, CodeGen.writeChunksIfChanged, self.filePath, chunks())
+        self.assertEqual(twoBlockText, readFile(self.filePath))
+        self.assertEqual(['File.m'], os.listdir(self.folderPath))
+
+
+class TempRootTestCase(unittest.TestCase):
+    # Runs CodeGen.py on a copy of the generated files of this checkout.
+    def setUp(self):
+        self.folderPath = tempfile.mkdtemp()
+        CodeGenBenchmark.copyTargetFiles(rootPath, self.folderPath)
+
+    def tearDown(self):
+        shutil.rmtree(self.folderPath)
+
+    def runCodeGen(self, *args):
+        # Returns the exit code, stdout and stderr of a run.
+        process = subprocess.Popen([sys.executable, os.path.join(rootPath, 'CodeGen.py')] + list(args),
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        output, errorOutput = process.communicate()
+        return process.returncode, output.decode('utf-8'), errorOutput.decode('utf-8')
+
+
+class CheckTest(TempRootTestCase):
+    # --check and --diff never write, and exit with 1 if anything is stale.
+    def setUp(self):
+        TempRootTestCase.setUp(self)
+        self.filePath = os.path.join(self.folderPath, 'WeView', 'UIView+WeView.h')
+
+    def testCleanTree(self):
+        for flag in ('--check', '--diff',):
+            returnCode, output, errorOutput = self.runCodeGen('--root', self.folderPath, flag)
+            self.assertEqual(0, returnCode, errorOutput)
+            self.assertEqual('', output)
+
+    def testStaleTree(self):
+        makeStale(self.filePath)
+        staleText = readFile(self.filePath)
+        returnCode, output, errorOutput = self.runCodeGen('--root', self.folderPath, '--check')
+        self.assertEqual(1, returnCode, errorOutput)
+        self.assertEqual('Stale: %s\n' % os.path.realpath(self.filePath), output)
+        self.assertEqual(staleText, readFile(self.filePath))
+
+    def testDiff(self):
+        makeStale(self.filePath)
+        staleText = readFile(self.filePath)
+        returnCode, output, errorOutput = self.runCodeGen('--root', self.folderPath, '--diff')
+        self.assertEqual(1, returnCode, errorOutput)
+        self.assertIn('--- a/WeView/UIView+WeView.h\n+++ b/WeView/UIView+WeView.h\n', output)
+        self.assertIn('\n-} WeViewLayoutSnapshot_;\n+} WeViewLayoutSnapshot;\n', output)
+        self.assertEqual(staleText, readFile(self.filePath))
+
+    def testCheckFunction(self):
+        makeStale(self.filePath)
+        self.assertEqual([os.path.realpath(self.filePath)], CodeGen.check(self.folderPath, renderJobs=1))
+        CodeGen.generate(self.folderPath, renderJobs=1)
+        self.assertEqual([], CodeGen.check(self.folderPath, renderJobs=1))
+
+
+class WatcherTest(TempRootTestCase):
+    def setUp(self):
+        TempRootTestCase.setUp(self)
+        self.specPath = os.path.join(self.folderPath, 'spec.json')
+        writeFile(self.specPath, '{}')
+        self.watcher = CodeGen.Watcher(self.folderPath, specPath=self.specPath, renderJobs=1)
+        self.assertEqual([], self.watcher.poll())
+
+    def testIdle(self):
+        self.assertEqual([], self.watcher.poll())
+
+    def testEditedFile(self):
+        # Only the edited blocks are spliced back.
+        filePath = os.path.join(self.folderPath, 'WeView', 'UIView+WeView.h')
+        originalText = readFile(filePath)
+        makeStale(filePath)
+        self.assertEqual([(os.path.realpath(filePath), ['Layout Snapshot Start', 'Start'],)], self.watcher.poll())
+        self.assertEqual(originalText, readFile(filePath))
+        self.assertEqual([], self.watcher.poll())
+
+    def testSpecChange(self):
+        # Only the blocks that depend on the storage mode are re-rendered.
+        writeFile(self.specPath, json.dumps({'viewInfoStorage': 'sparse'}))
+        os.utime(self.specPath, (1000000000, 1000000000,))
+        filePath = os.path.realpath(os.path.join(self.folderPath, 'WeView', 'UIView+WeView.m'))
+        self.assertEqual([(filePath, ['View Info Storage Start', 'View Info M Start'],)], self.watcher.poll())
+        self.assertEqual([], CodeGen.check(self.folderPath, specPath=self.specPath, renderJobs=1))
+
+
+class StatsJsonTest(TempRootTestCase):
+    # With --stats-json -, stdout must be nothing but the JSON.
+    def runStats(self, *args):
+        returnCode, output, errorOutput = self.runCodeGen('--root', self.folderPath, '--stats', '--stats-json', '-', *args)
+        self.assertEqual(returnCode, 0, errorOutput)
+        return json.loads(output)
+
+    def testGenerate(self):
+        self.assertEqual(len(self.runStats()['roots']), 1)
+
+    def testCheck(self):
+        self.assertEqual(len(self.runStats('--check')['roots']), 1)
+
+    def testSeveralRoots(self):
+        self.assertEqual(len(self.runStats('--root', self.folderPath, '--jobs', '1')['roots']), 2)
+
+
+class IncrementalTest(TempRootTestCase):
+    # Runs with a spec that overrides the view properties with a copy of
+    # themselves, so that tests can edit them.
+    def setUp(self):
+        TempRootTestCase.setUp(self)
+        with open(CodeGen.defaultSpecPath, 'rt') as f:
+            self.spec = {'view_propertyGroups': json.load(f)['view_propertyGroups']}
+        self.specPath = os.path.join(self.folderPath, 'spec.json')
+        self.writeSpec()
+
+    def tearDown(self):
+        statePath = CodeGen.incrementalStatePath(os.path.abspath(self.folderPath), self.specPath)
+        if os.path.exists(statePath):
+            os.remove(statePath)
+        TempRootTestCase.tearDown(self)
+
+    def writeSpec(self):
+        writeFile(self.specPath, json.dumps(self.spec))
+
+    def generate(self):
+        return CodeGen.generateIncrementally(self.folderPath, specPath=self.specPath, renderJobs=1)
+
+    def testRerun(self):
+        self.assertEqual(len(CodeGen.blockSpecs), len(self.generate()[1]))
+        self.assertEqual(([], [],), self.generate())
+
+    def testCommentChange(self):
+        # Comments only appear in the declarations of the properties.
+        self.generate()
+        self.spec['view_propertyGroups'][0][0]['comments'] = 'Changed.'
+        self.writeSpec()
+        changedFilePaths, renderedBlockKeys = self.generate()
+        self.assertEqual([('viewInfohFilePath', 'View Info H Start',), ('hFilePath', 'Start',)], renderedBlockKeys)
+        self.assertEqual(2, len(changedFilePaths))
+
+    def testDefaultChange(self):
+        self.generate()
+        self.spec['view_propertyGroups'][0][0]['defaultValue'] = '1.f'
+        self.writeSpec()
+        changedFilePaths, renderedBlockKeys = self.generate()
+        self.assertTrue(0 < len(renderedBlockKeys) < len(CodeGen.blockSpecs))
+        self.assertEqual([], CodeGen.check(self.folderPath, specPath=self.specPath, renderJobs=1))
+
+    def testEditedFile(self):
+        # The blocks of a target file edited since the last run are re-rendered.
+        self.generate()
+        makeStale(os.path.join(self.folderPath, 'WeView', 'UIView+WeView.h'))
+        changedFilePaths, renderedBlockKeys = self.generate()
+        self.assertEqual(set(['hFilePath']), set([fileKey for fileKey, blockStartKey in renderedBlockKeys]))
+        self.assertEqual([], CodeGen.check(self.folderPath, specPath=self.specPath, renderJobs=1))
+
+    def testCommandLine(self):
+        args = ('--root', self.folderPath, '--spec', self.specPath, '--incremental',)
+        self.runCodeGen(*args)
+        returnCode, output, errorOutput = self.runCodeGen(*args)
+        self.assertEqual(0, returnCode, errorOutput)
+        self.assertIn('Rendered 0 of %d blocks.' % len(CodeGen.blockSpecs), output)
+
+
+class MultiRootTest(TempRootTestCase):
+    # Roots a and b, and a manifest that gives b a sparse spec.
+    def setUp(self):
+        TempRootTestCase.setUp(self)
+        self.rootPaths = [os.path.join(self.folderPath, name) for name in ('a', 'b',)]
+        for path in self.rootPaths:
+            CodeGenBenchmark.copyTargetFiles(rootPath, path)
+        with open(os.path.join(self.folderPath, 'sparse.json'), 'wt') as f:
+            json.dump({'viewInfoStorage': 'sparse'}, f)
+        self.manifestPath = os.path.join(self.folderPath, 'manifest.json')
+        with open(self.manifestPath, 'wt') as f:
+            json.dump({'roots': ['a', {'root': 'b', 'spec': 'sparse.json'}]}, f)
+
+    def tearDown(self):
+        for path in self.rootPaths:
+            statePath = CodeGen.incrementalStatePath(path)
+            if os.path.exists(statePath):
+                os.remove(statePath)
+        TempRootTestCase.tearDown(self)
+
+    def testReadManifest(self):
+        self.assertEqual([(self.rootPaths[0], None,),
+                          (self.rootPaths[1], os.path.join(self.folderPath, 'sparse.json'),)],
+                         CodeGen.readManifest(self.manifestPath))
+
+    def testInvalidManifest(self):
+        with open(self.manifestPath, 'wt') as f:
+            json.dump({'roots': [{'spec': 'sparse.json'}]}, f)
+        self.assertRaises(Exception, CodeGen.readManifest, self.manifestPath)
+
+    def testManifest(self):
+        returnCode, output, errorOutput = self.runCodeGen('--manifest', self.manifestPath, '--jobs', '2')
+        self.assertEqual(returnCode, 0, errorOutput)
+        self.assertIn('%s: 0 changed' % self.rootPaths[0], output)
+        self.assertIn('%s: 1 changed' % self.rootPaths[1], output)
+        returnCode, output, errorOutput = self.runCodeGen('--manifest', self.manifestPath, '--check')
+        self.assertEqual(returnCode, 0, output)
+
+    def testCheckStaleRoot(self):
+        returnCode, output, errorOutput = self.runCodeGen('--manifest', self.manifestPath, '--check', '--jobs', '1')
+        self.assertEqual(returnCode, 1)
+        self.assertIn('%s: 0 stale' % self.rootPaths[0], output)
+        self.assertIn('%s: 1 stale' % self.rootPaths[1], output)
+
+    def testFailingRoot(self):
+        returnCode, output, errorOutput = self.runCodeGen('--root', self.rootPaths[0],
+                                                          '--root', os.path.join(self.folderPath, 'missing'))
+        self.assertEqual(returnCode, 1)
+        self.assertIn('missing: failed', output)
+
+    def testIncremental(self):
+        # The flag applies to each root, not just to single-root runs.
+        args = ('--root', self.rootPaths[0], '--root', self.rootPaths[1], '--incremental', '--jobs', '2',)
+        returnCode, output, errorOutput = self.runCodeGen(*args)
+        self.assertEqual(returnCode, 0, errorOutput)
+        self.assertEqual(2, output.count('Rendered %d of %d blocks.' % (len(CodeGen.blockSpecs), len(CodeGen.blockSpecs), )))
+        returnCode, output, errorOutput = self.runCodeGen(*args)
+        self.assertEqual(2, output.count('Rendered 0 of %d blocks.' % len(CodeGen.blockSpecs)))
+
+
+class FilesOpenedTest(TempRootTestCase):
+    def generate(self):
+        stats = CodeGen.RunStats()
+        CodeGen.generate(self.folderPath, stats=stats, renderJobs=1)
+        stats.finish()
+        return stats.asDict(self.folderPath)
+
+    def testUnchangedFiles(self):
+        # Each target file is opened once, to read it.
+        statsDict = self.generate()
+        self.assertEqual(len(statsDict['files']), statsDict['filesOpened'])
+        self.assertEqual(statsDict['reads'], statsDict['filesOpened'])
+
+    def testTemporaryFile(self):
+        makeStale(os.path.join(self.folderPath, 'WeView', 'UIView+WeView.h'))
+        statsDict = self.generate()
+        self.assertEqual(len(statsDict['files']) + 1, statsDict['filesOpened'])
+        fileDict = [fileDict for fileDict in statsDict['files'] if fileDict['path'] == os.path.join('WeView', 'UIView+WeView.h')][0]
+        self.assertEqual(2, fileDict['opens'])
+
+    def testBenchmark(self):
+        tables = CodeGenBenchmark.syntheticPropertyTables(10)
+        result = CodeGenBenchmark.generateOnce(self.folderPath, tables, renderJobs=1)
+        self.assertTrue(result['fileOpens'] > 0)
+        self.assertFalse(hasattr(CodeGen, 'open'))
+
+
+class ProfileTest(TempRootTestCase):
+    def testHottestFunctions(self):
+        returnCode, output, errorOutput = self.runCodeGen('--root', self.folderPath, '--check', '--profile', '5')
+        self.assertEqual(returnCode, 0, errorOutput)
+        self.assertIn('Ordered by: internal time', errorOutput)
+
+    def testSortKey(self):
+        returnCode, output, errorOutput = self.runCodeGen('--root', self.folderPath, '--check', '--profile', '5',
+                                                          '--profile-sort', 'cumulative')
+        self.assertEqual(returnCode, 0, errorOutput)
+        self.assertIn('Ordered by: cumulative time', errorOutput)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,248 @@
+import copy, os, sys, unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import CodeGen
+import LayoutEngine
+
+fixturesFolderPath = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def readFixture(fileName):
+    return LayoutEngine.readJson(os.path.join(fixturesFolderPath, fileName))
+
+
+@unittest.skipIf(LayoutEngine.numpy is None, 'requires NumPy')
+class SolveCasesTest(unittest.TestCase):
+    # layout_expected.json is written by hand, not by "LayoutEngine.py solve";
+    # each frame follows from the rules of the ObjC layouts:
+    #
+    # - Cases 0-5 cover the alignments, margins, spacings and stretching of
+    #   each layout, and uniform grids that stretch their cells.
+    # - Case 6 stretches subviews of weights 0, 2 and 1: the first keeps its
+    #   width, the second gets floor(extra * 2 / 3) and the last the rest.
+    # - Case 7 has only zero weights, so nothing stretches and the body is aligned.
+    # - Cases 8 and 9 overflow by 20 with and without cropSubviewOverflow;
+    #   cropping takes it from the stretching subview and crops the heights.
+    # - Cases 10 and 11 overflow a stack layout with and without cropping.
+    # - Case 12 is a grid whose last column is empty, and case 13 one whose
+    #   last row is partly empty; at [30, 42] its columns are cropped by 14 in
+    #   proportion to their widths: 3, 7 and the remaining 4.
+    def setUp(self):
+        self.schema = LayoutEngine.LayoutSchema(CodeGen.loadPropertyTables())
+        self.cases = readFixture('layout_cases.json')
+        self.expected = readFixture('layout_expected.json')
+
+    def testFixtureLayouts(self):
+        self.assertEqual(set(['horizontal', 'vertical', 'stack', 'grid']),
+                         set([case['layout'] for case in self.cases]))
+
+    def testExpectedFrames(self):
+        results = LayoutEngine.solveCases(self.schema, self.cases)
+        self.assertEqual([], LayoutEngine.compareResults(self.expected, results))
+
+    def testCheckCommand(self):
+        self.assertEqual(0, LayoutEngine.main(['check',
+                                               os.path.join(fixturesFolderPath, 'layout_cases.json'),
+                                               os.path.join(fixturesFolderPath, 'layout_expected.json')]))
+
+
+def objcCase(layout, layoutProperties=None, subview=None, subviewCount=1, size=(100, 100)):
+    subviewProperties = dict(subview or {})
+    subviewProperties['size'] = list(size)
+    return {'layout': layout,
+            'layoutProperties': layoutProperties or {},
+            'subviews': [dict(subviewProperties) for index in range(subviewCount)]}
+
+
+# The sizeThatFits: assertions of WeViewBaseLayoutTests.m, as (properties of
+# the layout, properties of the subview, subview size, guide sizes, size).
+# vMargin, hMargin and margin set both of their margins.
+baseLayoutSizes = (
+    # baseTestBasicSizing
+    ({}, {}, (100, 100), ((0, 0), (1, 1), (0, 1000), (1000, 0),), (100, 100)),
+    # baseTestBasicMinAndMaxSize
+    ({}, {'minDesiredWidth': 200}, (100, 100), ((0, 0),), (200, 100)),
+    ({}, {'maxDesiredWidth': 50}, (100, 100), ((0, 0),), (50, 100)),
+    ({}, {'minDesiredHeight': 200}, (100, 100), ((0, 0),), (100, 200)),
+    ({}, {'maxDesiredHeight': 50}, (100, 100), ((0, 0),), (100, 50)),
+    # baseTestBasicSpacing
+    ({'topMargin': 50}, {}, (100, 100), ((0, 0),), (100, 150)),
+    ({'bottomMargin': 50}, {}, (100, 100), ((0, 0),), (100, 150)),
+    ({'topMargin': 50, 'bottomMargin': 50}, {}, (100, 100), ((0, 0),), (100, 200)),
+    ({'leftMargin': 50}, {}, (100, 100), ((0, 0),), (150, 100)),
+    ({'rightMargin': 50}, {}, (100, 100), ((0, 0),), (150, 100)),
+    ({'leftMargin': 50, 'rightMargin': 50}, {}, (100, 100), ((0, 0),), (200, 100)),
+    ({'leftMargin': 50, 'rightMargin': 50, 'topMargin': 50, 'bottomMargin': 50}, {}, (100, 100), ((0, 0),), (200, 200)),
+    # baseTestBasicRounding
+    ({}, {}, (50.1, 50), ((0, 0),), (51, 50)),
+    ({}, {}, (50.9, 50), ((0, 0),), (51, 50)),
+    ({}, {'minDesiredWidth': 50.9}, (50, 50), ((0, 0),), (51, 50)),
+    ({'leftMargin': 0.1}, {}, (50, 50), ((0, 0),), (51, 50)),
+    ({'leftMargin': 0.4, 'rightMargin': 0.4}, {}, (50, 50), ((0, 0),), (52, 50)),
+    ({'leftMargin': 0.4}, {}, (50.4, 50), ((0, 0),), (52, 50)),
+)
+
+# The sizeThatFits: assertions of WeViewHorizontalLayoutTests.m for three
+# 100x100 subviews; WeViewVerticalLayoutTests.m transposes them.
+linearLayoutSizes = (
+    ({}, ((0, 0), (1, 1),), 300),
+    ({'leftMargin': 10}, ((0, 0),), 310),
+    ({'hSpacing': 10}, ((0, 0),), 320),
+    ({'hSpacing': -10}, ((0, 0),), 280),
+)
+
+
+@unittest.skipIf(LayoutEngine.numpy is None, 'requires NumPy')
+class ObjCSizeThatFitsTest(unittest.TestCase):
+    # The engine's minSize must match the sizes the ObjC unit tests in
+    # WeViews2DemoAppTests expect of sizeThatFits:.
+    def setUp(self):
+        self.schema = LayoutEngine.LayoutSchema(CodeGen.loadPropertyTables())
+
+    def assertMinSizes(self, case, guideSizes, expectedSize):
+        case['sizes'] = [list(guideSize) for guideSize in guideSizes]
+        layouts = LayoutEngine.solveCases(self.schema, [case])[0]['layouts']
+        for layout in layouts:
+            self.assertEqual(list(expectedSize), layout['minSize'], (case, layout['size']))
+
+    def testBaseLayouts(self):
+        for layout in ('horizontal', 'vertical', 'stack',):
+            for layoutProperties, subview, size, guideSizes, expectedSize in baseLayoutSizes:
+                self.assertMinSizes(objcCase(layout, layoutProperties, subview, size=size), guideSizes, expectedSize)
+
+    def testLinearLayouts(self):
+        for layoutProperties, guideSizes, axisSize in linearLayoutSizes:
+            self.assertMinSizes(objcCase('horizontal', layoutProperties, subviewCount=3),
+                                guideSizes, (axisSize, 100))
+            verticalProperties = dict([(name.replace('hSpacing', 'vSpacing').replace('leftMargin', 'topMargin'), value)
+                                       for name, value in layoutProperties.items()])
+            self.assertMinSizes(objcCase('vertical', verticalProperties, subviewCount=3),
+                                guideSizes, (100, axisSize))
+
+
+def gridCase(columnCount=2, layoutProperties=None, subviewSizes=None, grid=None):
+    gridOptions = {'columnCount': columnCount}
+    gridOptions.update(grid or {})
+    return {'layout': 'grid',
+            'layoutProperties': layoutProperties or {'hSpacing': 2, 'vSpacing': 2},
+            'subviews': [{'size': size} for size in subviewSizes or [[30, 10], [10, 20], [20, 20]]],
+            'grid': gridOptions,
+            'sweep': {'width': [0, 121, 30], 'height': [0, 61, 30]}}
+
+
+@unittest.skipIf(LayoutEngine.numpy is None, 'requires NumPy')
+class GridSolverTest(unittest.TestCase):
+    # The memoized GridSolver must match gridSizing() and gridLayout() on every
+    # input that its cache key covers.
+    def setUp(self):
+        self.schema = LayoutEngine.LayoutSchema(CodeGen.loadPropertyTables())
+
+    def batch(self, case):
+        return self.schema.batch('grid',
+                                 [case['layoutProperties']],
+                                 [[dict([(name, value) for name, value in subview.items() if name != 'size'])
+                                   for subview in case['subviews']]],
+                                 [[subview['size'] for subview in case['subviews']]],
+                                 [case['grid']])
+
+    def unmemoizedResults(self, case):
+        sizes = LayoutEngine.numpy.array(LayoutEngine.caseSizes(0, case), dtype=LayoutEngine.numpy.float64)
+        rowBatch = self.batch(case).subset(LayoutEngine.numpy.zeros(len(sizes), dtype=int))
+        frames, columnWidths, rowHeights = LayoutEngine.gridLayout(rowBatch, sizes)
+        return {
+            'minSize': LayoutEngine.gridMinSizes(rowBatch, sizes).tolist(),
+            'frames': frames.tolist(),
+            'columnWidths': columnWidths.tolist(),
+            'rowHeights': rowHeights.tolist(),
+        }
+
+    def assertMatchesUnmemoized(self, gridSolver, case):
+        layouts = LayoutEngine.solveCases(self.schema, [case], gridSolver)[0]['layouts']
+        expected = self.unmemoizedResults(case)
+        for key in sorted(expected):
+            self.assertEqual(expected[key], [layout[key] for layout in layouts], key)
+
+    def testSameGridTwice(self):
+        gridSolver = LayoutEngine.GridSolver()
+        case = gridCase()
+        self.assertMatchesUnmemoized(gridSolver, case)
+        self.assertEqual((0, 1), (gridSolver.hitCount, gridSolver.missCount))
+        self.assertMatchesUnmemoized(gridSolver, case)
+        self.assertEqual((1, 1), (gridSolver.hitCount, gridSolver.missCount))
+
+    def testSizing(self):
+        gridSolver = LayoutEngine.GridSolver()
+        batch = self.batch(gridCase(grid={'isGridUniform': True}))
+        for index in range(2):
+            for values, expectedValues in zip(gridSolver.sizing(batch), LayoutEngine.gridSizing(batch)):
+                self.assertEqual(expectedValues.tolist(), values.tolist())
+
+    def testChangedInputs(self):
+        # Each case changes one input of the first; a cache key that missed
+        # any of them would return the first case's sizing.
+        cases = [gridCase(),
+                 gridCase(columnCount=3),
+                 gridCase(columnCount=0),
+                 gridCase(grid={'isGridUniform': True}),
+                 gridCase(grid={'stretchPolicy': 'GRID_STRETCH_POLICY_STRETCH_CELLS'}),
+                 gridCase(grid={'stretchPolicy': 'GRID_STRETCH_POLICY_STRETCH_SPACING'}),
+                 gridCase(grid={'cellSizeHint': [25, 15]}),
+                 gridCase(layoutProperties={'hSpacing': 7, 'vSpacing': 2}),
+                 gridCase(layoutProperties={'hSpacing': 2, 'vSpacing': 2, 'leftMargin': 5, 'topMargin': 3}),
+                 gridCase(layoutProperties={'hSpacing': 2, 'vSpacing': 2, 'hAlign': 'H_ALIGN_RIGHT'}),
+                 gridCase(subviewSizes=[[30, 10], [10, 25], [20, 20]]),
+                 gridCase(subviewSizes=[[30, 10], [10, 20], [20, 20], [5, 5]]),
+                 ]
+        gridSolver = LayoutEngine.GridSolver()
+        for case in cases:
+            self.assertMatchesUnmemoized(gridSolver, case)
+        self.assertEqual(len(cases), gridSolver.missCount)
+        # Solving them again hits the cache every time.
+        for case in cases:
+            self.assertMatchesUnmemoized(gridSolver, case)
+        self.assertEqual((len(cases), len(cases)), (gridSolver.hitCount, gridSolver.missCount))
+
+    def testSubviewProperties(self):
+        gridSolver = LayoutEngine.GridSolver()
+        case = gridCase()
+        self.assertMatchesUnmemoized(gridSolver, case)
+        case['subviews'][0]['minDesiredWidth'] = 45
+        self.assertMatchesUnmemoized(gridSolver, case)
+        self.assertEqual((0, 2), (gridSolver.hitCount, gridSolver.missCount))
+
+    def testEviction(self):
+        gridSolver = LayoutEngine.GridSolver(maxCacheSize=1)
+        first, second = gridCase(), gridCase(columnCount=3)
+        for case in (first, second, first):
+            self.assertMatchesUnmemoized(gridSolver, case)
+        self.assertEqual((0, 3), (gridSolver.hitCount, gridSolver.missCount))
+        self.assertEqual(1, len(gridSolver.cache))
+
+
+class CompareResultsTest(unittest.TestCase):
+    def setUp(self):
+        self.expected = readFixture('layout_expected.json')
+
+    def testMissingKey(self):
+        results = copy.deepcopy(self.expected)
+        del results[0]['layouts'][0]['frames']
+        del results[4]['layouts'][0]['columnWidths']
+        self.assertEqual(['case 0, size [320, 44]: frames: missing',
+                          'case 4, size [100, 100]: columnWidths: missing'],
+                         LayoutEngine.compareResults(self.expected, results))
+
+    def testUnexpectedKey(self):
+        results = copy.deepcopy(self.expected)
+        results[0]['layouts'][0]['columnWidths'] = [100.0, 40.0]
+        self.assertEqual(['case 0, size [320, 44]: columnWidths: not expected'],
+                         LayoutEngine.compareResults(self.expected, results))
+
+    def testDifferentFrames(self):
+        results = copy.deepcopy(self.expected)
+        results[3]['layouts'][0]['frames'][0][0] = 24.0
+        self.assertEqual(1, len(LayoutEngine.compareResults(self.expected, results)))
+
+
+if __name__ == '__main__':
+    unittest.main()